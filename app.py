@@ -1,13 +1,34 @@
+import time
+_mulai_impor = time.perf_counter()
 import streamlit as st
-from src.ui import render_ui
+from src.ui import render_ui, render_dasbor_kohort, render_unggah, render_laporan_memori, render_panel_instrumentasi, mode_instrumentasi, id_sesi
+from src.instrumentasi import rekam_rerun
+from src.pemanasan import mulai_pemanasan, catat_impor_ui
 from datetime import date
 
+# Dicatat pada rerun pertama proses saja; tabel WHO dimuat di latar belakang sementara halaman pertama dirender
+catat_impor_ui((time.perf_counter() - _mulai_impor) * 1e3)
+mulai_pemanasan()
+
 def main():
     # Konfigurasi halaman
     st.set_page_config(page_title="Kalkulator Stunting Anak", page_icon="🧒", layout="wide")
     
-    # Render antarmuka pengguna tanpa profil statis
-    render_ui()
+    mode = st.sidebar.radio("Mode", ["Pemantauan Anak", "Unggah Roster", "Dasbor Kohort"])
+    render_laporan_memori()
+    
+    # Tanpa INSTRUMENTASI atau ?instrumentasi=..., rekam_rerun menghasilkan None dan span tidak merekam apa pun
+    with rekam_rerun(mode_instrumentasi(), id_sesi()) as jejak:
+        if mode == "Dasbor Kohort":
+            render_dasbor_kohort()
+        elif mode == "Unggah Roster":
+            render_unggah()
+        else:
+            # Render antarmuka pengguna tanpa profil statis
+            render_ui()
+    
+    if jejak is not None:
+        render_panel_instrumentasi(jejak)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,405 @@
+"""Uji beban sesi bersamaan terhadap satu server `streamlit run app.py` sungguhan.
+
+Untuk setiap kombinasi jumlah sesi dan panjang histori awal, satu proses server baru dijalankan lalu
+sesi-sesi terhubung bersamaan lewat websocket /_stcore/stream dengan protokol yang sama dengan
+browser (BackMsg rerun_script berisi state widget, dibalas ForwardMsg sampai script_finished).
+Setiap sesi menjalankan alur sebenarnya di app.py: mengisi dan menyimpan profil, lalu mengirim
+form_stunting berulang kali sehingga histori bertambah dan grafik dirender ulang.
+
+Semua sesi berbagi satu proses server, jadi perebutan GIL, kunci, dan cache proses (tabel WHO,
+figur, buffer histori, basis data) ikut terukur. Dilaporkan persentil latensi rerun (dari BackMsg
+terkirim sampai script_finished diterima), throughput (rerun/detik), RSS server, dan pertambahan
+RSS server per sesi. Klien berjalan di satu event loop asyncio di proses ini dan hanya mengurai
+pesan, sehingga beban CPU-nya kecil dibanding server.
+
+Histori awal ditulis langsung ke basis data SQLite sebelum server dijalankan, karena itu --histori
+di atas 0 memerlukan --backend sqlite; backend memori (default aplikasi) menyimpan histori di
+session state yang tidak bisa diisi dari luar server.
+
+Contoh:
+    python -m benchmarks.beban
+    python -m benchmarks.beban --sesi 1,8,32 --histori 0,500 --langkah 10 --keluaran beban.json
+    python -m benchmarks.beban --backend memori --histori 0
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, timedelta
+
+import numpy as np
+
+PATH_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Batas waktu satu rerun; longgar karena rerun melambat saat banyak sesi berebut CPU
+TIMEOUT_RERUN = 120
+TIMEOUT_SERVER = 60
+
+# Batas ukuran satu ForwardMsg yang diterima klien; figur dengan histori panjang bisa beberapa MiB
+MAKS_UKURAN_PESAN = 256 * 2**20
+
+# Anak simulasi berusia sekian hari pada hari ini; histori awal dimulai sehari setelah lahir, satu pengukuran per hari
+USIA_ANAK_HARI = 1500
+
+SESI_DEFAULT = "1,4,16"
+HISTORI_DEFAULT = "0,100,1000"
+LANGKAH_DEFAULT = 5
+
+PERSENTIL = (50, 95, 99)
+
+# Jenis elemen widget yang dipakai alur simulasi
+JENIS_WIDGET = ("text_input", "selectbox", "date_input", "number_input", "button")
+
+def _rss_byte(pid):
+    """Resident set size proses `pid` (Linux)."""
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def _tinggi_berat(usia_hari, rng):
+    usia_hari = np.asarray(usia_hari, dtype=np.float64)
+    tinggi = np.round(50 + usia_hari * 0.025 + rng.normal(0, 2, usia_hari.shape), 1)
+    berat = np.round(3.3 + usia_hari * 0.007 + rng.normal(0, 0.5, usia_hari.shape), 1)
+    return tinggi, berat
+
+def _rekaman_awal(nama, jenis_kelamin, tanggal_lahir, jumlah, seed):
+    """Histori awal satu anak (tuple KOLOM_HISTORI) dengan Z-score dan status yang dihitung dari tabel WHO."""
+    from src.calculations import JENIS_KELAMIN, hitung_batch, hitung_usia_bulan, label_status
+    from src.data_manager import baca_tabel_lms_semua
+
+    if jumlah == 0:
+        return []
+    usia_hari = np.arange(1, jumlah + 1)
+    tinggi, berat = _tinggi_berat(usia_hari, np.random.default_rng(seed))
+    kode_jk = np.full(jumlah, JENIS_KELAMIN.index(jenis_kelamin), dtype=np.int8)
+    hasil = hitung_batch(kode_jk, usia_hari.astype(np.float64), tinggi, baca_tabel_lms_semua(), berat=berat)
+    status = label_status(hasil["kode_status"])
+    return [
+        (nama, "WARGA", (tanggal_lahir + timedelta(days=int(hari))).isoformat(), jenis_kelamin, int(hari),
+         round(hitung_usia_bulan(int(hari)), 1), float(t), float(b), round(float(z), 2), s)
+        for hari, t, b, z, s in zip(usia_hari, tinggi, berat, hasil["z_score"], status)
+    ]
+
+def _port_bebas():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class Server:
+    """Satu proses `streamlit run app.py` headless di port lokal acak, dengan log di `folder`."""
+
+    def __init__(self, folder, backend, path_db):
+        self.port = _port_bebas()
+        self.path_log = os.path.join(folder, "server.log")
+        env = {**os.environ, "HISTORI_BACKEND": backend, "HISTORI_DB": path_db}
+        perintah = [
+            sys.executable, "-m", "streamlit", "run", PATH_APP,
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            "--server.port", str(self.port),
+            "--server.fileWatcherType", "none",
+            "--server.runOnSave", "false",
+            "--server.enableXsrfProtection", "false",
+            "--browser.gatherUsageStats", "false",
+        ]
+        with open(self.path_log, "wb") as log:
+            self.proses = subprocess.Popen(perintah, cwd=os.path.dirname(PATH_APP), env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    @property
+    def url_stream(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def tunggu_siap(self):
+        """Menunggu /_stcore/health menjawab "ok"; RuntimeError berisi akhir log jika server berhenti atau terlambat."""
+        batas = time.monotonic() + TIMEOUT_SERVER
+        while time.monotonic() < batas:
+            if self.proses.poll() is not None:
+                raise RuntimeError(f"Server berhenti (exitcode {self.proses.returncode}):\n{self.ekor_log()}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as respons:
+                    if respons.read().strip() == b"ok":
+                        return
+            except OSError:
+                pass
+            time.sleep(0.1)
+        raise RuntimeError(f"Server tidak siap dalam {TIMEOUT_SERVER} detik:\n{self.ekor_log()}")
+
+    def rss_byte(self):
+        return _rss_byte(self.proses.pid)
+
+    def ekor_log(self, baris=20):
+        with open(self.path_log, errors="replace") as f:
+            return "".join(f.readlines()[-baris:])
+
+    def hentikan(self):
+        self.proses.terminate()
+        try:
+            self.proses.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proses.kill()
+            self.proses.wait()
+
+class SesiWebsocket:
+    """Satu sesi browser simulasi: widget diisi lewat state widget, latensi setiap rerun dicatat per jenis."""
+
+    def __init__(self, url, nama, jenis_kelamin):
+        self.url = url
+        self.nama = nama
+        self.jenis_kelamin = jenis_kelamin
+        self.tanggal_lahir = date.today() - timedelta(days=USIA_ANAK_HARI)
+        self.ws = None
+        # Widget dari rerun terakhir per label, dan state widget yang dikirim ulang setiap rerun seperti browser
+        self.widget = {}
+        self.state = {}
+        self.latensi = {"dingin": [], "profil": [], "ukur": []}
+        self.gagal = []
+
+    async def sambung(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(self.url, subprotocols=["streamlit"], max_message_size=MAKS_UKURAN_PESAN)
+
+    def tutup(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    def _isi(self, label, **nilai):
+        """Mengisi state widget berlabel `label`; `nilai` adalah satu field nilai WidgetState."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id = self.widget[label].id
+        state = WidgetState(id=widget_id)
+        for field, isi in nilai.items():
+            if field == "string_array_value":
+                state.string_array_value.data.extend(isi)
+            else:
+                setattr(state, field, isi)
+        self.state[widget_id] = state
+
+    async def _rerun(self, jenis, tombol=None):
+        """Mengirim rerun_script dan membaca ForwardMsg sampai script_finished; mengembalikan (format, isi) alert dan exception."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        pesan = BackMsg()
+        pesan.rerun_script.widget_states.widgets.extend(self.state.values())
+        if tombol is not None:
+            pemicu = pesan.rerun_script.widget_states.widgets.add()
+            pemicu.id = self.widget[tombol].id
+            pemicu.trigger_value = True
+
+        catatan = []
+        self.widget = {}
+        mulai = time.perf_counter()
+        await self.ws.write_message(pesan.SerializeToString(), binary=True)
+        while True:
+            data = await asyncio.wait_for(self.ws.read_message(), TIMEOUT_RERUN)
+            if data is None:
+                raise ConnectionError("Websocket ditutup server")
+            pesan_maju = ForwardMsg.FromString(data)
+            jenis_pesan = pesan_maju.WhichOneof("type")
+            if jenis_pesan == "delta" and pesan_maju.delta.WhichOneof("type") == "new_element":
+                self._catat_elemen(pesan_maju.delta.new_element, catatan)
+            elif jenis_pesan == "script_finished":
+                break
+        self.latensi[jenis].append(time.perf_counter() - mulai)
+        if pesan_maju.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+            self.gagal.append(f"{jenis}: script_finished {ForwardMsg.ScriptFinishedStatus.Name(pesan_maju.script_finished)}")
+        for format_alert, isi in catatan:
+            if format_alert is None:
+                self.gagal.append(f"{jenis}: {isi}")
+        return catatan
+
+    def _catat_elemen(self, elemen, catatan):
+        jenis = elemen.WhichOneof("type")
+        if jenis in JENIS_WIDGET:
+            proto = getattr(elemen, jenis)
+            self.widget[proto.label] = proto
+        elif jenis == "alert":
+            catatan.append((elemen.alert.format, elemen.alert.body))
+        elif jenis == "exception":
+            catatan.append((None, elemen.exception.message))
+
+    async def buka(self):
+        """Rerun pertama: halaman kosong, seperti saat browser membuka aplikasi."""
+        await self._rerun("dingin")
+
+    async def simpan_profil(self, tanggal_ukur):
+        jenis_kelamin = list(self.widget["Jenis Kelamin"].options)
+        self._isi("Nama Anak", string_value=self.nama)
+        self._isi("Jenis Kelamin", int_value=jenis_kelamin.index(self.jenis_kelamin))
+        self._isi("Tanggal Lahir", string_array_value=[self.tanggal_lahir.strftime("%Y/%m/%d")])
+        self._isi("Tanggal Pengukuran", string_array_value=[tanggal_ukur.strftime("%Y/%m/%d")])
+        jumlah_gagal = len(self.gagal)
+        await self._rerun("profil", "Simpan Profil")
+        return len(self.gagal) == jumlah_gagal
+
+    async def ukur(self, tinggi, berat):
+        from streamlit.proto.Alert_pb2 import Alert
+
+        self._isi("Tinggi/Panjang Badan (cm)", double_value=tinggi)
+        self._isi("Berat Badan (kg)", double_value=berat)
+        jumlah_gagal = len(self.gagal)
+        catatan = await self._rerun("ukur", "Cek Status Pertumbuhan")
+        if len(self.gagal) > jumlah_gagal:
+            return False
+        if not any(f == Alert.SUCCESS and isi.startswith("Berhasil") for f, isi in catatan):
+            pesan = [isi for f, isi in catatan if f == Alert.ERROR] or ["tidak ada pesan berhasil"]
+            self.gagal.append(f"ukur: {pesan[0]}")
+            return False
+        return True
+
+    async def jalankan(self, langkah, seed):
+        """Mengirim `langkah` pengukuran harian berturut-turut yang berakhir hari ini."""
+        hari_ukur = [USIA_ANAK_HARI - (langkah - 1 - i) for i in range(langkah)]
+        tinggi, berat = _tinggi_berat(hari_ukur, np.random.default_rng(seed))
+        for hari, t, b in zip(hari_ukur, tinggi.tolist(), berat.tolist()):
+            if await self.simpan_profil(self.tanggal_lahir + timedelta(days=hari)):
+                await self.ukur(t, b)
+
+def _persentil_ms(nilai):
+    if not nilai:
+        return {**{f"p{p}": None for p in PERSENTIL}, "maks": None}
+    ms = np.asarray(nilai) * 1e3
+    return {**{f"p{p}": float(np.percentile(ms, p)) for p in PERSENTIL}, "maks": float(ms.max())}
+
+async def _uji_server(server, daftar_sesi, langkah):
+    """Fase dingin (semua sesi membuka halaman), pemanasan, lalu fase terukur di mana semua sesi mengirim pengukuran bersamaan."""
+    rss_awal = server.rss_byte()
+    try:
+        for sesi in daftar_sesi:
+            await sesi.sambung()
+        await asyncio.gather(*(sesi.buka() for sesi in daftar_sesi))
+
+        # Satu siklus penuh di sesi terpisah agar impor malas dan cache proses sudah terisi sebelum fase terukur
+        pemanasan = SesiWebsocket(server.url_stream, "Pemanasan Beban", daftar_sesi[0].jenis_kelamin)
+        await pemanasan.sambung()
+        try:
+            await pemanasan.buka()
+            await pemanasan.jalankan(1, seed=len(daftar_sesi))
+        finally:
+            pemanasan.tutup()
+        if pemanasan.gagal:
+            raise RuntimeError(f"Pemanasan gagal: {pemanasan.gagal[0]}")
+
+        rss_sebelum = server.rss_byte()
+        mulai = time.monotonic()
+        await asyncio.gather(*(sesi.jalankan(langkah, seed=i) for i, sesi in enumerate(daftar_sesi)))
+        durasi = time.monotonic() - mulai
+        return {"durasi": durasi, "rss_awal": rss_awal, "rss_sebelum": rss_sebelum, "rss_akhir": server.rss_byte()}
+    finally:
+        for sesi in daftar_sesi:
+            sesi.tutup()
+
+def uji(jumlah_sesi, panjang_histori, langkah, backend):
+    """Menjalankan `jumlah_sesi` sesi bersamaan dengan histori awal `panjang_histori` pada server baru; mengembalikan dict hasil."""
+    from src.calculations import JENIS_KELAMIN
+
+    folder = tempfile.mkdtemp(prefix="beban-")
+    path_db = os.path.join(folder, "histori.sqlite3")
+    daftar_sesi = []
+    galat = []
+    ukuran = None
+    server = None
+    try:
+        if backend == "sqlite":
+            from src.penyimpanan import PenyimpananSQLite
+
+            penyimpanan = PenyimpananSQLite(path_db)
+        for indeks in range(jumlah_sesi):
+            sesi = SesiWebsocket(None, f"Beban {indeks}", JENIS_KELAMIN[indeks % len(JENIS_KELAMIN)])
+            if backend == "sqlite" and panjang_histori:
+                penyimpanan.simpan_banyak(_rekaman_awal(sesi.nama, sesi.jenis_kelamin, sesi.tanggal_lahir, panjang_histori, indeks))
+            daftar_sesi.append(sesi)
+
+        server = Server(folder, backend, path_db)
+        server.tunggu_siap()
+        for sesi in daftar_sesi:
+            sesi.url = server.url_stream
+        ukuran = asyncio.run(_uji_server(server, daftar_sesi, langkah))
+    except Exception as e:
+        galat.append(f"{type(e).__name__}: {e}")
+    finally:
+        if server is not None:
+            server.hentikan()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    latensi = {jenis: [d for sesi in daftar_sesi for d in sesi.latensi[jenis]] for jenis in ("dingin", "profil", "ukur")}
+    jumlah_rerun = len(latensi["profil"]) + len(latensi["ukur"])
+    durasi = ukuran["durasi"] if ukuran else 0
+    return {
+        "sesi": jumlah_sesi,
+        "histori": panjang_histori,
+        "langkah": langkah,
+        "backend": backend,
+        "rerun": jumlah_rerun,
+        "durasi_detik": durasi,
+        "rerun_per_detik": jumlah_rerun / durasi if durasi > 0 else None,
+        "latensi_ms": {jenis: _persentil_ms(nilai) for jenis, nilai in latensi.items()},
+        "rss_server_byte": ukuran["rss_akhir"] if ukuran else None,
+        # Pertambahan RSS server sejak sebelum sesi terhubung, dibagi jumlah sesi (state sesi, histori, figur)
+        "rss_per_sesi_byte": (ukuran["rss_akhir"] - ukuran["rss_awal"]) / jumlah_sesi if ukuran else None,
+        # Pertambahan RSS server selama fase terukur saja
+        "rss_delta_terukur_byte": ukuran["rss_akhir"] - ukuran["rss_sebelum"] if ukuran else None,
+        "gagal": [pesan for sesi in daftar_sesi for pesan in sesi.gagal],
+        "galat": galat,
+    }
+
+def _daftar_angka(teks):
+    return [int(bagian) for bagian in teks.split(",") if bagian.strip()]
+
+def _cetak(hasil):
+    ukur = hasil["latensi_ms"]["ukur"]
+    if ukur["p50"] is None or hasil["rss_server_byte"] is None:
+        print(f"{hasil['sesi']:>5} {hasil['histori']:>8}  (uji tidak selesai)")
+        return
+    print(f"{hasil['sesi']:>5} {hasil['histori']:>8} {ukur['p50']:9.1f} {ukur['p95']:9.1f} {ukur['p99']:9.1f} "
+          f"{ukur['maks']:9.1f} {hasil['rerun_per_detik'] or 0:11.1f} {hasil['rss_server_byte'] / 2**20:10.1f} "
+          f"{hasil['rss_per_sesi_byte'] / 2**20:10.2f} {len(hasil['gagal']) + len(hasil['galat']):6}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban sesi bersamaan terhadap satu server Streamlit lokal.")
+    parser.add_argument("--sesi", default=SESI_DEFAULT, help="Daftar jumlah sesi bersamaan, dipisah koma")
+    parser.add_argument("--histori", default=HISTORI_DEFAULT, help="Daftar panjang histori awal per anak, dipisah koma")
+    parser.add_argument("--langkah", type=int, default=LANGKAH_DEFAULT, help="Jumlah pengukuran yang dikirim setiap sesi")
+    parser.add_argument("--backend", choices=["sqlite", "memori"], default="sqlite",
+                        help="Backend histori server (histori awal di atas 0 memerlukan sqlite)")
+    parser.add_argument("--keluaran", default=None, help="Tulis hasil ke file JSON ini")
+    args = parser.parse_args(argv)
+
+    daftar_sesi, daftar_histori = _daftar_angka(args.sesi), _daftar_angka(args.histori)
+    if not daftar_sesi or not daftar_histori:
+        parser.error("--sesi dan --histori harus berisi minimal satu angka")
+    if min(daftar_sesi) < 1 or min(daftar_histori) < 0:
+        parser.error("jumlah sesi minimal 1 dan panjang histori tidak boleh negatif")
+    if args.langkah < 1 or max(daftar_histori) + args.langkah >= USIA_ANAK_HARI:
+        parser.error(f"histori + langkah harus kurang dari {USIA_ANAK_HARI} (satu pengukuran per hari)")
+    if args.backend == "memori" and max(daftar_histori) > 0:
+        parser.error("histori awal hanya bisa diisi dengan --backend sqlite; pakai --histori 0 untuk backend memori")
+
+    # Persentil latensi di tabel adalah rerun kirim form_stunting; rincian lain ada di --keluaran
+    print(f"{'sesi':>5} {'histori':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'maks ms':>9} "
+          f"{'rerun/dtk':>11} {'RSS MiB':>10} {'MiB/sesi':>10} {'gagal':>6}")
+    semua = []
+    for panjang_histori in daftar_histori:
+        for jumlah_sesi in daftar_sesi:
+            hasil = uji(jumlah_sesi, panjang_histori, args.langkah, args.backend)
+            semua.append(hasil)
+            _cetak(hasil)
+            for pesan in hasil["galat"][:1] + hasil["gagal"][:1]:
+                print(f"      contoh galat: {pesan.strip().splitlines()[-1]}", file=sys.stderr)
+
+    if args.keluaran:
+        with open(args.keluaran, "w") as f:
+            json.dump({"meta": {"python": sys.version.split()[0], "cpu": os.cpu_count(), "waktu": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                       "hasil": semua}, f, indent=2)
+    return 1 if any(h["galat"] or h["gagal"] for h in semua) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Menjalankan benchmark lapisan kalkulasi dan data, lalu membandingkannya dengan baseline.
+
+Contoh:
+    python -m benchmarks.jalankan --simpan-baseline            # rekam ulang baseline mesin ini
+    python -m benchmarks.jalankan                              # gagal (exit 1) jika ada regresi
+    python -m benchmarks.jalankan --filter z_score --ukuran-maks 10000 --keluaran hasil.json
+
+Setiap hasil berisi median dan minimum waktu per ulangan serta puncak memori (tracemalloc)
+untuk satu kombinasi kasus/ukuran. Baseline dan hasil berformat JSON.
+
+Baseline bergantung pada mesin, jadi tidak disertakan di repositori. Jika file baseline belum
+ada, atau kasus/ukuran yang dijalankan belum tercatat di dalamnya, hasil run ini dicatat sebagai
+baseline untuk kasus tersebut dan dilaporkan; run berikutnya dibandingkan terhadapnya.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.kasus import KASUS
+
+PATH_BASELINE_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Regresi jika median waktu > baseline x AMBANG_WAKTU dan selisihnya melebihi TOLERANSI_WAKTU_DETIK
+AMBANG_WAKTU = 1.25
+TOLERANSI_WAKTU_DETIK = 50e-6
+AMBANG_MEMORI = 1.25
+TOLERANSI_MEMORI_BYTE = 64 * 1024
+
+# Ulangan diteruskan sampai total waktu mencapai batas ini (atau MAKS_ULANGAN), minimal MIN_ULANGAN
+TARGET_DETIK_PER_KASUS = 1.0
+MIN_ULANGAN = 3
+MAKS_ULANGAN = 50
+
+def _ukur_sekali(kasus, konteks):
+    if kasus.sebelum is not None:
+        kasus.sebelum(konteks)
+    gc.collect()
+    mulai = time.perf_counter()
+    kasus.jalankan(konteks)
+    return time.perf_counter() - mulai
+
+def _ukur_memori(kasus, konteks):
+    """Puncak alokasi selama satu kali jalankan (numpy melaporkan alokasinya ke tracemalloc)."""
+    if kasus.sebelum is not None:
+        kasus.sebelum(konteks)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kasus.jalankan(konteks)
+        _, puncak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return puncak
+
+def ukur(kasus, ukuran):
+    """Mengukur satu kasus pada satu ukuran; mengembalikan dict hasil."""
+    konteks = kasus.siapkan(ukuran)
+    try:
+        # Satu pemanasan agar impor dan cache pertama tidak ikut diukur
+        _ukur_sekali(kasus, konteks)
+        durasi = []
+        while len(durasi) < MAKS_ULANGAN:
+            durasi.append(_ukur_sekali(kasus, konteks))
+            if len(durasi) >= MIN_ULANGAN and sum(durasi) >= TARGET_DETIK_PER_KASUS:
+                break
+        puncak = _ukur_memori(kasus, konteks)
+    finally:
+        if kasus.bersihkan is not None:
+            kasus.bersihkan(konteks)
+    return {
+        "kasus": kasus.nama,
+        "ukuran": ukuran,
+        "ulangan": len(durasi),
+        "median_detik": statistics.median(durasi),
+        "min_detik": min(durasi),
+        "detik_per_pengukuran": statistics.median(durasi) / ukuran,
+        "puncak_memori_byte": puncak,
+    }
+
+def kunci(hasil):
+    return f"{hasil['kasus']}@{hasil['ukuran']}"
+
+def jalankan_semua(filter_nama=None, ukuran_maks=None, cetak=print):
+    semua = {}
+    for kasus in KASUS:
+        if filter_nama and filter_nama not in kasus.nama:
+            continue
+        for ukuran in kasus.ukuran:
+            if ukuran_maks is not None and ukuran > ukuran_maks:
+                continue
+            hasil = ukur(kasus, ukuran)
+            semua[kunci(hasil)] = hasil
+            cetak(f"{kunci(hasil):<40} {hasil['median_detik'] * 1e3:12.3f} ms  "
+                  f"{hasil['puncak_memori_byte'] / 1024:12.1f} KiB  ({hasil['ulangan']}x)")
+    return semua
+
+def bandingkan(hasil, baseline, ambang_waktu=AMBANG_WAKTU, ambang_memori=AMBANG_MEMORI):
+    """Mengembalikan daftar pesan regresi untuk kasus yang ada di baseline dan hasil."""
+    regresi = []
+    for nama, sekarang in hasil.items():
+        acuan = baseline.get(nama)
+        if acuan is None:
+            continue
+        waktu, waktu_acuan = sekarang["median_detik"], acuan["median_detik"]
+        if waktu > waktu_acuan * ambang_waktu and waktu - waktu_acuan > TOLERANSI_WAKTU_DETIK:
+            regresi.append(f"{nama}: waktu {waktu * 1e3:.3f} ms vs baseline {waktu_acuan * 1e3:.3f} ms "
+                           f"({waktu / waktu_acuan:.2f}x)")
+        memori, memori_acuan = sekarang["puncak_memori_byte"], acuan["puncak_memori_byte"]
+        if memori > memori_acuan * ambang_memori and memori - memori_acuan > TOLERANSI_MEMORI_BYTE:
+            regresi.append(f"{nama}: puncak memori {memori / 1024:.1f} KiB vs baseline {memori_acuan / 1024:.1f} KiB "
+                           f"({memori / max(memori_acuan, 1):.2f}x)")
+    return regresi
+
+def _meta():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "prosesor": platform.processor() or platform.machine(),
+        "waktu": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def _tulis_baseline(path, baseline, hasil, meta):
+    baseline["meta"] = meta
+    baseline["hasil"].update(hasil)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark lapisan kalkulasi dan data dengan ambang regresi.")
+    parser.add_argument("--baseline", default=PATH_BASELINE_DEFAULT, help="File baseline JSON")
+    parser.add_argument("--simpan-baseline", action="store_true", help="Tulis hasil sebagai baseline baru")
+    parser.add_argument("--keluaran", default=None, help="Tulis hasil ke file JSON ini")
+    parser.add_argument("--filter", default=None, help="Hanya kasus yang namanya mengandung teks ini")
+    parser.add_argument("--ukuran-maks", type=int, default=None, help="Lewati ukuran di atas nilai ini")
+    parser.add_argument("--ambang-waktu", type=float, default=AMBANG_WAKTU, help="Rasio waktu terhadap baseline yang dianggap regresi")
+    parser.add_argument("--ambang-memori", type=float, default=AMBANG_MEMORI, help="Rasio puncak memori terhadap baseline yang dianggap regresi")
+    args = parser.parse_args(argv)
+
+    hasil = jalankan_semua(args.filter, args.ukuran_maks)
+    dokumen = {"meta": _meta(), "hasil": hasil}
+
+    if args.keluaran:
+        with open(args.keluaran, "w") as f:
+            json.dump(dokumen, f, indent=2)
+
+    baseline = {"meta": dokumen["meta"], "hasil": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.simpan_baseline:
+        # Baseline lama diperbarui hanya untuk kasus yang dijalankan kali ini
+        _tulis_baseline(args.baseline, baseline, hasil, dokumen["meta"])
+        print(f"Baseline disimpan ke {args.baseline}", file=sys.stderr)
+        return 0
+
+    regresi = bandingkan(hasil, baseline["hasil"], args.ambang_waktu, args.ambang_memori)
+    baru = {nama: nilai for nama, nilai in hasil.items() if nama not in baseline["hasil"]}
+    if baru:
+        # Kasus tanpa acuan tidak dibandingkan kali ini; hasilnya menjadi acuan run berikutnya
+        _tulis_baseline(args.baseline, baseline, baru, dokumen["meta"])
+        print(f"{len(baru)} dari {len(hasil)} kasus belum ada di baseline; hasil run ini dicatat ke {args.baseline}.", file=sys.stderr)
+    for pesan in regresi:
+        print(f"REGRESI {pesan}", file=sys.stderr)
+    if regresi:
+        return 1
+    if len(baru) < len(hasil):
+        print(f"Tidak ada regresi terhadap {args.baseline}.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Kasus benchmark untuk lapisan kalkulasi dan data.
+
+Setiap kasus punya fungsi `siapkan(ukuran)` yang mengembalikan konteks, opsional `sebelum(konteks)`
+yang dipanggil sebelum setiap ulangan, `jalankan(konteks)` yang diukur, dan opsional `bersihkan(konteks)`.
+Hanya `jalankan` yang diukur. `ukuran` adalah jumlah pengukuran.
+Semua kasus berjalan offline dengan file WHO di folder data/ dan basis data SQLite sementara.
+"""
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from src import data_manager
+from src.calculations import (
+    JENIS_KELAMIN, interpolasi, hitung_z_score, interpolasi_batch, hitung_z_score_batch, hitung_batch,
+    hitung_usia_bulan, tentukan_status, label_status, kode_status_batch, kode_status_dari_tinggi,
+)
+from src.penyimpanan import PenyimpananSQLite
+
+# Ukuran untuk kasus vektor/batch; kasus skalar (satu panggilan Python per pengukuran) memakai ukuran
+# yang sama agar setiap titik batch punya pembanding. Kasus skalar 1 juta berjalan beberapa menit;
+# batasi dengan --ukuran-maks saat iterasi lokal.
+UKURAN_BATCH = (1, 100, 10_000, 1_000_000)
+UKURAN_SKALAR = UKURAN_BATCH
+UKURAN_HISTORI = (1, 100, 10_000, 1_000_000)
+
+# Pada dataset histori, setiap anak memiliki paling banyak sekian pengukuran
+PENGUKURAN_PER_ANAK = 50
+
+TANGGAL_AWAL = date(2020, 1, 1)
+
+@dataclass(frozen=True)
+class Kasus:
+    nama: str
+    ukuran: tuple
+    siapkan: object
+    jalankan: object
+    sebelum: object = None
+    bersihkan: object = None
+
+def _acak(ukuran, seed=0):
+    """Data pengukuran sintetis yang wajar: usia 0-1856 hari, tinggi di sekitar median WHO."""
+    rng = np.random.default_rng(seed)
+    usia_hari = rng.integers(0, 1857, ukuran).astype(np.float64)
+    jenis_kelamin = rng.integers(0, 2, ukuran).astype(np.int8)
+    tinggi = 50 + usia_hari * 0.025 + rng.normal(0, 4, ukuran)
+    berat = 3.3 + usia_hari * 0.007 + rng.normal(0, 1, ukuran)
+    return usia_hari, jenis_kelamin, tinggi, berat
+
+def _tabel():
+    return data_manager.baca_tabel_lms_semua()
+
+# --- baca_data ---
+
+def _siapkan_excel(ukuran):
+    folder = tempfile.mkdtemp(prefix="bench-referensi-")
+    path = shutil.copy(data_manager.path_referensi(JENIS_KELAMIN[0]), folder)
+    return {"folder": folder, "path": path}
+
+def _sebelum_excel(konteks):
+    # Tanpa cache proses maupun cache biner: baca_data mengurai Excel dan menulis .npz
+    data_manager._cache_referensi.clear()
+    shutil.rmtree(os.path.join(konteks["folder"], ".cache"), ignore_errors=True)
+
+def _sebelum_cache_biner(konteks):
+    data_manager._cache_referensi.clear()
+
+def _jalankan_baca_data(konteks):
+    data_manager.baca_data(konteks["path"])
+
+def _siapkan_cache_biner(ukuran):
+    konteks = _siapkan_excel(ukuran)
+    data_manager.baca_data(konteks["path"])
+    return konteks
+
+def _siapkan_hangat(ukuran):
+    path = data_manager.path_referensi(JENIS_KELAMIN[0])
+    data_manager.baca_data(path)
+    return {"path": path}
+
+def _bersihkan_folder(konteks):
+    shutil.rmtree(konteks["folder"], ignore_errors=True)
+
+# --- interpolasi dan Z-score ---
+
+def _siapkan_skalar(ukuran):
+    usia_hari, _, tinggi, _ = _acak(ukuran)
+    tabel = _tabel()[0]
+    L, M, S, _ = interpolasi_batch(usia_hari, tabel)
+    return {
+        "tabel": tabel,
+        "usia_hari": usia_hari.astype(int).tolist(),
+        "baris": list(zip(tinggi.tolist(), L.tolist(), M.tolist(), S.tolist())),
+    }
+
+def _jalankan_interpolasi(konteks):
+    tabel = konteks["tabel"]
+    for usia in konteks["usia_hari"]:
+        interpolasi(usia, tabel)
+
+def _jalankan_z_score(konteks):
+    for tinggi, L, M, S in konteks["baris"]:
+        tentukan_status(hitung_z_score(tinggi, L, M, S))
+
+def _siapkan_batch(ukuran):
+    usia_hari, jenis_kelamin, tinggi, berat = _acak(ukuran)
+    return {"usia_hari": usia_hari, "jenis_kelamin": jenis_kelamin, "tinggi": tinggi, "berat": berat, "tabel": _tabel(),
+            "kurva": data_manager.baca_kurva_referensi_semua()}
+
+def _jalankan_interpolasi_batch(konteks):
+    interpolasi_batch(konteks["usia_hari"], konteks["tabel"][0])
+
+def _jalankan_z_score_batch(konteks):
+    L, M, S, _ = interpolasi_batch(konteks["usia_hari"], konteks["tabel"][0])
+    kode_status_batch(hitung_z_score_batch(konteks["tinggi"], L, M, S))
+
+def _jalankan_hitung_batch(konteks):
+    hasil = hitung_batch(konteks["jenis_kelamin"], konteks["usia_hari"], konteks["tinggi"], konteks["tabel"], berat=konteks["berat"])
+    label_status(hasil["kode_status"])
+
+def _jalankan_status_dari_tinggi(konteks):
+    kode_status_dari_tinggi(konteks["usia_hari"], konteks["tinggi"], konteks["kurva"][0])
+
+# --- simpan_histori dan baca_histori ---
+
+def _rekaman(ukuran, seed=0):
+    """Rekaman histori sintetis: anak ke-i memiliki maksimal PENGUKURAN_PER_ANAK pengukuran pada tanggal berbeda."""
+    usia_hari, jenis_kelamin, tinggi, berat = _acak(ukuran, seed)
+    usia_hari = usia_hari.astype(int).tolist()
+    z_score = np.round(np.random.default_rng(seed).normal(-0.5, 1.2, ukuran), 2).tolist()
+    daftar = []
+    for i in range(ukuran):
+        anak, ke = divmod(i, PENGUKURAN_PER_ANAK)
+        daftar.append((
+            f"Anak {anak}", "WARGA", (TANGGAL_AWAL + timedelta(days=ke)).isoformat(), JENIS_KELAMIN[jenis_kelamin[i]],
+            usia_hari[i], round(hitung_usia_bulan(usia_hari[i]), 1), round(float(tinggi[i]), 1), round(float(berat[i]), 1),
+            z_score[i], tentukan_status(z_score[i])[0],
+        ))
+    return daftar
+
+def _arahkan_db(konteks, path_db):
+    # Backend bersama data_manager diarahkan ke basis data sementara; nilai asli dipulihkan _bersihkan_db
+    konteks.setdefault("asal", (data_manager.BACKEND_HISTORI, data_manager.PATH_DB_HISTORI))
+    data_manager._penyimpanan_bersama.pop(path_db, None)
+    data_manager.BACKEND_HISTORI = "sqlite"
+    data_manager.PATH_DB_HISTORI = path_db
+
+def _siapkan_simpan(ukuran):
+    return {"rekaman": _rekaman(ukuran), "folder": tempfile.mkdtemp(prefix="bench-histori-"), "ulangan": 0}
+
+def _sebelum_simpan(konteks):
+    # Basis data kosong yang baru setiap ulangan, sudah berisi skema, agar yang diukur hanya penyimpanan
+    konteks["ulangan"] += 1
+    konteks["path_db"] = os.path.join(konteks["folder"], f"histori-{konteks['ulangan']}.sqlite3")
+    _arahkan_db(konteks, konteks["path_db"])
+    data_manager.dapatkan_penyimpanan()
+
+def _jalankan_simpan_histori(konteks):
+    for nama, _, tanggal, jenis_kelamin, usia_hari, usia_bulan, tinggi, berat, z_score, status in konteks["rekaman"]:
+        data_manager.simpan_histori(date.fromisoformat(tanggal), jenis_kelamin, usia_hari, usia_bulan, tinggi, berat, z_score, status, nama)
+
+def _jalankan_simpan_banyak(konteks):
+    data_manager.dapatkan_penyimpanan().simpan_banyak(konteks["rekaman"])
+
+def _siapkan_baca(ukuran):
+    folder = tempfile.mkdtemp(prefix="bench-histori-")
+    path_db = os.path.join(folder, "histori.sqlite3")
+    PenyimpananSQLite(path_db).simpan_banyak(_rekaman(ukuran))
+    konteks = {"folder": folder, "path_db": path_db}
+    _arahkan_db(konteks, path_db)
+    return konteks
+
+def _sebelum_baca_dingin(konteks):
+    # Backend baru tanpa cache: yang diukur SELECT berindeks, pembangunan BufferHistori, dan DataFrame
+    _arahkan_db(konteks, konteks["path_db"])
+
+def _sebelum_baca_hangat(konteks):
+    if data_manager.PATH_DB_HISTORI != konteks["path_db"]:
+        _arahkan_db(konteks, konteks["path_db"])
+    data_manager.baca_histori("Anak 0")
+
+def _jalankan_baca_histori(konteks):
+    data_manager.baca_histori("Anak 0")
+
+def _bersihkan_db(konteks):
+    if "asal" in konteks:
+        data_manager.BACKEND_HISTORI, data_manager.PATH_DB_HISTORI = konteks["asal"]
+    for path in [path for path in data_manager._penyimpanan_bersama if path.startswith(konteks["folder"])]:
+        del data_manager._penyimpanan_bersama[path]
+    shutil.rmtree(konteks["folder"], ignore_errors=True)
+
+KASUS = [
+    Kasus("baca_data/excel", (1,), _siapkan_excel, _jalankan_baca_data, _sebelum_excel, _bersihkan_folder),
+    Kasus("baca_data/cache_biner", (1,), _siapkan_cache_biner, _jalankan_baca_data, _sebelum_cache_biner, _bersihkan_folder),
+    Kasus("baca_data/hangat", (1,), _siapkan_hangat, _jalankan_baca_data),
+    Kasus("interpolasi/skalar", UKURAN_SKALAR, _siapkan_skalar, _jalankan_interpolasi),
+    Kasus("hitung_z_score/skalar", UKURAN_SKALAR, _siapkan_skalar, _jalankan_z_score),
+    Kasus("interpolasi/batch", UKURAN_BATCH, _siapkan_batch, _jalankan_interpolasi_batch),
+    Kasus("hitung_z_score/batch", UKURAN_BATCH, _siapkan_batch, _jalankan_z_score_batch),
+    Kasus("hitung_batch", UKURAN_BATCH, _siapkan_batch, _jalankan_hitung_batch),
+    Kasus("kode_status/dari_tinggi", UKURAN_BATCH, _siapkan_batch, _jalankan_status_dari_tinggi),
+    Kasus("simpan_histori/satu_per_satu", UKURAN_SKALAR, _siapkan_simpan, _jalankan_simpan_histori, _sebelum_simpan, _bersihkan_db),
+    Kasus("simpan_histori/banyak", UKURAN_HISTORI, _siapkan_simpan, _jalankan_simpan_banyak, _sebelum_simpan, _bersihkan_db),
+    Kasus("baca_histori/dingin", UKURAN_HISTORI, _siapkan_baca, _jalankan_baca_histori, _sebelum_baca_dingin, _bersihkan_db),
+    Kasus("baca_histori/hangat", UKURAN_HISTORI, _siapkan_baca, _jalankan_baca_histori, _sebelum_baca_hangat, _bersihkan_db),
+]
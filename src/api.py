@@ -0,0 +1,440 @@
+"""Layanan HTTP ringan (asyncio, tanpa layanan eksternal) untuk perhitungan Z-score TB/U.
+
+Contoh:
+    python -m src.api --host 127.0.0.1 --port 8600 --proses 4
+
+Endpoint:
+    GET  /kesehatan        status layanan
+    GET  /metrik           jumlah permintaan serta latensi p50/p99 per endpoint (per proses)
+    POST /z-score          satu pengukuran (JSON)
+    POST /z-score/batch    banyak pengukuran: JSON kolumnar, CSV (text/csv), atau Arrow IPC
+                           (application/vnd.apache.arrow.stream); respons mengikuti format
+                           permintaan kecuali header Accept meminta format lain.
+
+Kolom masukan: jenis_kelamin ("Laki-laki"/"Perempuan" atau 0/1), usia_hari atau
+tanggal_lahir + tanggal_ukur (YYYY-MM-DD), tinggi, dan opsional berat (sel kosong atau null berarti
+tidak diisi). Batch divalidasi per baris
+dengan aturan yang sama seperti endpoint tunggal; baris yang ditolak berisi alasan di kolom
+keterangan (kosong jika valid) dengan z_score null dan status kosong.
+"""
+import argparse
+import asyncio
+import collections
+import csv
+import io
+import json
+import multiprocessing
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+from src.calculations import (
+    JENIS_KELAMIN, DAFTAR_STATUS, KODE_STATUS_TIDAK_VALID, hitung_batch, hitung_usia_hari, hitung_usia_bulan,
+    interpolasi_dengan_flag, hitung_z_score, tentukan_status, validasi_tinggi, validasi_berat, validasi_batch,
+    label_status, kode_jenis_kelamin,
+)
+from src.data_manager import baca_kurva_referensi_semua, baca_tabel_lms_semua
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TIPE_JSON = "application/json"
+TIPE_CSV = "text/csv"
+TIPE_ARROW = "application/vnd.apache.arrow.stream"
+
+UKURAN_BODY_MAKS = 64 * 1024 * 1024
+JUMLAH_SAMPEL_LATENSI = 10_000
+
+# Batch sebesar ini atau lebih dihitung di thread agar event loop tetap melayani permintaan lain
+AMBANG_BATCH_THREAD = 10_000
+
+STATUS_HTTP = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+    413: "Payload Too Large", 415: "Unsupported Media Type", 422: "Unprocessable Entity", 500: "Internal Server Error",
+}
+
+class GalatPermintaan(Exception):
+    """Kesalahan permintaan yang dikembalikan ke klien dengan kode status HTTP tertentu."""
+
+    def __init__(self, status, pesan):
+        super().__init__(pesan)
+        self.status = status
+
+def _ke_python(nilai):
+    """Mengubah array NumPy menjadi list untuk modul json (NaN menjadi null)."""
+    if isinstance(nilai, dict):
+        return {k: _ke_python(v) for k, v in nilai.items()}
+    if isinstance(nilai, np.ndarray):
+        if nilai.dtype.kind == "f":
+            return [None if x != x else x for x in nilai.tolist()]
+        return nilai.tolist()
+    if isinstance(nilai, float) and nilai != nilai:
+        return None
+    return nilai
+
+def _json_dumps(data):
+    if orjson is not None:
+        # orjson menulis NaN sebagai null dan menserialisasi array NumPy secara langsung
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_ke_python(data), allow_nan=False).encode()
+
+def _json_loads(body):
+    try:
+        return orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError as e:
+        raise GalatPermintaan(400, f"Body JSON tidak valid: {str(e)}")
+
+def _impor_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError:
+        raise GalatPermintaan(415, "Format Arrow memerlukan paket pyarrow di server.")
+    return pa
+
+def _usia_hari_tunggal(data):
+    if "usia_hari" in data:
+        usia_hari = float(data["usia_hari"])
+        if not usia_hari.is_integer():
+            raise GalatPermintaan(422, "usia_hari harus bilangan bulat.")
+        return int(usia_hari)
+    return hitung_usia_hari(date.fromisoformat(data["tanggal_lahir"]), date.fromisoformat(data["tanggal_ukur"]))
+
+def _angka_tunggal(data, nama):
+    nilai = float(data[nama])
+    if not np.isfinite(nilai):
+        raise GalatPermintaan(422, f"{nama} harus berupa angka.")
+    return nilai
+
+def _kosong(nilai):
+    return nilai is None or (isinstance(nilai, str) and not nilai.strip())
+
+def _kolom_angka(nilai):
+    """Mengubah kolom menjadi array float64 per baris: sel kosong menjadi NaN, sel yang bukan angka menjadi inf.
+
+    Dengan begitu satu sel rusak hanya menolak barisnya (lihat z_score_batch), bukan seluruh batch.
+    """
+    try:
+        return np.asarray(nilai, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    def ke_angka(x):
+        if _kosong(x):
+            return np.nan
+        try:
+            angka = float(x)
+        except (TypeError, ValueError):
+            return np.inf
+        return angka if angka == angka else np.nan
+
+    return np.array([ke_angka(x) for x in nilai], dtype=np.float64)
+
+def _kolom_tanggal(nilai):
+    """Mengubah kolom tanggal YYYY-MM-DD menjadi datetime64[D]; sel kosong atau tidak valid menjadi NaT."""
+    try:
+        return np.asarray(nilai, dtype="datetime64[D]")
+    except (TypeError, ValueError):
+        pass
+
+    def ke_tanggal(x):
+        try:
+            return np.datetime64(date.fromisoformat(str(x).strip()), "D")
+        except ValueError:
+            return np.datetime64("NaT")
+
+    return np.array([ke_tanggal(x) for x in nilai], dtype="datetime64[D]")
+
+def _usia_hari_kolom(kolom):
+    """Usia hari per baris; NaN untuk tanggal kosong atau tidak valid."""
+    if "usia_hari" in kolom:
+        return _kolom_angka(kolom["usia_hari"])
+    selisih = _kolom_tanggal(kolom["tanggal_ukur"]) - _kolom_tanggal(kolom["tanggal_lahir"])
+    return np.where(np.isnat(selisih), np.nan, selisih.astype(np.int64).astype(np.float64))
+
+def _baca_kolom(tipe, body):
+    """Mengurai body batch menjadi dict nama kolom -> array/list."""
+    if tipe == TIPE_JSON:
+        kolom = _json_loads(body)
+        if not isinstance(kolom, dict):
+            raise GalatPermintaan(400, "Body JSON batch harus berupa objek kolumnar: {\"kolom\": [nilai, ...]}.")
+        return kolom
+    if tipe == TIPE_CSV:
+        baris = csv.reader(io.StringIO(body.decode("utf-8")))
+        header = next(baris, None)
+        if header is None:
+            return {}
+        nilai = list(zip(*baris)) or [()] * len(header)
+        return {nama.strip(): list(isi) for nama, isi in zip(header, nilai)}
+    if tipe == TIPE_ARROW:
+        pa = _impor_pyarrow()
+        tabel = pa.ipc.open_stream(body).read_all()
+        return {nama: tabel.column(nama).to_numpy(zero_copy_only=False) for nama in tabel.column_names}
+    raise GalatPermintaan(415, f"Content-Type {tipe} tidak didukung. Gunakan {TIPE_JSON}, {TIPE_CSV}, atau {TIPE_ARROW}.")
+
+def _tulis_kolom(tipe, hasil):
+    """Menserialisasi dict kolom hasil batch sesuai format respons."""
+    if tipe == TIPE_JSON:
+        return _json_dumps(hasil)
+    if tipe == TIPE_CSV:
+        keluaran = io.StringIO()
+        penulis = csv.writer(keluaran)
+        nama_kolom = list(hasil)
+        penulis.writerow(nama_kolom)
+        penulis.writerows(zip(*(_ke_python(hasil[nama]) for nama in nama_kolom)))
+        return keluaran.getvalue().encode("utf-8")
+    pa = _impor_pyarrow()
+    tabel = pa.table({nama: pa.array(nilai) for nama, nilai in hasil.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tabel.schema) as penulis:
+        penulis.write_table(tabel)
+    return sink.getvalue().to_pybytes()
+
+class LayananZScore:
+    """Menangani permintaan HTTP dan mencatat latensi per endpoint. Tabel referensi dimuat saat dibuat."""
+
+    def __init__(self):
+        self.tabel_per_jk = baca_tabel_lms_semua()
+        self.kurva_per_jk = baca_kurva_referensi_semua()
+        self.latensi = collections.defaultdict(lambda: collections.deque(maxlen=JUMLAH_SAMPEL_LATENSI))
+        self.jumlah = collections.Counter()
+        self.rute = {
+            ("GET", "/kesehatan"): self.kesehatan,
+            ("GET", "/metrik"): self.metrik,
+            ("POST", "/z-score"): self.z_score,
+            ("POST", "/z-score/batch"): self.z_score_batch,
+        }
+
+    def catat(self, rute, durasi):
+        self.latensi[rute].append(durasi)
+        self.jumlah[rute] += 1
+
+    async def tangani(self, metode, path, header, body):
+        """Mengembalikan (status, content-type, isi respons)."""
+        penangan = self.rute.get((metode, path))
+        if penangan is None:
+            status = 405 if any(p == path for _, p in self.rute) else 404
+            return status, TIPE_JSON, _json_dumps({"error": STATUS_HTTP[status]})
+        try:
+            return await penangan(header, body)
+        except GalatPermintaan as e:
+            return e.status, TIPE_JSON, _json_dumps({"error": str(e)})
+        except (KeyError, ValueError, TypeError) as e:
+            pesan = f"Kolom {e} wajib diisi." if isinstance(e, KeyError) else str(e)
+            return 400, TIPE_JSON, _json_dumps({"error": pesan})
+
+    async def kesehatan(self, header, body):
+        return 200, TIPE_JSON, _json_dumps({"status": "ok"})
+
+    async def metrik(self, header, body):
+        data = {}
+        for rute, sampel in self.latensi.items():
+            if not sampel:
+                continue
+            p50, p99 = np.percentile(np.fromiter(sampel, dtype=np.float64), [50, 99]) * 1000
+            data[rute] = {"jumlah": self.jumlah[rute], "p50_ms": round(float(p50), 3), "p99_ms": round(float(p99), 3)}
+        return 200, TIPE_JSON, _json_dumps(data)
+
+    async def z_score(self, header, body):
+        data = _json_loads(body)
+        if not isinstance(data, dict):
+            raise GalatPermintaan(400, "Body JSON harus berupa objek.")
+        kode_jk = int(kode_jenis_kelamin(np.array([data.get("jenis_kelamin")], dtype=object))[0])
+        if kode_jk < 0:
+            raise GalatPermintaan(422, f"jenis_kelamin harus salah satu dari: {', '.join(JENIS_KELAMIN)}.")
+        tabel = self.tabel_per_jk[kode_jk]
+        usia_hari = _usia_hari_tunggal(data)
+        usia_bulan = usia_hari / 30.4375
+        tinggi = _angka_tunggal(data, "tinggi")
+
+        # Aturan validasi sama dengan form pengukuran di UI
+        if usia_hari <= 0:
+            raise GalatPermintaan(422, "Tanggal lahir tidak valid untuk pengukuran!")
+        if usia_hari > tabel.hari_akhir:
+            raise GalatPermintaan(422, f"Usia anak ({usia_hari} hari) melebihi rentang data referensi WHO (maksimum {tabel.hari_akhir} hari).")
+        valid, pesan = validasi_tinggi(tinggi, usia_bulan)
+        if not valid:
+            raise GalatPermintaan(422, pesan)
+        if data.get("berat") is not None:
+            valid, pesan = validasi_berat(_angka_tunggal(data, "berat"), usia_bulan)
+            if not valid:
+                raise GalatPermintaan(422, pesan)
+
+        L, M, S, penjepitan = interpolasi_dengan_flag(usia_hari, tabel)
+        z_score = hitung_z_score(tinggi, L, M, S)
+        status, pesan = tentukan_status(z_score)
+        return 200, TIPE_JSON, _json_dumps({
+            "usia_hari": usia_hari, "L": L, "M": M, "S": S,
+            "z_score": z_score, "kode_status": DAFTAR_STATUS.index(status), "status": status, "pesan": pesan,
+            "penjepitan": penjepitan,
+        })
+
+    async def z_score_batch(self, header, body):
+        tipe_masuk = header.get("content-type", TIPE_JSON).split(";")[0].strip()
+        tipe_keluar = header.get("accept", "").split(";")[0].strip()
+        if tipe_keluar not in (TIPE_JSON, TIPE_CSV, TIPE_ARROW):
+            tipe_keluar = tipe_masuk
+        kolom = _baca_kolom(tipe_masuk, body)
+
+        def hitung():
+            kode_jk = kode_jenis_kelamin(np.asarray(kolom["jenis_kelamin"]))
+            usia_hari = _usia_hari_kolom(kolom)
+            tinggi = _kolom_angka(kolom["tinggi"])
+            berat = kolom.get("berat")
+            berat = np.full(tinggi.shape, np.nan) if berat is None else _kolom_angka(berat)
+            hasil = hitung_batch(kode_jk, usia_hari, tinggi, self.tabel_per_jk, kurva_per_jk=self.kurva_per_jk)
+
+            # Aturan dan urutan pemeriksaan sama dengan endpoint tunggal; berat kosong (NaN) tidak diperiksa
+            hari_akhir = np.array([tabel.hari_akhir for tabel in self.tabel_per_jk])[np.maximum(kode_jk, 0)]
+            valid_tinggi, valid_berat = validasi_batch(tinggi, berat, hitung_usia_bulan(usia_hari))
+            with np.errstate(invalid='ignore'):
+                keterangan = np.select(
+                    [
+                        kode_jk < 0,
+                        ~np.isfinite(usia_hari),
+                        usia_hari != np.floor(usia_hari),
+                        usia_hari <= 0,
+                        usia_hari > hari_akhir,
+                        ~np.isfinite(tinggi),
+                        ~valid_tinggi,
+                        np.isinf(berat),
+                        ~np.isnan(berat) & ~valid_berat,
+                    ],
+                    [
+                        f"jenis_kelamin harus salah satu dari: {', '.join(JENIS_KELAMIN)}.",
+                        "Tanggal atau usia_hari tidak valid.",
+                        "usia_hari harus bilangan bulat.",
+                        "Tanggal lahir tidak valid untuk pengukuran!",
+                        "Usia anak melebihi rentang data referensi WHO.",
+                        "tinggi harus berupa angka.",
+                        "Tinggi tidak wajar untuk usia.",
+                        "berat harus berupa angka.",
+                        "Berat tidak wajar untuk usia.",
+                    ],
+                    default="",
+                )
+            ditolak = keterangan != ""
+            hasil["z_score"] = np.where(ditolak, np.nan, hasil["z_score"])
+            hasil["kode_status"] = np.where(ditolak, KODE_STATUS_TIDAK_VALID, hasil["kode_status"])
+            hasil["status"] = label_status(hasil["kode_status"]).tolist()
+            hasil["keterangan"] = keterangan.tolist()
+            return _tulis_kolom(tipe_keluar, hasil)
+
+        if len(kolom.get("tinggi", ())) >= AMBANG_BATCH_THREAD:
+            isi = await asyncio.get_running_loop().run_in_executor(None, hitung)
+        else:
+            isi = hitung()
+        return 200, tipe_keluar, isi
+
+def _respons(status, tipe, isi, tetap_hidup):
+    kepala = (
+        f"HTTP/1.1 {status} {STATUS_HTTP.get(status, '')}\r\n"
+        f"Content-Type: {tipe}\r\n"
+        f"Content-Length: {len(isi)}\r\n"
+        f"Connection: {'keep-alive' if tetap_hidup else 'close'}\r\n\r\n"
+    )
+    return kepala.encode("latin-1") + isi
+
+async def _tangani_koneksi(layanan, reader, writer):
+    """Melayani satu koneksi HTTP/1.1 (keep-alive) sampai klien menutupnya."""
+    try:
+        while True:
+            try:
+                kepala = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            baris_pertama, *baris_header = kepala.decode("latin-1").split("\r\n")
+            try:
+                metode, target, versi = baris_pertama.split(" ", 2)
+            except ValueError:
+                writer.write(_respons(400, TIPE_JSON, _json_dumps({"error": "Baris permintaan tidak valid."}), False))
+                break
+            header = {}
+            for baris in baris_header:
+                if baris:
+                    nama, _, nilai = baris.partition(":")
+                    header[nama.strip().lower()] = nilai.strip()
+
+            koneksi = header.get("connection", "").lower()
+            tetap_hidup = koneksi == "keep-alive" if versi == "HTTP/1.0" else koneksi != "close"
+
+            if "chunked" in header.get("transfer-encoding", "").lower():
+                writer.write(_respons(411, TIPE_JSON, _json_dumps({"error": "Gunakan Content-Length."}), False))
+                break
+            try:
+                panjang = int(header.get("content-length") or 0)
+            except ValueError:
+                panjang = -1
+            if panjang < 0:
+                writer.write(_respons(400, TIPE_JSON, _json_dumps({"error": "Content-Length tidak valid."}), False))
+                break
+            if panjang > UKURAN_BODY_MAKS:
+                writer.write(_respons(413, TIPE_JSON, _json_dumps({"error": STATUS_HTTP[413]}), False))
+                break
+            body = await reader.readexactly(panjang) if panjang else b""
+
+            path = target.split("?", 1)[0]
+            mulai = time.perf_counter()
+            try:
+                status, tipe, isi = await layanan.tangani(metode, path, header, body)
+            except Exception as e:
+                status, tipe, isi = 500, TIPE_JSON, _json_dumps({"error": f"Terjadi kesalahan: {str(e)}"})
+            # Path tak dikenal digabung agar jumlah kunci metrik tetap terbatas
+            rute = f"{metode} {path}" if (metode, path) in layanan.rute else "lainnya"
+            layanan.catat(rute, time.perf_counter() - mulai)
+
+            writer.write(_respons(status, tipe, isi, tetap_hidup))
+            await writer.drain()
+            if not tetap_hidup:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def layani(host, port, reuse_port=False):
+    """Menjalankan server pada event loop aktif sampai dibatalkan."""
+    layanan = LayananZScore()
+    server = await asyncio.start_server(
+        lambda r, w: _tangani_koneksi(layanan, r, w), host, port, reuse_port=reuse_port, limit=64 * 1024,
+    )
+    async with server:
+        await server.serve_forever()
+
+def _jalankan_proses(host, port, reuse_port):
+    try:
+        asyncio.run(layani(host, port, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP Z-score TB/U WHO.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--proses", type=int, default=1, help="Jumlah proses server (berbagi port dengan SO_REUSEPORT)")
+    args = parser.parse_args(argv)
+
+    print(f"Melayani di http://{args.host}:{args.port} dengan {args.proses} proses.", file=sys.stderr)
+    if args.proses <= 1:
+        _jalankan_proses(args.host, args.port, False)
+        return 0
+
+    daftar_proses = [
+        multiprocessing.Process(target=_jalankan_proses, args=(args.host, args.port, True), daemon=True)
+        for _ in range(args.proses)
+    ]
+    for proses in daftar_proses:
+        proses.start()
+    try:
+        for proses in daftar_proses:
+            proses.join()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
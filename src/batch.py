@@ -0,0 +1,251 @@
+"""Mode batch tanpa antarmuka untuk skrining roster pengukuran dalam jumlah besar.
+
+Contoh:
+    python -m src.batch roster.csv hasil.csv --ukuran-chunk 50000 --proses 4
+"""
+import argparse
+import collections
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.calculations import JENIS_KELAMIN, hitung_batch, hitung_usia_bulan, label_status, kode_jenis_kelamin
+from src.data_manager import baca_kurva_referensi_semua, baca_tabel_lms_semua
+from src.kualitas import periksa_kualitas
+from src.ekspor import EKSTENSI_ARROW, PenulisKolumnar, baca_batch
+from src.histori import KOLOM_HISTORI
+
+KOLOM_MASUKAN = ["Nama", "Jenis Kelamin", "Tanggal Lahir", "Tanggal", "Tinggi (cm)", "Berat (kg)"]
+KOLOM_HASIL = ["Usia (Hari)", "Usia (Bulan)", "Z-score", "Status", "Keterangan", "Flag Kualitas"]
+UKURAN_CHUNK_DEFAULT = 50_000
+
+def proses_chunk(df):
+    """Menghitung usia, validasi, Z-score, dan status untuk satu chunk roster dengan aturan yang sama seperti form UI.
+
+    Kolom "Flag Kualitas" berisi bitmask src.kualitas (batas Z-score WHO, duplikat, tinggi turun);
+    duplikat dan deret tinggi hanya diperiksa di dalam chunk yang sama.
+    """
+    kolom_hilang = [col for col in KOLOM_MASUKAN if col not in df.columns]
+    if kolom_hilang:
+        raise ValueError(f"Kolom {', '.join(kolom_hilang)} tidak ditemukan dalam file masukan.")
+
+    tabel_per_jk = baca_tabel_lms_semua()
+    usia_maks = min(tabel.hari_akhir for tabel in tabel_per_jk)
+
+    tanggal_lahir = pd.to_datetime(df["Tanggal Lahir"], errors="coerce")
+    tanggal_ukur = pd.to_datetime(df["Tanggal"], errors="coerce")
+    # Setara hitung_usia_hari untuk seluruh kolom
+    usia_hari = (tanggal_ukur - tanggal_lahir).dt.days.to_numpy(dtype=np.float64, na_value=np.nan)
+    hari_ukur = (tanggal_ukur - pd.Timestamp(0)).dt.days.to_numpy(dtype=np.float64, na_value=np.nan)
+    usia_bulan = hitung_usia_bulan(usia_hari)
+    tinggi = pd.to_numeric(df["Tinggi (cm)"], errors="coerce").to_numpy(dtype=np.float64)
+    berat = pd.to_numeric(df["Berat (kg)"], errors="coerce").to_numpy(dtype=np.float64)
+    jenis_kelamin = kode_jenis_kelamin(df["Jenis Kelamin"].to_numpy())
+
+    # Status dari perbandingan dengan batas tinggi per hari; Z-score tetap dihitung untuk kolom hasil
+    hasil = hitung_batch(jenis_kelamin, usia_hari, tinggi, tabel_per_jk, berat=berat, kurva_per_jk=baca_kurva_referensi_semua())
+
+    # Urutan pemeriksaan mengikuti render_ui; hanya alasan pertama yang dicatat
+    keterangan = np.select(
+        [
+            jenis_kelamin < 0,
+            np.isnan(usia_hari),
+            usia_hari <= 0,
+            usia_hari > usia_maks,
+            ~hasil["valid_tinggi"],
+            ~hasil["valid_berat"],
+        ],
+        [
+            "Jenis kelamin tidak dikenal",
+            "Tanggal tidak valid",
+            "Tanggal lahir tidak valid untuk pengukuran",
+            f"Usia melebihi rentang data referensi WHO (maksimum {usia_maks} hari)",
+            "Tinggi tidak wajar untuk usia",
+            "Berat tidak wajar untuk usia",
+        ],
+        default="",
+    )
+    valid = keterangan == ""
+    z_score = np.where(valid, np.round(hasil["z_score"], 2), np.nan)
+    kode_status = np.where(valid, hasil["kode_status"], -1)
+
+    df = df.copy()
+    df["Usia (Hari)"] = pd.Series(usia_hari, index=df.index).astype("Int64")
+    df["Usia (Bulan)"] = np.round(usia_bulan, 1)
+    df["Z-score"] = z_score
+    df["Status"] = label_status(kode_status)
+    df["Keterangan"] = keterangan
+    df["Flag Kualitas"] = periksa_kualitas(df["Nama"].to_numpy(), hari_ukur, jenis_kelamin, usia_hari, tinggi, berat)
+    return df
+
+def roster_dari_histori(df_histori):
+    """Mengubah histori berkolom KOLOM_HISTORI (mis. hasil ekspor) menjadi roster berkolom KOLOM_MASUKAN.
+
+    Tanggal lahir direkonstruksi dari Tanggal dan Usia (Hari), sehingga proses_chunk menghitung ulang
+    usia, validasi, Z-score, status, dan flag kualitas; Z-score dan Status dari file diabaikan.
+    Kolom JenisPenginput dibawa apa adanya.
+    """
+    tanggal = pd.to_datetime(df_histori["Tanggal"], errors="coerce")
+    usia_hari = pd.to_numeric(df_histori["Usia (Hari)"], errors="coerce")
+    return pd.DataFrame({
+        "Nama": df_histori["Nama"].astype(object),
+        "Jenis Kelamin": df_histori["Jenis Kelamin"].astype(object),
+        "Tanggal Lahir": tanggal - pd.to_timedelta(usia_hari, unit="D"),
+        "Tanggal": tanggal,
+        "Tinggi (cm)": df_histori["Tinggi (cm)"],
+        "Berat (kg)": df_histori["Berat (kg)"],
+        "JenisPenginput": df_histori["JenisPenginput"].astype(object),
+    })
+
+def rekaman_histori(df, jenis_penginput=None, lewati_flag_kualitas=True):
+    """Mengubah baris hasil proses_chunk yang lolos pemeriksaan menjadi DataFrame berkolom KOLOM_HISTORI.
+
+    Tanpa `jenis_penginput`, kolom JenisPenginput dari masukan dipakai (impor histori).
+    """
+    lolos = (df["Keterangan"] == "") & df["Nama"].notna()
+    if lewati_flag_kualitas:
+        lolos &= df["Flag Kualitas"] == 0
+    df = df.loc[lolos]
+    return pd.DataFrame({
+        "Nama": df["Nama"].astype(str),
+        "JenisPenginput": df["JenisPenginput"] if jenis_penginput is None else jenis_penginput,
+        "Tanggal": pd.to_datetime(df["Tanggal"]).dt.strftime("%Y-%m-%d"),
+        # Roster boleh memakai kode 0/1; histori selalu menyimpan label agar agregat dan tabel lookup konsisten
+        "Jenis Kelamin": np.asarray(JENIS_KELAMIN, dtype=object)[kode_jenis_kelamin(df["Jenis Kelamin"].to_numpy())],
+        "Usia (Hari)": df["Usia (Hari)"].astype("int64"),
+        "Usia (Bulan)": df["Usia (Bulan)"],
+        "Tinggi (cm)": pd.to_numeric(df["Tinggi (cm)"]).astype(float),
+        "Berat (kg)": pd.to_numeric(df["Berat (kg)"]).astype(float),
+        "Z-score": df["Z-score"],
+        "Status": df["Status"],
+    }, columns=KOLOM_HISTORI)
+
+def baca_chunk(path, ukuran_chunk=UKURAN_CHUNK_DEFAULT):
+    """Membaca file roster (CSV, Parquet, Arrow IPC, atau xlsx) sebagai rangkaian DataFrame berukuran tetap."""
+    ekstensi = os.path.splitext(path)[1].lower()
+    if ekstensi == ".csv":
+        yield from pd.read_csv(path, chunksize=ukuran_chunk)
+    elif ekstensi == ".parquet" or ekstensi in EKSTENSI_ARROW:
+        # Hanya kolom masukan yang dibaca dari file kolumnar
+        for batch in baca_batch(path, KOLOM_MASUKAN, ukuran_chunk):
+            yield batch.to_pandas()
+    elif ekstensi == ".xlsx":
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            baris = workbook.active.iter_rows(values_only=True)
+            header = next(baris, None)
+            if header is None:
+                return
+            penampung = []
+            for nilai in baris:
+                penampung.append(nilai)
+                if len(penampung) == ukuran_chunk:
+                    yield pd.DataFrame(penampung, columns=header)
+                    penampung = []
+            if penampung:
+                yield pd.DataFrame(penampung, columns=header)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Format file {ekstensi} tidak didukung. Gunakan .csv, .parquet, .arrow, atau .xlsx.")
+
+class PenulisHasil:
+    """Menulis hasil skrining secara bertahap, satu chunk sekali tulis (CSV, Parquet, atau Arrow IPC)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.ekstensi = os.path.splitext(path)[1].lower()
+        if self.ekstensi not in (".csv", ".parquet") + EKSTENSI_ARROW:
+            raise ValueError(f"Format keluaran {self.ekstensi} tidak didukung. Gunakan .csv, .parquet, atau .arrow.")
+        # Parquet/Arrow: satu row group (atau record batch) terkompresi per chunk
+        self._penulis_kolumnar = None if self.ekstensi == ".csv" else PenulisKolumnar(path)
+        self._chunk_pertama = True
+
+    def tulis(self, df):
+        if self._penulis_kolumnar is None:
+            df.to_csv(self.path, mode="w" if self._chunk_pertama else "a", header=self._chunk_pertama, index=False)
+        else:
+            self._penulis_kolumnar.tulis_dataframe(_ringkas(df))
+        self._chunk_pertama = False
+
+    def tutup(self):
+        if self._penulis_kolumnar is not None:
+            self._penulis_kolumnar.tutup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tutup()
+
+def _ringkas(df):
+    """Tipe ringkas untuk keluaran kolumnar: teks berulang sebagai kategori, angka hasil sebagai float32/int32."""
+    return df.astype({
+        "Jenis Kelamin": "category",
+        "Status": "category",
+        "Keterangan": "category",
+        "Usia (Hari)": "Int32",
+        "Usia (Bulan)": "float32",
+        "Z-score": "float32",
+        "Flag Kualitas": "uint8",
+    })
+
+def proses_file(path_masukan, path_keluaran, ukuran_chunk=UKURAN_CHUNK_DEFAULT, jumlah_proses=1):
+    """Memproses roster secara streaming dan mengembalikan (jumlah baris, jumlah baris tidak valid).
+
+    Dengan jumlah_proses > 1, chunk dibagi ke process pool. Jumlah chunk yang sedang diproses
+    dibatasi sehingga pemakaian memori tetap datar berapa pun ukuran file, dan urutan keluaran
+    tetap sama dengan urutan masukan.
+    """
+    jumlah_baris = 0
+    jumlah_tidak_valid = 0
+
+    with PenulisHasil(path_keluaran) as penulis:
+        def tulis(df):
+            nonlocal jumlah_baris, jumlah_tidak_valid
+            penulis.tulis(df)
+            jumlah_baris += len(df)
+            jumlah_tidak_valid += int((df["Keterangan"] != "").sum())
+
+        if jumlah_proses <= 1:
+            for chunk in baca_chunk(path_masukan, ukuran_chunk):
+                tulis(proses_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=jumlah_proses, initializer=baca_tabel_lms_semua) as pool:
+                antrean = collections.deque()
+                for chunk in baca_chunk(path_masukan, ukuran_chunk):
+                    antrean.append(pool.submit(proses_chunk, chunk))
+                    if len(antrean) >= 2 * jumlah_proses:
+                        tulis(antrean.popleft().result())
+                while antrean:
+                    tulis(antrean.popleft().result())
+
+    return jumlah_baris, jumlah_tidak_valid
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Skrining status pertumbuhan (Z-score TB/U WHO) untuk roster pengukuran.")
+    parser.add_argument("masukan", help="File roster (.csv, .parquet, .arrow, atau .xlsx) dengan kolom: " + ", ".join(KOLOM_MASUKAN))
+    parser.add_argument("keluaran", help="File hasil (.csv, .parquet, atau .arrow)")
+    parser.add_argument("--ukuran-chunk", type=int, default=UKURAN_CHUNK_DEFAULT, help="Jumlah baris per chunk")
+    parser.add_argument("--proses", type=int, default=1, help="Jumlah proses paralel (default 1)")
+    args = parser.parse_args(argv)
+
+    mulai = time.perf_counter()
+    try:
+        jumlah_baris, jumlah_tidak_valid = proses_file(args.masukan, args.keluaran, args.ukuran_chunk, args.proses)
+    except (FileNotFoundError, ValueError, ImportError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    durasi = time.perf_counter() - mulai
+
+    print(f"{jumlah_baris} baris diproses ({jumlah_tidak_valid} tidak valid) dalam {durasi:.2f} detik "
+          f"({jumlah_baris / max(durasi, 1e-9):,.0f} baris/detik).", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
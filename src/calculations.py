@@ -1,27 +1,134 @@
 import math
-import streamlit as st
+import bisect
+import numpy as np
+from dataclasses import dataclass
 
-def interpolasi(usia_hari, df):
-    """Melakukan interpolasi linier untuk mendapatkan L, M, S berdasarkan usia."""
-    if usia_hari < df['Day'].min():
-        st.warning(f"Usia {usia_hari} hari terlalu muda. Menggunakan data usia minimum: {df['Day'].min()} hari.")
-        return df.iloc[0]['L'], df.iloc[0]['M'], df.iloc[0]['S']
+# Urutan label menentukan kode numerik yang dipakai API batch
+JENIS_KELAMIN = ("Laki-laki", "Perempuan")
+DAFTAR_STATUS = ("Sangat Pendek (Severely Stunted)", "Pendek (Stunted)", "Normal", "Tinggi", "Sangat Tinggi")
+KODE_STATUS_TIDAK_VALID = -1
+
+# Batas atas (eksklusif) kelompok usia dalam bulan dan rentang wajar (min, maks) per kelompok
+BATAS_KELOMPOK_USIA = (1, 12, 24, 36, 60)
+RENTANG_TINGGI = ((40, 60), (45, 85), (65, 95), (75, 105), (85, 120), (95, 140))
+RENTANG_BERAT = ((2, 5), (3, 12), (7, 15), (9, 18), (10, 22), (12, 25))
+
+@dataclass(frozen=True)
+class TabelLMS:
+    """Parameter L, M, S WHO sebagai array kontigu yang diindeks langsung dengan hari usia."""
+    hari_awal: int
+    L: np.ndarray
+    M: np.ndarray
+    S: np.ndarray
+
+    @property
+    def hari_akhir(self):
+        return self.hari_awal + len(self.M) - 1
+
+@dataclass(frozen=True)
+class KurvaReferensi:
+    """Kurva tinggi referensi per hari: baris ke-i dari `tinggi` adalah kurva untuk Z-score `z[i]`.
+
+    Kurva pada Z_BATAS_STATUS juga menjadi tabel batas tinggi untuk klasifikasi status
+    (lihat kode_status_dari_tinggi); `lms` dipakai untuk usia pecahan.
+    """
+    hari: np.ndarray
+    z: tuple
+    tinggi: np.ndarray
+    lms: TabelLMS
+
+    def kurva(self, z_score):
+        return self.tinggi[self.z.index(z_score)]
+
+# Z-score yang digambar sebagai kurva/pita referensi pada grafik; harus memuat Z_BATAS_STATUS
+Z_KURVA_REFERENSI = (-3, -2, 0, 2, 3)
+
+# Batas Z-score antar status pada DAFTAR_STATUS, dari bawah ke atas
+Z_BATAS_STATUS = (-3, -2, 2, 3)
+
+def bangun_tabel_lms(hari, L, M, S):
+    """Membangun TabelLMS padat (satu baris per hari); hari yang tidak ada di tabel sumber diisi interpolasi linier."""
+    hari = np.asarray(hari, dtype=np.float64)
+    urutan = np.argsort(hari, kind='stable')
+    hari = hari[urutan]
+    hari_awal = int(math.ceil(hari[0]))
+    hari_akhir = int(math.floor(hari[-1]))
+    grid = np.arange(hari_awal, hari_akhir + 1, dtype=np.float64)
     
-    if usia_hari > df['Day'].max():
-        st.warning(f"Usia {usia_hari} hari melebihi data referensi. Menggunakan data usia maksimum: {df['Day'].max()} hari.")
-        return df.iloc[-1]['L'], df.iloc[-1]['M'], df.iloc[-1]['S']
+    def padat(nilai):
+        arr = np.ascontiguousarray(np.interp(grid, hari, np.asarray(nilai, dtype=np.float64)[urutan]))
+        arr.setflags(write=False)  # dipakai bersama oleh semua sesi
+        return arr
     
-    df_bawah = df[df['Day'] <= usia_hari].iloc[-1]
-    df_atas = df[df['Day'] >= usia_hari].iloc[0]
+    return TabelLMS(hari_awal, padat(L), padat(M), padat(S))
+
+def hitung_tinggi_dari_z(z_score, L, M, S):
+    """Rumus LMS terbalik (vektor): nilai pengukuran yang bersesuaian dengan Z-score tertentu."""
+    z_score = np.asarray(z_score, dtype=np.float64)
+    L = np.asarray(L, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        cabang_log = np.abs(L) < 1e-7
+        L_aman = np.where(cabang_log, 1.0, L)
+        tinggi = np.where(cabang_log, M * np.exp(S * z_score), M * (1 + L_aman * S * z_score) ** (1 / L_aman))
+    return tinggi
+
+def bangun_kurva_referensi(tabel, z_scores=Z_KURVA_REFERENSI):
+    """Menghitung kurva tinggi per hari untuk setiap Z-score dalam satu operasi vektor."""
+    hari = np.arange(tabel.hari_awal, tabel.hari_akhir + 1)
+    z = np.asarray(z_scores, dtype=np.float64)[:, np.newaxis]
+    tinggi = np.ascontiguousarray(hitung_tinggi_dari_z(z, tabel.L, tabel.M, tabel.S))
+    hari.setflags(write=False)
+    tinggi.setflags(write=False)
+    return KurvaReferensi(hari, tuple(z_scores), tinggi, tabel)
+
+def interpolasi_dengan_flag(usia_hari, tabel):
+    """Mendapatkan L, M, S untuk usia tertentu beserta flag penjepitan usia.
+    
+    Usia dalam hari bulat dibaca langsung dari indeks array; interpolasi linier
+    hanya dilakukan untuk usia pecahan. `tabel` berupa TabelLMS, atau DataFrame
+    dengan kolom Day, L, M, S (dikonversi terlebih dahulu, lebih lambat).
+    
+    Flag bernilai None jika usia berada dalam rentang tabel. Jika usia dijepit ke
+    batas tabel, flag berupa dict dengan kunci alasan ("terlalu_muda" atau
+    "melebihi_referensi"), usia_hari, usia_dipakai, dan pesan.
+    """
+    if not isinstance(tabel, TabelLMS):
+        tabel = bangun_tabel_lms(tabel['Day'], tabel['L'], tabel['M'], tabel['S'])
+    
+    if usia_hari < tabel.hari_awal:
+        flag = {
+            "alasan": "terlalu_muda",
+            "usia_hari": usia_hari,
+            "usia_dipakai": tabel.hari_awal,
+            "pesan": f"Usia {usia_hari} hari terlalu muda. Menggunakan data usia minimum: {tabel.hari_awal} hari.",
+        }
+        return float(tabel.L[0]), float(tabel.M[0]), float(tabel.S[0]), flag
+    
+    if usia_hari > tabel.hari_akhir:
+        flag = {
+            "alasan": "melebihi_referensi",
+            "usia_hari": usia_hari,
+            "usia_dipakai": tabel.hari_akhir,
+            "pesan": f"Usia {usia_hari} hari melebihi data referensi. Menggunakan data usia maksimum: {tabel.hari_akhir} hari.",
+        }
+        return float(tabel.L[-1]), float(tabel.M[-1]), float(tabel.S[-1]), flag
     
-    if df_bawah['Day'] == df_atas['Day']:
-        return df_bawah['L'], df_bawah['M'], df_bawah['S']
+    posisi = usia_hari - tabel.hari_awal
+    i = int(posisi)
+    proporsi = posisi - i
     
-    proporsi = (usia_hari - df_bawah['Day']) / (df_atas['Day'] - df_bawah['Day'])
-    L = df_bawah['L'] + proporsi * (df_atas['L'] - df_bawah['L'])
-    M = df_bawah['M'] + proporsi * (df_atas['M'] - df_bawah['M'])
-    S = df_bawah['S'] + proporsi * (df_atas['S'] - df_bawah['S'])
+    if proporsi == 0:
+        return float(tabel.L[i]), float(tabel.M[i]), float(tabel.S[i]), None
     
+    L = float(tabel.L[i] + proporsi * (tabel.L[i + 1] - tabel.L[i]))
+    M = float(tabel.M[i] + proporsi * (tabel.M[i + 1] - tabel.M[i]))
+    S = float(tabel.S[i] + proporsi * (tabel.S[i + 1] - tabel.S[i]))
+    
+    return L, M, S, None
+
+def interpolasi(usia_hari, tabel):
+    """Mendapatkan L, M, S untuk usia tertentu; usia di luar rentang dijepit ke batas tabel (lihat interpolasi_dengan_flag)."""
+    L, M, S, _ = interpolasi_dengan_flag(usia_hari, tabel)
     return L, M, S
 
 def hitung_z_score(tinggi, L, M, S):
@@ -50,39 +157,18 @@ def tentukan_status(z_score):
 
 def validasi_tinggi(tinggi, usia_bulan):
     """Validasi tinggi berdasarkan usia untuk mencegah input yang tidak masuk akal."""
-    if usia_bulan < 1:
-        min_tinggi, max_tinggi = 40, 60
-    elif usia_bulan < 12:
-        min_tinggi, max_tinggi = 45, 85
-    elif usia_bulan < 24:
-        min_tinggi, max_tinggi = 65, 95
-    elif usia_bulan < 36:
-        min_tinggi, max_tinggi = 75, 105
-    elif usia_bulan < 60:
-        min_tinggi, max_tinggi = 85, 120
-    else:
-        min_tinggi, max_tinggi = 95, 140
+    min_tinggi, max_tinggi = RENTANG_TINGGI[bisect.bisect_right(BATAS_KELOMPOK_USIA, usia_bulan)]
     
-    if tinggi < min_tinggi or tinggi > max_tinggi:
+    # Ditulis sebagai rentang agar NaN ikut ditolak (semua perbandingan dengan NaN bernilai False)
+    if not min_tinggi <= tinggi <= max_tinggi:
         return False, f"Tinggi {tinggi} cm tidak wajar untuk usia {usia_bulan:.1f} bulan. Rentang normal: {min_tinggi}-{max_tinggi} cm."
     return True, ""
 
 def validasi_berat(berat, usia_bulan):
     """Validasi berat badan berdasarkan usia untuk mencegah input yang tidak masuk akal."""
-    if usia_bulan < 1:
-        min_berat, max_berat = 2, 5
-    elif usia_bulan < 12:
-        min_berat, max_berat = 3, 12
-    elif usia_bulan < 24:
-        min_berat, max_berat = 7, 15
-    elif usia_bulan < 36:
-        min_berat, max_berat = 9, 18
-    elif usia_bulan < 60:
-        min_berat, max_berat = 10, 22
-    else:
-        min_berat, max_berat = 12, 25
+    min_berat, max_berat = RENTANG_BERAT[bisect.bisect_right(BATAS_KELOMPOK_USIA, usia_bulan)]
     
-    if berat < min_berat or berat > max_berat:
+    if not min_berat <= berat <= max_berat:
         return False, f"Berat {berat} kg tidak wajar untuk usia {usia_bulan:.1f} bulan. Rentang normal: {min_berat}-{max_berat} kg."
     return True, ""
 
@@ -95,4 +181,173 @@ def hitung_usia_hari(tanggal_lahir, tanggal_ukur):
 
 def hitung_usia_bulan(usia_hari):
     """Konversi usia hari ke bulan menggunakan standar WHO (30.4375 hari per bulan)."""
-    return usia_hari / 30.4375
\ No newline at end of file
+    return usia_hari / 30.4375
+
+def kode_jenis_kelamin(jenis_kelamin):
+    """Mengubah array jenis kelamin menjadi array kode int8; label atau kode tak dikenal menjadi -1.
+
+    Diterima label JENIS_KELAMIN, kode 0/1 (bilangan bulat, float bulat, atau teks "0"/"1" dari CSV).
+    """
+    arr = np.asarray(jenis_kelamin)
+    kode = np.full(arr.shape, -1, dtype=np.int8)
+    if arr.dtype.kind in 'iub':
+        # Diperiksa sebelum cast ke int8 agar kode besar (mis. 300) tidak membungkus menjadi kode lain
+        dikenal = (arr >= 0) & (arr < len(JENIS_KELAMIN))
+        kode[dikenal] = arr[dikenal]
+        return kode
+    for i, label in enumerate(JENIS_KELAMIN):
+        if arr.dtype.kind == 'f':
+            kode[arr == i] = i
+            continue
+        cocok = (arr == label) | (arr == str(i))
+        if arr.dtype.kind == 'O':
+            cocok |= np.frompyfunc(lambda x, i=i: x == i, 1, 1)(arr).astype(bool)
+        kode[cocok] = i
+    return kode
+
+def interpolasi_batch(usia_hari, tabel):
+    """Versi vektor dari interpolasi: mengembalikan array L, M, S dan mask usia di luar rentang tabel.
+    
+    Usia di luar rentang dijepit ke hari pertama/terakhir seperti interpolasi, tanpa peringatan.
+    Usia NaN menghasilkan L, M, S NaN.
+    """
+    posisi = np.asarray(usia_hari, dtype=np.float64) - tabel.hari_awal
+    n = len(tabel.M)
+    kosong = np.isnan(posisi)
+    di_luar_rentang = (posisi < 0) | (posisi > n - 1)
+    posisi = np.clip(np.where(kosong, 0.0, posisi), 0, n - 1)
+    
+    i0 = posisi.astype(np.intp)
+    i1 = np.minimum(i0 + 1, n - 1)
+    proporsi = posisi - i0
+    
+    hasil = []
+    for kolom in (tabel.L, tabel.M, tabel.S):
+        bawah = kolom[i0]
+        nilai = bawah + proporsi * (kolom[i1] - bawah)
+        nilai[kosong] = np.nan
+        hasil.append(nilai)
+    return hasil[0], hasil[1], hasil[2], di_luar_rentang
+
+def hitung_z_score_batch(tinggi, L, M, S):
+    """Versi vektor dari hitung_z_score. Nilai yang tidak dapat dihitung menghasilkan NaN."""
+    tinggi = np.asarray(tinggi, dtype=np.float64)
+    L = np.asarray(L, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        rasio = tinggi / M
+        cabang_log = np.abs(L) < 1e-7
+        L_aman = np.where(cabang_log, 1.0, L)
+        z_score = np.where(cabang_log, np.log(rasio) / S, (rasio ** L_aman - 1) / (L_aman * S))
+    z_score = np.asarray(z_score, dtype=np.float64)
+    z_score[~np.isfinite(z_score)] = np.nan
+    return z_score
+
+def kode_status_batch(z_score):
+    """Versi vektor dari tentukan_status: mengembalikan indeks DAFTAR_STATUS (int8), -1 untuk Z-score NaN."""
+    z_score = np.asarray(z_score, dtype=np.float64)
+    # Batas bawah inklusif (z < -3, z < -2) dan batas atas eksklusif (z > 2, z > 3) seperti tentukan_status
+    kode = (np.digitize(z_score, (-3.0, -2.0)) + np.digitize(z_score, (2.0, 3.0), right=True)).astype(np.int8)
+    kode[np.isnan(z_score)] = KODE_STATUS_TIDAK_VALID
+    return kode
+
+def batas_tinggi_batch(usia_hari, kurva):
+    """Mengembalikan array (n, 4) tinggi pada Z = -3, -2, +2, +3 untuk setiap usia dari KurvaReferensi.
+    
+    Usia hari bulat dibaca langsung dari kurva; usia pecahan dihitung dari L, M, S
+    terinterpolasi, sama seperti perhitungan Z-score. Usia di luar rentang dijepit
+    seperti interpolasi_batch; usia NaN menghasilkan NaN.
+    """
+    usia_hari = np.atleast_1d(np.asarray(usia_hari, dtype=np.float64))
+    posisi = usia_hari - kurva.lms.hari_awal
+    kosong = np.isnan(posisi)
+    i = np.clip(np.where(kosong, 0.0, posisi), 0, len(kurva.hari) - 1)
+    baris_z = [kurva.z.index(z) for z in Z_BATAS_STATUS]
+    batas = kurva.tinggi[np.ix_(baris_z, i.astype(np.intp))].T
+    
+    pecahan = (i != np.floor(i)) & ~kosong
+    if pecahan.any():
+        L, M, S, _ = interpolasi_batch(usia_hari[pecahan], kurva.lms)
+        z = np.asarray(Z_BATAS_STATUS, dtype=np.float64)
+        batas[pecahan] = hitung_tinggi_dari_z(z, L[:, np.newaxis], M[:, np.newaxis], S[:, np.newaxis])
+    batas[kosong] = np.nan
+    return batas
+
+def kode_status_dari_tinggi(usia_hari, tinggi, kurva):
+    """Klasifikasi status langsung dari tinggi dengan membandingkan batas tinggi per hari, tanpa Z-score.
+    
+    Z-score naik monoton terhadap tinggi, sehingga z < -2 setara dengan tinggi < tinggi pada Z = -2, dst.
+    Hasil sama dengan kode_status_batch kecuali untuk tinggi yang hanya berselisih pembulatan
+    floating point dari suatu batas. Mengembalikan indeks DAFTAR_STATUS (int8), -1 untuk tinggi
+    yang bukan angka positif atau usia NaN.
+    """
+    tinggi = np.atleast_1d(np.asarray(tinggi, dtype=np.float64))
+    batas = batas_tinggi_batch(usia_hari, kurva)
+    tinggi_kolom = tinggi[:, np.newaxis]
+    # Batas bawah inklusif dan batas atas eksklusif seperti tentukan_status
+    kode = ((tinggi_kolom >= batas[:, :2]).sum(axis=1) + (tinggi_kolom > batas[:, 2:]).sum(axis=1)).astype(np.int8)
+    kode[~(np.isfinite(tinggi) & (tinggi > 0)) | np.isnan(batas[:, 0])] = KODE_STATUS_TIDAK_VALID
+    return kode
+
+def label_status(kode_status):
+    """Mengubah array kode status menjadi array label status (string kosong untuk kode tidak valid)."""
+    label = np.array(DAFTAR_STATUS + ("",), dtype=object)
+    return label[np.asarray(kode_status)]
+
+def validasi_batch(tinggi, berat, usia_bulan):
+    """Versi vektor dari validasi_tinggi dan validasi_berat: mengembalikan dua mask boolean (valid_tinggi, valid_berat)."""
+    kelompok = np.digitize(np.asarray(usia_bulan, dtype=np.float64), BATAS_KELOMPOK_USIA)
+    rentang_tinggi = np.asarray(RENTANG_TINGGI, dtype=np.float64)[kelompok]
+    rentang_berat = np.asarray(RENTANG_BERAT, dtype=np.float64)[kelompok]
+    tinggi = np.asarray(tinggi, dtype=np.float64)
+    berat = np.asarray(berat, dtype=np.float64)
+    valid_tinggi = (tinggi >= rentang_tinggi[..., 0]) & (tinggi <= rentang_tinggi[..., 1])
+    valid_berat = (berat >= rentang_berat[..., 0]) & (berat <= rentang_berat[..., 1])
+    return valid_tinggi, valid_berat
+
+def hitung_batch(jenis_kelamin, usia_hari, tinggi, tabel_per_jk, berat=None, kurva_per_jk=None):
+    """Menghitung L, M, S, Z-score, dan kode status untuk banyak anak dalam satu proses vektor.
+    
+    `tabel_per_jk` berisi TabelLMS berurutan sesuai JENIS_KELAMIN. Jika `kurva_per_jk`
+    (KurvaReferensi per jenis kelamin) diberikan, status diklasifikasikan dengan
+    membandingkan tinggi terhadap batas tinggi per hari (kode_status_dari_tinggi).
+    Mengembalikan dict berisi array: L, M, S, z_score, kode_status, di_luar_rentang,
+    dan jika `berat` diberikan juga valid_tinggi dan valid_berat.
+    """
+    kode_jk = kode_jenis_kelamin(jenis_kelamin)
+    usia_hari = np.asarray(usia_hari, dtype=np.float64)
+    kode_jk = np.broadcast_to(kode_jk, usia_hari.shape)
+    
+    L = np.full(usia_hari.shape, np.nan)
+    M = np.full(usia_hari.shape, np.nan)
+    S = np.full(usia_hari.shape, np.nan)
+    di_luar_rentang = np.zeros(usia_hari.shape, dtype=bool)
+    
+    for kode, tabel in enumerate(tabel_per_jk):
+        mask = kode_jk == kode
+        if mask.all():
+            L, M, S, di_luar_rentang = interpolasi_batch(usia_hari, tabel)
+            break
+        if mask.any():
+            L[mask], M[mask], S[mask], di_luar_rentang[mask] = interpolasi_batch(usia_hari[mask], tabel)
+    
+    z_score = hitung_z_score_batch(tinggi, L, M, S)
+    if kurva_per_jk is None:
+        kode_status = kode_status_batch(z_score)
+    else:
+        tinggi = np.broadcast_to(np.asarray(tinggi, dtype=np.float64), usia_hari.shape)
+        kode_status = np.full(usia_hari.shape, KODE_STATUS_TIDAK_VALID, dtype=np.int8)
+        for kode, kurva in enumerate(kurva_per_jk):
+            mask = kode_jk == kode
+            if mask.any():
+                kode_status[mask] = kode_status_dari_tinggi(usia_hari[mask], tinggi[mask], kurva)
+    hasil = {
+        "L": L,
+        "M": M,
+        "S": S,
+        "z_score": z_score,
+        "kode_status": kode_status,
+        "di_luar_rentang": di_luar_rentang,
+    }
+    if berat is not None:
+        hasil["valid_tinggi"], hasil["valid_berat"] = validasi_batch(tinggi, berat, hitung_usia_bulan(usia_hari))
+    return hasil
@@ -1,66 +1,247 @@
-import pandas as pd
+import numpy as np
 import os
-import streamlit as st
+import hashlib
+import threading
+from src.calculations import bangun_tabel_lms, bangun_kurva_referensi, JENIS_KELAMIN
+from src.penyimpanan import KOLOM_HISTORI, PenyimpananSQLite, PenyimpananMemori
+from src.instrumentasi import span
 
-def baca_data(file_path):
-    """Membaca file Excel WHO dan mengembalikan DataFrame."""
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File {file_path} tidak ditemukan di folder data.")
+KOLOM_REFERENSI = ['Day', 'L', 'M', 'S']
+
+DIREKTORI_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+FILE_REFERENSI = {
+    "Laki-laki": "lhfa-boys-zscore-expanded-tables.xlsx",
+    "Perempuan": "lhfa-girls-zscore-expanded-tables.xlsx",
+}
+
+# Backend histori: "memori" (default, per sesi, hilang saat sesi berakhir) atau "sqlite" (persisten).
+# SQLite dipakai bersama oleh semua sesi dan dikunci hanya dengan nama anak, sehingga setiap pengguna
+# dapat membaca dan menulis histori anak bernama sama; aktifkan hanya untuk satu tim yang memang berbagi data.
+BACKEND_HISTORI = os.environ.get("HISTORI_BACKEND", "memori")
+PATH_DB_HISTORI = os.environ.get("HISTORI_DB", os.path.join(DIREKTORI_DATA, "histori.sqlite3"))
+
+# Naikkan jika format file cache biner berubah agar cache lama dibangun ulang
+VERSI_CACHE = 1
+
+# Cache tabel referensi untuk seluruh proses, dipakai bersama oleh semua sesi Streamlit
+_cache_referensi = {}
+_kunci_referensi = threading.Lock()
+
+# Backend SQLite dipakai bersama oleh semua sesi dalam satu proses
+_penyimpanan_bersama = {}
+_kunci_penyimpanan = threading.Lock()
+
+# Penyedia backend "memori" per sesi; UI mendaftarkan penyedia berbasis session state
+_penyedia_penyimpanan_sesi = None
+
+def _hitung_hash(file_path):
+    """Menghitung hash SHA-256 dari isi file sumber."""
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for blok in iter(lambda: f.read(1 << 16), b''):
+            h.update(blok)
+    return h.hexdigest()
+
+def _path_cache(file_path):
+    """Menentukan lokasi file cache biner (.npz) untuk file Excel referensi."""
+    folder, nama_file = os.path.split(os.path.abspath(file_path))
+    return os.path.join(folder, '.cache', os.path.splitext(nama_file)[0] + '.npz')
+
+def _kolom_referensi(kolom_sumbu):
+    """Kolom yang diperlukan: sumbu tabel (Day, Length, atau Height) diikuti L, M, S."""
+    return [kolom_sumbu] + KOLOM_REFERENSI[1:]
+
+def _baca_excel(file_path, kolom_sumbu='Day'):
+    """Membaca dan memvalidasi file Excel WHO. Lambat, hanya dipakai saat cache dibangun ulang."""
+    # pandas diimpor saat dibutuhkan agar modul inti tetap ringan diimpor
+    import pandas as pd
     
+    kolom = _kolom_referensi(kolom_sumbu)
     try:
         df = pd.read_excel(file_path)
         # Validasi kolom yang diperlukan
-        required_columns = ['Day', 'L', 'M', 'S']
-        for col in required_columns:
+        for col in kolom:
             if col not in df.columns:
                 raise ValueError(f"Kolom '{col}' tidak ditemukan dalam file Excel.")
         
-        # Pastikan data terurut berdasarkan Day
-        df = df.sort_values('Day').reset_index(drop=True)
-        return df
+        # Pastikan data terurut berdasarkan sumbu tabel
+        df = df.sort_values(kolom_sumbu).reset_index(drop=True)
+        return df[kolom]
     except Exception as e:
         raise Exception(f"Error membaca file Excel: {str(e)}")
 
+def _muat_cache_biner(path_cache, hash_sumber, kolom_sumbu='Day'):
+    """Memuat tabel dari cache biner. Mengembalikan None jika cache tidak ada, rusak, atau kedaluwarsa."""
+    import pandas as pd
+    
+    try:
+        with np.load(path_cache, allow_pickle=False) as npz:
+            if int(npz['versi']) != VERSI_CACHE or str(npz['hash_sumber']) != hash_sumber:
+                return None
+            return pd.DataFrame({col: npz[col] for col in _kolom_referensi(kolom_sumbu)})
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _simpan_cache_biner(path_cache, hash_sumber, df):
+    """Menulis cache biner secara atomik. Gagal menulis cache tidak menggagalkan pembacaan data."""
+    path_sementara = f"{path_cache}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path_cache), exist_ok=True)
+        with open(path_sementara, 'wb') as f:
+            np.savez(f, versi=VERSI_CACHE, hash_sumber=hash_sumber,
+                     **{col: df[col].to_numpy() for col in df.columns})
+        os.replace(path_sementara, path_cache)
+    except OSError:
+        if os.path.exists(path_sementara):
+            os.remove(path_sementara)
+
+def path_referensi(jenis_kelamin):
+    """Mengembalikan path file Excel WHO untuk jenis kelamin tertentu."""
+    return os.path.join(DIREKTORI_DATA, FILE_REFERENSI[jenis_kelamin])
+
+def _entri_referensi(file_path, kolom_sumbu='Day'):
+    """Mengembalikan entri cache proses (tanda file, DataFrame, TabelLMS, KurvaReferensi) untuk file referensi.
+    
+    Tabel dan kurva per hari hanya dibangun untuk tabel bersumbu usia (Day); selain itu None.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File {file_path} tidak ditemukan di folder data.")
+    
+    kunci = (os.path.abspath(file_path), kolom_sumbu)
+    stat = os.stat(file_path)
+    tanda = (stat.st_mtime_ns, stat.st_size)
+    
+    # Jalur cepat: file sumber tidak berubah sejak dimuat oleh proses ini
+    entri = _cache_referensi.get(kunci)
+    if entri is not None and entri[0] == tanda:
+        return entri
+    
+    with _kunci_referensi:
+        entri = _cache_referensi.get(kunci)
+        if entri is not None and entri[0] == tanda:
+            return entri
+        
+        with span("referensi/hash"):
+            hash_sumber = _hitung_hash(file_path)
+        path_cache = _path_cache(file_path)
+        with span("referensi/cache_biner"):
+            df = _muat_cache_biner(path_cache, hash_sumber, kolom_sumbu)
+        if df is None:
+            with span("referensi/excel"):
+                df = _baca_excel(file_path, kolom_sumbu)
+                _simpan_cache_biner(path_cache, hash_sumber, df)
+        
+        if kolom_sumbu == 'Day':
+            with span("referensi/tabel_lms"):
+                tabel = bangun_tabel_lms(df['Day'], df['L'], df['M'], df['S'])
+                # Kurva referensi (juga batas tinggi status) dihitung sekali per versi tabel, bukan per render
+                entri = (tanda, df, tabel, bangun_kurva_referensi(tabel))
+        else:
+            entri = (tanda, df, None, None)
+        _cache_referensi[kunci] = entri
+        return entri
+
+def baca_data(file_path, kolom_sumbu='Day'):
+    """Membaca tabel referensi WHO dan mengembalikan DataFrame (hanya-baca, dipakai bersama).
+    
+    File Excel hanya diurai sekali lalu disimpan sebagai cache biner di data/.cache/
+    beserta hash file sumbernya. Cache dibangun ulang hanya jika isi Excel berubah.
+    `kolom_sumbu` adalah kolom sumbu tabel: Day, atau Length/Height untuk tabel berat menurut panjang/tinggi.
+    """
+    return _entri_referensi(file_path, kolom_sumbu)[1]
+
+def baca_tabel_lms(file_path):
+    """Membaca tabel referensi WHO sebagai TabelLMS padat per hari (hanya-baca, dipakai bersama)."""
+    return _entri_referensi(file_path)[2]
+
+def baca_kurva_referensi(jenis_kelamin):
+    """Mengembalikan kurva tinggi referensi WHO (Z = -3, -2, 0, +2, +3) per hari untuk jenis kelamin tertentu."""
+    return _entri_referensi(path_referensi(jenis_kelamin))[3]
+
+def baca_tabel_lms_semua():
+    """Mengembalikan TabelLMS untuk semua jenis kelamin, berurutan sesuai kode JENIS_KELAMIN (untuk API batch)."""
+    return tuple(baca_tabel_lms(path_referensi(jk)) for jk in JENIS_KELAMIN)
+
+def baca_kurva_referensi_semua():
+    """Mengembalikan KurvaReferensi untuk semua jenis kelamin, berurutan sesuai kode JENIS_KELAMIN (klasifikasi batch)."""
+    return tuple(baca_kurva_referensi(jk) for jk in JENIS_KELAMIN)
+
+def atur_penyedia_penyimpanan_sesi(penyedia):
+    """Mendaftarkan fungsi tanpa argumen yang mengembalikan PenyimpananMemori milik sesi aktif.
+    
+    Tanpa penyedia (mis. di proses batch atau layanan), backend "memori" dipakai bersama oleh seluruh proses.
+    """
+    global _penyedia_penyimpanan_sesi
+    _penyedia_penyimpanan_sesi = penyedia
+
+def dapatkan_penyimpanan():
+    """Mengembalikan backend histori sesuai konfigurasi BACKEND_HISTORI."""
+    if BACKEND_HISTORI == "memori":
+        if _penyedia_penyimpanan_sesi is not None:
+            return _penyedia_penyimpanan_sesi()
+        with _kunci_penyimpanan:
+            if "memori" not in _penyimpanan_bersama:
+                _penyimpanan_bersama["memori"] = PenyimpananMemori()
+            return _penyimpanan_bersama["memori"]
+    
+    if BACKEND_HISTORI != "sqlite":
+        raise ValueError(f"Backend histori '{BACKEND_HISTORI}' tidak dikenal. Gunakan 'sqlite' atau 'memori'.")
+    
+    with _kunci_penyimpanan:
+        if PATH_DB_HISTORI not in _penyimpanan_bersama:
+            _penyimpanan_bersama[PATH_DB_HISTORI] = PenyimpananSQLite(PATH_DB_HISTORI)
+        return _penyimpanan_bersama[PATH_DB_HISTORI]
+
 def simpan_histori(tanggal, jenis_kelamin, usia_hari, usia_bulan, tinggi, berat, z_score, status, nama="Agus", jenis_penginput="WARGA"):
-    """Menyimpan data pengukuran ke session state."""
+    """Menyimpan data pengukuran ke backend histori."""
     tanggal_str = tanggal.strftime('%Y-%m-%d')
     
-    # Inisialisasi session state untuk histori jika belum ada
-    if 'histori' not in st.session_state:
-        st.session_state.histori = pd.DataFrame(columns=["Nama", "JenisPenginput", "Tanggal", "Jenis Kelamin", "Usia (Hari)", "Usia (Bulan)", "Tinggi (cm)", "Berat (kg)", "Z-score", "Status"])
+    rekaman = (nama, jenis_penginput, tanggal_str, jenis_kelamin, int(usia_hari), round(usia_bulan, 1),
+               float(tinggi), float(berat), round(z_score, 2), status)
     
-    # Cek apakah sudah ada pengukuran untuk tanggal yang sama
-    if 'histori' in st.session_state and not st.session_state.histori.empty:
-        if tanggal_str in st.session_state.histori['Tanggal'].values:
-            return False, "Pengukuran untuk hari ini sudah dilakukan. Hanya satu pengukuran per hari yang diizinkan."
+    # Indeks unik (Nama, Tanggal) sekaligus menjadi pengecekan satu pengukuran per hari
+    if not dapatkan_penyimpanan().simpan(rekaman):
+        return False, "Pengukuran untuk hari ini sudah dilakukan. Hanya satu pengukuran per hari yang diizinkan."
     
-    # Data baru
-    data = {
-        "Nama": [nama],
-        "JenisPenginput": [jenis_penginput],
-        "Tanggal": [tanggal_str],
-        "Jenis Kelamin": [jenis_kelamin],
-        "Usia (Hari)": [usia_hari],
-        "Usia (Bulan)": [round(usia_bulan, 1)],
-        "Tinggi (cm)": [tinggi],
-        "Berat (kg)": [berat],
-        "Z-score": [round(z_score, 2)],
-        "Status": [status]
-    }
-    df_new = pd.DataFrame(data)
+    return True, "Data berhasil disimpan!"
+
+def simpan_histori_banyak(df):
+    """Menyimpan banyak pengukuran (DataFrame dengan kolom KOLOM_HISTORI) dalam satu transaksi; duplikat dilewati.
     
-    # Gabungkan data baru dengan histori di session state
-    st.session_state.histori = pd.concat([st.session_state.histori, df_new], ignore_index=True)
+    Mengembalikan jumlah baris yang tersimpan.
+    """
+    return dapatkan_penyimpanan().simpan_banyak(df[KOLOM_HISTORI].itertuples(index=False, name=None))
+
+def baca_histori(nama="Agus"):
+    """Membaca histori pengukuran satu anak, terurut berdasarkan tanggal.
     
-    return True, "Data berhasil disimpan!"
+    DataFrame yang dikembalikan di-cache per versi histori dan dipakai bersama; jangan diubah.
+    """
+    return dapatkan_penyimpanan().baca(nama)
+
+def ringkasan_histori(nama="Agus"):
+    """Mengembalikan ringkasan histori (total, z_terakhir, jumlah_stunting, berat_terakhir) tanpa membangun DataFrame."""
+    return dapatkan_penyimpanan().baca_buffer(nama).ringkasan()
+
+def kunci_versi_histori(nama="Agus"):
+    """Mengembalikan kunci (id buffer, versi) histori satu anak untuk meng-cache grafik dan hasil turunan lain."""
+    return dapatkan_penyimpanan().baca_buffer(nama).kunci_versi
+
+def tren_histori(nama="Agus"):
+    """Mengembalikan tren pertumbuhan satu anak (laju tinggi/berat, perubahan Z-score, flag) per pengukuran."""
+    return dapatkan_penyimpanan().baca_buffer(nama).tren()
+
+def potret_histori(nama="Agus"):
+    """Mengembalikan kunci_versi, ringkasan, dataframe, dan tren histori satu anak dari satu keadaan yang sama.
+
+    Dipakai halaman histori agar tabel, metrik, dan tren tidak tercampur dengan rekaman yang disimpan sesi lain di tengah rerun.
+    """
+    return dapatkan_penyimpanan().baca_buffer(nama).potret()
+
+def laporan_memori_histori():
+    """Laporan memori histori: per sesi untuk backend "memori", cache bersama seluruh proses untuk "sqlite"."""
+    return dapatkan_penyimpanan().laporan_memori()
 
-def baca_histori():
-    """Membaca histori pengukuran dari session state."""
-    if 'histori' in st.session_state and not st.session_state.histori.empty:
-        df = st.session_state.histori.copy()
-        df['Tanggal'] = pd.to_datetime(df['Tanggal'], errors='coerce').dt.strftime('%Y-%m-%d')
-        df = df.sort_values('Tanggal')
-        columns = ["Nama", "JenisPenginput", "Tanggal", "Jenis Kelamin", "Usia (Hari)", "Usia (Bulan)", "Tinggi (cm)", "Berat (kg)", "Z-score", "Status"]
-        df = df[columns]
-        return df
-    return pd.DataFrame(columns=["Nama", "JenisPenginput", "Tanggal", "Jenis Kelamin", "Usia (Hari)", "Usia (Bulan)", "Tinggi (cm)", "Berat (kg)", "Z-score", "Status"])
\ No newline at end of file
+def baca_agregat_kohort():
+    """Mengembalikan baris agregat kohort (jenis kelamin, kelompok usia, bulan, status, jumlah) dari backend histori."""
+    return dapatkan_penyimpanan().agregat_kohort()
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""Ekspor dan impor kolumnar (Parquet atau Arrow IPC) untuk histori pengukuran dan hasil skrining.
+
+Data dialirkan per batch sehingga memori tetap datar berapa pun ukuran dataset.
+
+Contoh:
+    HISTORI_BACKEND=sqlite python -m src.ekspor ekspor histori.parquet
+    HISTORI_BACKEND=sqlite python -m src.ekspor impor histori_kecamatan.parquet
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.histori import KOLOM_HISTORI, PRESISI_FLOAT32
+
+UKURAN_BATCH_DEFAULT = 65_536
+KOMPRESI_PARQUET = "zstd"
+KOMPRESI_ARROW = "lz4"
+EKSTENSI_PARQUET = (".parquet",)
+EKSTENSI_ARROW = (".arrow", ".feather", ".ipc")
+
+# Kolom teks berulang disimpan sebagai dictionary, angka sebagai int32/float32
+KOLOM_KATEGORI = ("Nama", "JenisPenginput", "Jenis Kelamin", "Status")
+
+def _impor_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Ekspor/impor Parquet dan Arrow memerlukan paket pyarrow (pip install pyarrow).")
+    return pa
+
+def format_file(path):
+    """Mengembalikan "parquet" atau "arrow" berdasarkan ekstensi file."""
+    ekstensi = os.path.splitext(path)[1].lower() if isinstance(path, str) else ""
+    if ekstensi in EKSTENSI_PARQUET:
+        return "parquet"
+    if ekstensi in EKSTENSI_ARROW:
+        return "arrow"
+    raise ValueError(f"Format file {ekstensi} tidak didukung. Gunakan .parquet atau .arrow.")
+
+def skema_histori():
+    """Skema Arrow ringkas untuk histori pengukuran."""
+    pa = _impor_pyarrow()
+    kategori = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("Nama", kategori),
+        ("JenisPenginput", kategori),
+        ("Tanggal", pa.date32()),
+        ("Jenis Kelamin", kategori),
+        ("Usia (Hari)", pa.int32()),
+        ("Usia (Bulan)", pa.float32()),
+        ("Tinggi (cm)", pa.float32()),
+        ("Berat (kg)", pa.float32()),
+        ("Z-score", pa.float32()),
+        ("Status", kategori),
+    ])
+
+def batch_dari_rekaman(daftar_rekaman, skema=None):
+    """Mengubah daftar tuple KOLOM_HISTORI menjadi RecordBatch Arrow bertipe ringkas."""
+    pa = _impor_pyarrow()
+    skema = skema or skema_histori()
+    kolom = list(zip(*daftar_rekaman)) if daftar_rekaman else [()] * len(KOLOM_HISTORI)
+    arrays = []
+    for nama_kolom, nilai in zip(KOLOM_HISTORI, kolom):
+        tipe = skema.field(nama_kolom).type
+        if nama_kolom == "Tanggal":
+            arrays.append(pa.array(np.array(nilai, dtype="datetime64[D]"), type=tipe))
+        elif nama_kolom in KOLOM_KATEGORI:
+            arrays.append(pa.array(nilai, type=pa.string()).dictionary_encode().cast(tipe))
+        else:
+            arrays.append(pa.array(nilai, type=tipe))
+    return pa.RecordBatch.from_arrays(arrays, schema=skema)
+
+def rekaman_dari_batch(batch):
+    """Mengubah RecordBatch berkolom KOLOM_HISTORI kembali menjadi daftar tuple untuk backend histori."""
+    kolom = []
+    for nama_kolom in KOLOM_HISTORI:
+        data = batch.column(batch.schema.get_field_index(nama_kolom))
+        if nama_kolom == "Tanggal":
+            nilai = [str(t) if t is not None else None for t in data.to_pylist()]
+        elif nama_kolom in PRESISI_FLOAT32:
+            # Nilai float32 dibulatkan kembali ke presisi aslinya (mis. 72.3 bukan 72.30000305)
+            nilai = np.round(data.to_numpy(zero_copy_only=False).astype(np.float64), PRESISI_FLOAT32[nama_kolom]).tolist()
+        else:
+            nilai = data.to_pylist()
+        kolom.append(nilai)
+    return list(zip(*kolom))
+
+class PenulisKolumnar:
+    """Menulis tabel Arrow secara bertahap ke Parquet (satu row group per tulis) atau Arrow IPC (satu batch per tulis).
+
+    Arrow ditulis dalam format stream karena format file IPC tidak mengizinkan dictionary berganti
+    antar batch, sedangkan setiap batch di sini membawa dictionary sendiri.
+    Skema ditetapkan dari tulisan pertama jika tidak diberikan; tulisan berikutnya di-cast ke skema tersebut.
+    `tujuan` berupa path atau objek file biner.
+    """
+
+    def __init__(self, tujuan, skema=None, format=None):
+        self.tujuan = tujuan
+        self.format = format or format_file(tujuan)
+        self.skema = skema
+        self._penulis = None
+
+    def _buka(self, skema):
+        pa = _impor_pyarrow()
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.tujuan, skema, compression=KOMPRESI_PARQUET)
+        opsi = pa.ipc.IpcWriteOptions(compression=KOMPRESI_ARROW)
+        return pa.ipc.new_stream(self.tujuan, skema, options=opsi)
+
+    def tulis(self, tabel):
+        """Menulis Table atau RecordBatch Arrow."""
+        pa = _impor_pyarrow()
+        if isinstance(tabel, pa.RecordBatch):
+            tabel = pa.Table.from_batches([tabel])
+        if self._penulis is None:
+            self.skema = self.skema or tabel.schema
+            self._penulis = self._buka(self.skema)
+        tabel = tabel.select(self.skema.names).cast(self.skema)
+        self._penulis.write_table(tabel)
+
+    def tulis_dataframe(self, df):
+        pa = _impor_pyarrow()
+        self.tulis(pa.Table.from_pandas(df, preserve_index=False))
+
+    def tutup(self):
+        if self._penulis is not None:
+            self._penulis.close()
+            self._penulis = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tutup()
+
+def baca_batch(sumber, kolom=None, ukuran_batch=UKURAN_BATCH_DEFAULT):
+    """Membaca file Parquet atau Arrow IPC sebagai rangkaian RecordBatch, hanya untuk `kolom` yang diminta.
+
+    Parquet hanya membaca kolom yang diproyeksikan dari disk; Arrow IPC (format file maupun stream)
+    dipetakan ke memori (mmap) sehingga kolom yang tidak diminta tidak pernah disalin.
+    """
+    pa = _impor_pyarrow()
+    if format_file(sumber) == "parquet":
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(sumber).iter_batches(batch_size=ukuran_batch, columns=kolom)
+        return
+
+    with pa.memory_map(sumber) as f:
+        try:
+            pembaca = pa.ipc.open_file(f)
+            daftar_batch = (pembaca.get_batch(i) for i in range(pembaca.num_record_batches))
+        except pa.ArrowInvalid:
+            f.seek(0)
+            daftar_batch = pa.ipc.open_stream(f)
+        for batch in daftar_batch:
+            if kolom is not None:
+                batch = batch.select(kolom)
+            for awal in range(0, batch.num_rows, ukuran_batch):
+                yield batch.slice(awal, ukuran_batch)
+
+def baca_nama_kolom(sumber):
+    """Membaca nama kolom file Parquet/Arrow dari metadata saja, tanpa membaca data."""
+    pa = _impor_pyarrow()
+    if format_file(sumber) == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(sumber).names
+    with pa.memory_map(sumber) as f:
+        try:
+            return pa.ipc.open_file(f).schema.names
+        except pa.ArrowInvalid:
+            f.seek(0)
+            return pa.ipc.open_stream(f).schema.names
+
+def ekspor_histori(tujuan, penyimpanan, nama=None, format=None, ukuran_batch=UKURAN_BATCH_DEFAULT):
+    """Mengekspor histori (semua anak, atau satu anak) ke Parquet/Arrow secara streaming; mengembalikan jumlah baris."""
+    skema = skema_histori()
+    jumlah = 0
+    with PenulisKolumnar(tujuan, skema, format) as penulis:
+        for daftar_rekaman in penyimpanan.iter_rekaman(ukuran_batch, nama):
+            penulis.tulis(batch_dari_rekaman(daftar_rekaman, skema))
+            jumlah += len(daftar_rekaman)
+        if jumlah == 0:
+            # File tetap ditulis lengkap dengan skema meskipun histori kosong
+            penulis.tulis(batch_dari_rekaman([], skema))
+    return jumlah
+
+def ekspor_histori_bytes(penyimpanan, nama=None, format="parquet"):
+    """Seperti ekspor_histori, tetapi mengembalikan isi file sebagai bytes (untuk tombol unduh)."""
+    buffer = io.BytesIO()
+    ekspor_histori(buffer, penyimpanan, nama, format)
+    return buffer.getvalue()
+
+def impor_histori(sumber, penyimpanan, ukuran_batch=UKURAN_BATCH_DEFAULT):
+    """Mengimpor histori dari Parquet/Arrow per batch; duplikat (Nama, Tanggal) dilewati.
+
+    Z-score dan status dihitung ulang dan setiap baris divalidasi seperti roster unggahan (lihat
+    batch.proses_chunk); baris tidak valid atau ber-flag kualitas tidak disimpan.
+    Mengembalikan (jumlah baris dibaca, jumlah baris tersimpan).
+    """
+    import pandas as pd
+    # Diimpor di sini karena src.batch mengimpor modul ini
+    from src.batch import proses_chunk, rekaman_histori, roster_dari_histori
+
+    dibaca = tersimpan = 0
+    for batch in baca_batch(sumber, KOLOM_HISTORI, ukuran_batch):
+        df = proses_chunk(roster_dari_histori(pd.DataFrame(rekaman_dari_batch(batch), columns=KOLOM_HISTORI)))
+        dibaca += len(df)
+        tersimpan += penyimpanan.simpan_banyak(rekaman_histori(df).itertuples(index=False, name=None))
+    return dibaca, tersimpan
+
+def main(argv=None):
+    from src import data_manager
+
+    parser = argparse.ArgumentParser(description="Ekspor/impor histori pengukuran dalam format Parquet atau Arrow IPC.")
+    parser.add_argument("aksi", choices=["ekspor", "impor"])
+    parser.add_argument("file", help="File .parquet atau .arrow")
+    parser.add_argument("--nama", default=None, help="Hanya ekspor histori anak ini")
+    parser.add_argument("--ukuran-batch", type=int, default=UKURAN_BATCH_DEFAULT, help="Jumlah baris per batch/row group")
+    args = parser.parse_args(argv)
+
+    if data_manager.BACKEND_HISTORI != "sqlite":
+        # Backend memori hanya hidup selama proses; CLI tidak punya histori untuk diekspor atau tempat menyimpan impor
+        print("Error: ekspor/impor dari baris perintah memerlukan HISTORI_BACKEND=sqlite.", file=sys.stderr)
+        return 1
+
+    mulai = time.perf_counter()
+    try:
+        penyimpanan = data_manager.dapatkan_penyimpanan()
+        if args.aksi == "ekspor":
+            jumlah = ekspor_histori(args.file, penyimpanan, args.nama, ukuran_batch=args.ukuran_batch)
+            pesan = f"{jumlah} baris diekspor ke {args.file}"
+        else:
+            dibaca, tersimpan = impor_histori(args.file, penyimpanan, args.ukuran_batch)
+            pesan = f"{dibaca} baris dibaca, {tersimpan} baris baru tersimpan"
+    except (FileNotFoundError, ValueError, ImportError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    print(f"{pesan} dalam {time.perf_counter() - mulai:.2f} detik.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import collections
+import threading
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from src.calculations import hitung_usia_bulan
+
+# Di atas jumlah titik ini, setiap seri di-downsample dengan LTTB sebelum dikirim ke browser
+AMBANG_TITIK = 2000
+
+MAKS_FIGUR_DI_CACHE = 256
+
+# Kurva referensi hanya digambar di sekitar rentang usia anak, dengan jumlah titik terbatas
+MARGIN_KURVA_HARI = 90
+MAKS_TITIK_KURVA = 300
+
+# (Z-score, nama, warna garis, warna isian pita ke kurva sebelumnya)
+GAYA_KURVA = [
+    (-3, "Z -3", "red", None),
+    (-2, "Z -2", "orange", "rgba(220, 53, 69, 0.12)"),
+    (2, "Z +2", "green", "rgba(40, 167, 69, 0.12)"),
+    (3, "Z +3", "gray", "rgba(255, 193, 7, 0.12)"),
+]
+
+# (kolom, judul panel, judul sumbu y)
+PANEL = [
+    ("Z-score", "Perkembangan Z-score Anak", "Z-score"),
+    ("Berat (kg)", "Perkembangan Berat Badan Anak", "Berat Badan (kg)"),
+    ("Tinggi (cm)", "Perkembangan Tinggi Badan Anak", "Tinggi Badan (cm)"),
+]
+
+KOLOM_HOVER = ["Usia (Hari)", "Usia (Bulan)", "Tinggi (cm)", "Berat (kg)", "Z-score", "Status"]
+TEMPLATE_HOVER = (
+    "Tanggal: %{x|%Y-%m-%d}<br>"
+    "Usia: %{customdata[0]} hari (%{customdata[1]} bulan)<br>"
+    "Tinggi: %{customdata[2]} cm<br>"
+    "Berat: %{customdata[3]} kg<br>"
+    "Z-score: %{customdata[4]}<br>"
+    "Status: %{customdata[5]}<extra></extra>"
+)
+
+# Cache figur per kunci versi histori, dipakai bersama oleh semua sesi
+_cache_figur = collections.OrderedDict()
+_kunci_figur = threading.Lock()
+
+def lttb(x, y, jumlah_titik):
+    """Memilih indeks titik dengan Largest-Triangle-Three-Buckets agar bentuk kurva tetap terjaga.
+
+    Titik pertama dan terakhir selalu dipertahankan. Mengembalikan semua indeks jika
+    jumlah data tidak melebihi jumlah_titik.
+    """
+    n = len(x)
+    if jumlah_titik >= n or jumlah_titik < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    indeks = np.empty(jumlah_titik, dtype=np.intp)
+    indeks[0] = 0
+    indeks[-1] = n - 1
+
+    # jumlah_titik - 2 bucket di antara titik pertama dan terakhir
+    batas = np.linspace(1, n - 1, jumlah_titik - 1).astype(np.intp)
+    a = 0
+    for i in range(jumlah_titik - 2):
+        awal, akhir = batas[i], batas[i + 1]
+        if i + 2 < len(batas):
+            awal_berikut, akhir_berikut = batas[i + 1], batas[i + 2]
+        else:
+            awal_berikut, akhir_berikut = n - 1, n
+        rata_x = x[awal_berikut:akhir_berikut].mean()
+        rata_y = y[awal_berikut:akhir_berikut].mean()
+
+        luas = np.abs((x[a] - rata_x) * (y[awal:akhir] - y[a]) - (x[a] - x[awal:akhir]) * (rata_y - y[a]))
+        a = awal + int(np.argmax(luas))
+        indeks[i + 1] = a
+    return indeks
+
+def _bangun_figur(df_histori):
+    tanggal = pd.to_datetime(df_histori["Tanggal"], format="%Y-%m-%d")
+    x_numerik = tanggal.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    hover = df_histori[KOLOM_HOVER].to_numpy(dtype=object)
+
+    fig = make_subplots(rows=len(PANEL), cols=1, shared_xaxes=True, vertical_spacing=0.07,
+                        subplot_titles=[judul for _, judul, _ in PANEL])
+
+    for baris, (kolom, _, judul_y) in enumerate(PANEL, start=1):
+        y = df_histori[kolom].to_numpy(dtype=np.float64)
+        indeks = lttb(x_numerik, y, AMBANG_TITIK)
+        fig.add_trace(go.Scattergl(
+            x=tanggal.iloc[indeks], y=y[indeks], mode="lines+markers", name=kolom,
+            customdata=hover[indeks], hovertemplate=TEMPLATE_HOVER,
+        ), row=baris, col=1)
+        fig.update_yaxes(title_text=judul_y, row=baris, col=1)
+
+    fig.add_hline(y=2, line_dash="dot", line_color="green", annotation_text="Normal (+2)",
+                  annotation_position="top left", row=1, col=1)
+    fig.add_hline(y=-2, line_dash="dash", line_color="orange", annotation_text="Batas Stunting (-2)",
+                  annotation_position="top left", row=1, col=1)
+    fig.add_hline(y=-3, line_dash="dash", line_color="red", annotation_text="Stunting Berat (-3)",
+                  annotation_position="top left", row=1, col=1)
+    fig.add_hrect(y0=-3, y1=-2, fillcolor="red", opacity=0.1, line_width=0, row=1, col=1)
+    fig.add_hrect(y0=-2, y1=2, fillcolor="green", opacity=0.1, line_width=0, row=1, col=1)
+
+    fig.update_yaxes(range=[-5, 5], row=1, col=1)
+    fig.update_yaxes(range=[0, df_histori["Berat (kg)"].max() * 1.2], row=2, col=1)
+    fig.update_yaxes(range=[df_histori["Tinggi (cm)"].min() * 0.8, df_histori["Tinggi (cm)"].max() * 1.2], row=3, col=1)
+    fig.update_xaxes(title_text="Tanggal Pengukuran", row=len(PANEL), col=1)
+    fig.update_layout(height=300 * len(PANEL), showlegend=False, margin=dict(t=60))
+    return fig
+
+def _bangun_figur_tinggi_usia(df_histori, kurva):
+    usia_hari = df_histori["Usia (Hari)"].to_numpy(dtype=np.float64)
+    tinggi = df_histori["Tinggi (cm)"].to_numpy(dtype=np.float64)
+    hover = df_histori[KOLOM_HOVER].to_numpy(dtype=object)
+
+    hari_awal = int(kurva.hari[0])
+    awal = int(max(hari_awal, usia_hari.min() - MARGIN_KURVA_HARI)) - hari_awal
+    akhir = int(min(kurva.hari[-1], usia_hari.max() + MARGIN_KURVA_HARI)) - hari_awal
+    langkah = max(1, (akhir - awal) // MAKS_TITIK_KURVA)
+    indeks_kurva = np.unique(np.r_[np.arange(awal, akhir + 1, langkah), akhir])
+    x_kurva = hitung_usia_bulan(kurva.hari[indeks_kurva])
+
+    fig = go.Figure()
+    # Urutan trace penting: setiap pita diisi ke kurva yang digambar sebelumnya
+    for z_score, nama, warna, isian in GAYA_KURVA:
+        fig.add_trace(go.Scatter(
+            x=x_kurva, y=kurva.kurva(z_score)[indeks_kurva], mode="lines", name=nama,
+            line=dict(color=warna, width=1, dash="dot"),
+            fill="tonexty" if isian else None, fillcolor=isian, hoverinfo="skip",
+        ))
+    fig.add_trace(go.Scatter(
+        x=x_kurva, y=kurva.kurva(0)[indeks_kurva], mode="lines", name="Median WHO",
+        line=dict(color="gray", width=1, dash="dash"), hoverinfo="skip",
+    ))
+
+    usia_bulan = hitung_usia_bulan(usia_hari)
+    indeks = lttb(usia_bulan, tinggi, AMBANG_TITIK)
+    fig.add_trace(go.Scattergl(
+        x=usia_bulan[indeks], y=tinggi[indeks], mode="lines+markers", name="Tinggi anak",
+        line=dict(color="#007bff"), customdata=hover[indeks],
+        hovertemplate=TEMPLATE_HOVER.replace("Tanggal: %{x|%Y-%m-%d}<br>", ""),
+    ))
+
+    fig.update_layout(
+        title="Tinggi Badan menurut Usia dan Kurva Referensi WHO",
+        xaxis_title="Usia (Bulan)",
+        yaxis_title="Tinggi Badan (cm)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    )
+    return fig
+
+def _memo(kunci, pembangun):
+    """Mengembalikan figur dari cache bersama, atau membangunnya dengan `pembangun` jika belum ada."""
+    if kunci is None:
+        return pembangun()
+
+    with _kunci_figur:
+        fig = _cache_figur.get(kunci)
+        if fig is not None:
+            _cache_figur.move_to_end(kunci)
+            return fig
+
+    fig = pembangun()
+    with _kunci_figur:
+        _cache_figur[kunci] = fig
+        if len(_cache_figur) > MAKS_FIGUR_DI_CACHE:
+            _cache_figur.popitem(last=False)
+    return fig
+
+def buat_figur_pertumbuhan(df_histori, kunci_versi=None):
+    """Membuat satu figur multi-panel (Z-score, berat, tinggi) dengan trace WebGL.
+
+    Jika kunci_versi (lihat BufferHistori.kunci_versi) diberikan, figur di-memo per versi
+    histori sehingga rerun tanpa data baru tidak membangun ulang figur Plotly.
+    Figur yang dikembalikan dipakai bersama; jangan diubah.
+    """
+    kunci = None if kunci_versi is None else ("pertumbuhan", kunci_versi)
+    return _memo(kunci, lambda: _bangun_figur(df_histori))
+
+def buat_figur_tinggi_usia(df_histori, kurva, kunci_versi=None):
+    """Membuat grafik tinggi anak menurut usia di atas pita kurva referensi WHO (Z -3 s.d. +3).
+
+    `kurva` adalah KurvaReferensi yang sudah dihitung sebelumnya (lihat baca_kurva_referensi).
+    Memo per versi histori seperti buat_figur_pertumbuhan.
+    """
+    kunci = None if kunci_versi is None else ("tinggi-usia", kunci_versi, id(kurva))
+    return _memo(kunci, lambda: _bangun_figur_tinggi_usia(df_histori, kurva))
+
+def buat_figur_prevalensi(df_prevalensi):
+    """Membuat grafik tren prevalensi stunting per bulan, satu garis per jenis kelamin.
+
+    `df_prevalensi` adalah hasil hitung_prevalensi dengan dimensi ["Bulan", "Jenis Kelamin"].
+    """
+    fig = go.Figure()
+    for jenis_kelamin, df in df_prevalensi.groupby("Jenis Kelamin"):
+        df = df.sort_values("Bulan")
+        fig.add_trace(go.Scatter(x=df["Bulan"], y=df["Prevalensi Stunting (%)"], mode="lines+markers",
+                                 name=f"Stunting - {jenis_kelamin}"))
+        fig.add_trace(go.Scatter(x=df["Bulan"], y=df["Prevalensi Stunting Berat (%)"], mode="lines+markers",
+                                 name=f"Stunting Berat - {jenis_kelamin}", line=dict(dash="dot")))
+    fig.update_layout(
+        title="Tren Prevalensi Stunting per Bulan",
+        xaxis_title="Bulan Pengukuran",
+        yaxis_title="Prevalensi (%)",
+        xaxis=dict(type="category"),
+    )
+    return fig
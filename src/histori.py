@@ -0,0 +1,292 @@
+import itertools
+import sys
+import threading
+from datetime import date
+import numpy as np
+from src.calculations import JENIS_KELAMIN, DAFTAR_STATUS
+from src.pertumbuhan import KOLOM_TREN, hitung_tren
+
+KOLOM_HISTORI = ["Nama", "JenisPenginput", "Tanggal", "Jenis Kelamin", "Usia (Hari)", "Usia (Bulan)", "Tinggi (cm)", "Berat (kg)", "Z-score", "Status"]
+
+# Posisi kunci unik (nama anak, tanggal pengukuran) dalam satu rekaman
+IDX_NAMA = KOLOM_HISTORI.index("Nama")
+IDX_TANGGAL = KOLOM_HISTORI.index("Tanggal")
+IDX_BERAT = KOLOM_HISTORI.index("Berat (kg)")
+IDX_Z_SCORE = KOLOM_HISTORI.index("Z-score")
+IDX_USIA_HARI = KOLOM_HISTORI.index("Usia (Hari)")
+
+# Kolom numerik disimpan dalam array bertipe ringkas yang tumbuh berlipat ganda
+TIPE_KOLOM_NUMERIK = {
+    "Usia (Hari)": np.int32,
+    "Usia (Bulan)": np.float32,
+    "Tinggi (cm)": np.float32,
+    "Berat (kg)": np.float32,
+    "Z-score": np.float32,
+}
+
+# Jumlah desimal nilai float32 saat dikembalikan sebagai float64 (sesuai pembulatan saat disimpan),
+# agar 72.3 tetap 72.3 dan bukan 72.30000305
+PRESISI_FLOAT32 = {"Usia (Bulan)": 1, "Tinggi (cm)": 2, "Berat (kg)": 2, "Z-score": 2}
+
+# Kolom teks berulang disimpan sebagai kode int16 ke kosakata per buffer; kosakata awal membuat
+# kode jenis kelamin dan status sama dengan JENIS_KELAMIN dan DAFTAR_STATUS
+KOSAKATA_AWAL = {
+    "Nama": (),
+    "JenisPenginput": ("WARGA",),
+    "Jenis Kelamin": JENIS_KELAMIN,
+    "Status": DAFTAR_STATUS,
+}
+
+# Tanggal disimpan sebagai nomor hari sejak 1970-01-01 (int32)
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+
+TIPE_KOLOM = {**TIPE_KOLOM_NUMERIK, "Tanggal": np.int32, **{kol: np.int16 for kol in KOSAKATA_AWAL}}
+
+def nomor_hari(tanggal):
+    """Mengubah tanggal YYYY-MM-DD menjadi nomor hari sejak 1970-01-01."""
+    return date.fromisoformat(tanggal).toordinal() - _ORDINAL_EPOCH
+
+def _ke_float64(arr, kol):
+    return np.round(arr.astype(np.float64), PRESISI_FLOAT32[kol])
+
+# Sumber id unik per buffer, agar kunci cache turunan (grafik, dll.) tidak bertabrakan antar buffer
+_penghitung_id = itertools.count()
+
+class BufferHistori:
+    """Histori pengukuran satu anak dalam bentuk kolumnar dengan penambahan O(1) teramortisasi.
+
+    Semua kolom disimpan sebagai array bertipe ringkas (lihat TIPE_KOLOM): tanggal sebagai nomor
+    hari, teks berulang sebagai kode kosakata. Label baru dibentuk saat DataFrame dibuat untuk
+    ditampilkan. Tanggal yang sudah tercatat disimpan dalam indeks hash sehingga aturan satu
+    pengukuran per hari diperiksa tanpa memindai histori. DataFrame di-cache berdasarkan `versi`,
+    yang naik setiap kali ada rekaman baru. Ringkasan untuk metrik UI dan tren pertumbuhan
+    diperbarui secara inkremental pada setiap penambahan.
+
+    Buffer dipakai bersama oleh banyak sesi (cache backend SQLite), sehingga penambahan dan setiap
+    pembacaan dilakukan di bawah kunci per buffer; hasil yang dikembalikan berupa salinan atau
+    objek yang tidak diubah lagi oleh penambahan berikutnya.
+    """
+
+    KAPASITAS_AWAL = 8
+
+    def __init__(self):
+        self.id = next(_penghitung_id)
+        self._kunci = threading.RLock()
+        self._n = 0
+        self._kolom = {kol: np.empty(self.KAPASITAS_AWAL, dtype=TIPE_KOLOM[kol]) for kol in KOLOM_HISTORI}
+        self._kosakata = {kol: list(awal) for kol, awal in KOSAKATA_AWAL.items()}
+        self._kode = {kol: {label: i for i, label in enumerate(awal)} for kol, awal in KOSAKATA_AWAL.items()}
+        self._tanggal = set()
+        self._terurut = True
+        # Usia tidak naik bersama tanggal jika nama yang sama disimpan dengan tanggal lahir berbeda
+        self._usia_terurut = True
+        self.versi = 0
+        self._cache_df = None
+        self._versi_cache_df = -1
+        self._hari_terakhir = None
+        self._ringkasan = {"total": 0, "z_terakhir": None, "jumlah_stunting": 0, "berat_terakhir": None}
+        self._tren = {kol: np.empty(0) for kol in KOLOM_TREN}
+        self._n_tren = 0
+        self._cache_tren = None
+        self._versi_cache_tren = -1
+
+    def __len__(self):
+        with self._kunci:
+            return self._n
+
+    @property
+    def kunci_versi(self):
+        """Kunci (id buffer, versi) untuk meng-cache hasil turunan dari isi histori saat ini."""
+        with self._kunci:
+            return (self.id, self.versi)
+
+    def ada(self, tanggal):
+        """Memeriksa apakah sudah ada pengukuran pada tanggal (YYYY-MM-DD) tertentu."""
+        hari = nomor_hari(tanggal)
+        with self._kunci:
+            return hari in self._tanggal
+
+    def _perbesar(self):
+        for kol, arr in self._kolom.items():
+            baru = np.empty(2 * len(arr), dtype=arr.dtype)
+            baru[:self._n] = arr[:self._n]
+            self._kolom[kol] = baru
+
+    def _kode_kategori(self, kol, label):
+        kode = self._kode[kol].get(label)
+        if kode is None:
+            kode = self._kode[kol][label] = len(self._kosakata[kol])
+            self._kosakata[kol].append(label)
+        return kode
+
+    def tambah(self, rekaman):
+        """Menambahkan satu rekaman (tuple sesuai KOLOM_HISTORI). Mengembalikan False jika tanggalnya sudah ada."""
+        hari = nomor_hari(rekaman[IDX_TANGGAL])
+        with self._kunci:
+            return self._tambah(hari, rekaman)
+
+    def _tambah(self, hari, rekaman):
+        if hari in self._tanggal:
+            return False
+        if self._n == len(self._kolom["Tanggal"]):
+            self._perbesar()
+
+        if self._n and hari < self._kolom["Tanggal"][self._n - 1]:
+            self._terurut = False
+        if self._n and rekaman[IDX_USIA_HARI] < self._kolom["Usia (Hari)"][self._n - 1]:
+            self._usia_terurut = False
+        for kol, nilai in zip(KOLOM_HISTORI, rekaman):
+            if kol == "Tanggal":
+                nilai = hari
+            elif kol in self._kode:
+                nilai = self._kode_kategori(kol, nilai)
+            self._kolom[kol][self._n] = nilai
+        self._tanggal.add(hari)
+        self._n += 1
+        self._perbarui_ringkasan(hari, rekaman)
+        self.versi += 1
+        return True
+
+    def _perbarui_ringkasan(self, hari, rekaman):
+        ringkasan = self._ringkasan
+        z_score = float(rekaman[IDX_Z_SCORE])
+        ringkasan["total"] += 1
+        if z_score < -2:
+            ringkasan["jumlah_stunting"] += 1
+        # "Terakhir" mengikuti urutan tanggal, bukan urutan input
+        if self._hari_terakhir is None or hari > self._hari_terakhir:
+            self._hari_terakhir = hari
+            ringkasan["z_terakhir"] = z_score
+            ringkasan["berat_terakhir"] = float(rekaman[IDX_BERAT])
+
+    def ringkasan(self):
+        """Mengembalikan salinan ringkasan: total, z_terakhir, jumlah_stunting, berat_terakhir."""
+        with self._kunci:
+            return dict(self._ringkasan)
+
+    def _hitung_tren(self, urutan=None, mulai=0):
+        kolom = [self._kolom[kol][:self._n] for kol in ("Usia (Hari)", "Tinggi (cm)", "Berat (kg)", "Z-score")]
+        kolom = [kolom[0]] + [_ke_float64(arr, kol) for arr, kol in zip(kolom[1:], ("Tinggi (cm)", "Berat (kg)", "Z-score"))]
+        if urutan is not None:
+            kolom = [arr[urutan] for arr in kolom]
+        return hitung_tren(*kolom, mulai=mulai)
+
+    def _hitung_tren_penuh(self):
+        """Tren seluruh histori untuk rekaman yang tidak datang berurutan menurut tanggal dan usia."""
+        n = self._n
+        tanggal = self._kolom["Tanggal"][:n]
+        # hitung_tren memerlukan urutan usia; hasilnya dikembalikan ke urutan tanggal seperti ke_dataframe
+        urutan_usia = np.lexsort((tanggal, self._kolom["Usia (Hari)"][:n]))
+        tren = self._hitung_tren(urutan_usia)
+        posisi = np.empty(n, dtype=np.intp)
+        posisi[urutan_usia] = np.arange(n)
+        ambil = posisi[np.argsort(tanggal, kind="stable")]
+        return {kol: arr[ambil] for kol, arr in tren.items()}
+
+    def tren(self):
+        """Mengembalikan tren pertumbuhan per pengukuran (dict array KOLOM_TREN, terurut menurut tanggal; hanya-baca).
+
+        Selama rekaman datang berurutan menurut tanggal dan usia, hanya baris baru yang dihitung.
+        Penambahan di tengah histori, atau usia yang tidak naik bersama tanggal, membuat tren
+        dihitung ulang penuh (sekali per versi).
+        """
+        with self._kunci:
+            return self._tren_terkini()
+
+    def _tren_terkini(self):
+        n = self._n
+        if not (self._terurut and self._usia_terurut):
+            if self._versi_cache_tren != self.versi:
+                self._cache_tren = self._hitung_tren_penuh()
+                self._versi_cache_tren = self.versi
+            return self._cache_tren
+
+        if self._n_tren < n:
+            if len(self._tren["flag"]) < n:
+                kapasitas = len(self._kolom["Tanggal"])
+                for kol, arr in self._tren.items():
+                    baru = np.empty(kapasitas, dtype=np.uint8 if kol == "flag" else np.float64)
+                    baru[:self._n_tren] = arr[:self._n_tren]
+                    self._tren[kol] = baru
+            for kol, arr in self._hitung_tren(mulai=self._n_tren).items():
+                self._tren[kol][self._n_tren:n] = arr
+            self._n_tren = n
+        # View aman dibagikan: baris [:n] tidak pernah ditulis ulang, dan pembesaran membuat array baru
+        return {kol: arr[:n] for kol, arr in self._tren.items()}
+
+    def ke_dataframe(self):
+        """Mengembalikan DataFrame histori terurut berdasarkan Tanggal (hanya-baca, di-cache per versi).
+
+        Kolom teks berulang menjadi Categorical dan Tanggal menjadi teks YYYY-MM-DD; hanya di sini label dibentuk.
+        """
+        with self._kunci:
+            return self._ke_dataframe()
+
+    def _ke_dataframe(self):
+        if self._versi_cache_df == self.versi:
+            return self._cache_df
+        # pandas diimpor saat dibutuhkan agar modul inti tetap ringan diimpor
+        import pandas as pd
+        
+        data = {}
+        for kol in KOLOM_HISTORI:
+            arr = self._kolom[kol][:self._n]
+            if kol == "Tanggal":
+                data[kol] = np.datetime_as_string(arr.astype("datetime64[D]"), unit="D")
+            elif kol in self._kosakata:
+                data[kol] = pd.Categorical.from_codes(arr.copy(), categories=list(self._kosakata[kol]))
+            elif kol in PRESISI_FLOAT32:
+                data[kol] = _ke_float64(arr, kol)
+            else:
+                data[kol] = arr.copy()
+        df = pd.DataFrame(data, columns=KOLOM_HISTORI)
+        if not self._terurut:
+            df = df.sort_values("Tanggal", kind="stable").reset_index(drop=True)
+        self._cache_df = df
+        self._versi_cache_df = self.versi
+        return df
+
+    def potret(self):
+        """Mengembalikan kunci_versi, ringkasan, dataframe, dan tren dari satu keadaan buffer yang sama.
+
+        Keempatnya diambil di bawah satu kunci sehingga penambahan dari sesi lain di antara
+        pembacaan tidak membuat jumlah baris DataFrame dan tren berbeda. Histori kosong
+        mengembalikan dataframe dan tren None tanpa membangun DataFrame.
+        """
+        with self._kunci:
+            kosong = self._n == 0
+            return {
+                "kunci_versi": (self.id, self.versi),
+                "ringkasan": dict(self._ringkasan),
+                "dataframe": None if kosong else self._ke_dataframe(),
+                "tren": None if kosong else self._tren_terkini(),
+            }
+
+    def ukuran_memori(self):
+        """Perkiraan pemakaian memori (byte) per bagian: kolom, indeks_tanggal, kosakata, tren, dan cache_dataframe."""
+        with self._kunci:
+            return self._ukuran_memori()
+
+    def _ukuran_memori(self):
+        tren = sum(arr.nbytes for arr in self._tren.values())
+        if self._cache_tren is not None:
+            tren += sum(arr.nbytes for arr in self._cache_tren.values())
+        return {
+            "kolom": sum(arr.nbytes for arr in self._kolom.values()),
+            "indeks_tanggal": sys.getsizeof(self._tanggal) + sum(sys.getsizeof(hari) for hari in self._tanggal),
+            "kosakata": sum(sys.getsizeof(label) for daftar in self._kosakata.values() for label in daftar),
+            "tren": tren,
+            "cache_dataframe": 0 if self._cache_df is None else int(self._cache_df.memory_usage(deep=True).sum()),
+        }
+
+def laporan_memori(daftar_buffer):
+    """Menjumlahkan ukuran_memori sekumpulan buffer menjadi laporan: jumlah anak, rekaman, byte per bagian, total."""
+    laporan = {"jumlah_anak": 0, "jumlah_rekaman": 0, "kolom": 0, "indeks_tanggal": 0, "kosakata": 0, "tren": 0, "cache_dataframe": 0}
+    for buffer in daftar_buffer:
+        laporan["jumlah_anak"] += 1
+        laporan["jumlah_rekaman"] += len(buffer)
+        for bagian, ukuran in buffer.ukuran_memori().items():
+            laporan[bagian] += ukuran
+    laporan["total"] = sum(laporan[bagian] for bagian in ("kolom", "indeks_tanggal", "kosakata", "tren", "cache_dataframe"))
+    laporan["byte_per_rekaman"] = laporan["total"] / laporan["jumlah_rekaman"] if laporan["jumlah_rekaman"] else 0.0
+    return laporan
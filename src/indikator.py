@@ -0,0 +1,140 @@
+import os
+import threading
+import numpy as np
+from dataclasses import dataclass
+from src.calculations import TabelLMS, bangun_tabel_lms, interpolasi_batch, hitung_z_score_batch, kode_jenis_kelamin, JENIS_KELAMIN
+from src.data_manager import DIREKTORI_DATA, baca_data
+
+@dataclass(frozen=True)
+class Indikator:
+    """Definisi satu indikator antropometri WHO berbasis tabel LMS."""
+    kode: str
+    nama: str
+    awalan_file: str          # awalan nama file WHO, mis. "wfa" untuk wfa-boys-zscore-expanded-tables.xlsx
+    kolom_sumbu: str          # Day, Length, atau Height
+    skala_sumbu: int          # pengali agar sumbu menjadi bilangan bulat (10 untuk langkah 0,1 cm)
+    pengukuran: str           # "tinggi", "berat", atau "imt"
+    rentang_usia_hari: tuple = None  # rentang usia (inklusif) tempat indikator berlaku; None = semua usia
+
+INDIKATOR = {
+    "tb_u": Indikator("tb_u", "Tinggi/Panjang Badan menurut Umur (TB/U)", "lhfa", "Day", 1, "tinggi"),
+    "bb_u": Indikator("bb_u", "Berat Badan menurut Umur (BB/U)", "wfa", "Day", 1, "berat"),
+    "bb_pb": Indikator("bb_pb", "Berat Badan menurut Panjang Badan (BB/PB)", "wfl", "Length", 10, "berat", (0, 730)),
+    "bb_tb": Indikator("bb_tb", "Berat Badan menurut Tinggi Badan (BB/TB)", "wfh", "Height", 10, "berat", (731, 1856)),
+    "imt_u": Indikator("imt_u", "Indeks Massa Tubuh menurut Umur (IMT/U)", "bfa", "Day", 1, "imt"),
+}
+
+# Nama file WHO yang diterima untuk setiap (awalan, jenis kelamin)
+POLA_FILE = ["{awalan}-{jk}-zscore-expanded-tables.xlsx", "{awalan}-{jk}-zscore-expanded-table.xlsx"]
+NAMA_FILE_JK = {"Laki-laki": "boys", "Perempuan": "girls"}
+
+@dataclass(frozen=True)
+class RegistriIndikator:
+    """Semua tabel LMS dalam satu array L, M, S bersambung; `tabel[(kode, kode_jk)]` adalah view ke dalamnya."""
+    L: np.ndarray
+    M: np.ndarray
+    S: np.ndarray
+    tabel: dict
+
+    @property
+    def indikator_tersedia(self):
+        return sorted({kode for kode, _ in self.tabel})
+
+_cache_registri = None
+_kunci_registri = threading.Lock()
+
+def _cari_file(indikator, jenis_kelamin):
+    for pola in POLA_FILE:
+        path = os.path.join(DIREKTORI_DATA, pola.format(awalan=indikator.awalan_file, jk=NAMA_FILE_JK[jenis_kelamin]))
+        if os.path.exists(path):
+            return path
+    return None
+
+def _bangun_registri(sumber):
+    """Menyalin tabel padat setiap (indikator, jenis kelamin) ke dalam satu array bersambung."""
+    padat = {}
+    for (kode, kode_jk), df in sumber.items():
+        indikator = INDIKATOR[kode]
+        sumbu = np.round(df[indikator.kolom_sumbu].to_numpy(dtype=np.float64) * indikator.skala_sumbu)
+        padat[(kode, kode_jk)] = bangun_tabel_lms(sumbu, df['L'], df['M'], df['S'])
+
+    total = sum(len(t.M) for t in padat.values())
+    L, M, S = np.empty(total), np.empty(total), np.empty(total)
+    tabel = {}
+    posisi = 0
+    for kunci, t in padat.items():
+        akhir = posisi + len(t.M)
+        L[posisi:akhir], M[posisi:akhir], S[posisi:akhir] = t.L, t.M, t.S
+        tabel[kunci] = TabelLMS(t.hari_awal, L[posisi:akhir], M[posisi:akhir], S[posisi:akhir])
+        posisi = akhir
+    for arr in (L, M, S):
+        arr.setflags(write=False)
+    return RegistriIndikator(L, M, S, tabel)
+
+def baca_registri():
+    """Mengembalikan registri semua indikator yang file WHO-nya tersedia di folder data (dipakai bersama).
+
+    Registri dibangun sekali per proses dan hanya dibangun ulang jika salah satu tabel sumber berubah.
+    Indikator yang filenya tidak ada dilewati.
+    """
+    global _cache_registri
+    sumber = {}
+    for kode, indikator in INDIKATOR.items():
+        for kode_jk, jenis_kelamin in enumerate(JENIS_KELAMIN):
+            path = _cari_file(indikator, jenis_kelamin)
+            if path is not None:
+                sumber[(kode, kode_jk)] = baca_data(path, indikator.kolom_sumbu)
+
+    # baca_data mengembalikan objek DataFrame yang sama selama file sumber tidak berubah
+    tanda = tuple((kunci, id(df)) for kunci, df in sumber.items())
+    entri = _cache_registri
+    if entri is not None and entri[0] == tanda:
+        return entri[1]
+
+    with _kunci_registri:
+        if _cache_registri is not None and _cache_registri[0] == tanda:
+            return _cache_registri[1]
+        registri = _bangun_registri(sumber)
+        _cache_registri = (tanda, registri, list(sumber.values()))
+        return registri
+
+def hitung_semua_indikator(jenis_kelamin, usia_hari, tinggi, berat, registri=None):
+    """Menghitung Z-score semua indikator yang tersedia dalam satu panggilan vektor.
+
+    Menerima skalar atau array. Mengembalikan dict kode indikator -> array Z-score;
+    NaN untuk baris di luar rentang usia/sumbu indikator atau jenis kelamin tak dikenal.
+    """
+    if registri is None:
+        registri = baca_registri()
+
+    kode_jk = np.atleast_1d(kode_jenis_kelamin(jenis_kelamin))
+    usia_hari = np.atleast_1d(np.asarray(usia_hari, dtype=np.float64))
+    tinggi = np.atleast_1d(np.asarray(tinggi, dtype=np.float64))
+    berat = np.atleast_1d(np.asarray(berat, dtype=np.float64))
+    kode_jk, usia_hari, tinggi, berat = np.broadcast_arrays(kode_jk, usia_hari, tinggi, berat)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nilai_pengukuran = {"tinggi": tinggi, "berat": berat, "imt": berat / (tinggi / 100) ** 2}
+
+    hasil = {}
+    for kode in registri.indikator_tersedia:
+        indikator = INDIKATOR[kode]
+        z_score = np.full(usia_hari.shape, np.nan)
+        sumbu = usia_hari if indikator.kolom_sumbu == 'Day' else tinggi * indikator.skala_sumbu
+        berlaku = np.ones(usia_hari.shape, dtype=bool)
+        if indikator.rentang_usia_hari is not None:
+            usia_min, usia_maks = indikator.rentang_usia_hari
+            berlaku = (usia_hari >= usia_min) & (usia_hari <= usia_maks)
+
+        for kode_jk_tabel in range(len(JENIS_KELAMIN)):
+            tabel = registri.tabel.get((kode, kode_jk_tabel))
+            mask = berlaku & (kode_jk == kode_jk_tabel)
+            if tabel is None or not mask.any():
+                continue
+            L, M, S, di_luar_rentang = interpolasi_batch(sumbu[mask], tabel)
+            z = hitung_z_score_batch(nilai_pengukuran[indikator.pengukuran][mask], L, M, S)
+            # Usia dijepit seperti interpolasi; panjang/tinggi di luar tabel tidak punya nilai rujukan
+            if indikator.kolom_sumbu != 'Day':
+                z[di_luar_rentang] = np.nan
+            z_score[mask] = z
+        hasil[kode] = z_score
+    return hasil
@@ -0,0 +1,195 @@
+"""Instrumentasi ringan untuk mengukur fase-fase satu rerun tanpa profiler.
+
+Span hanya direkam jika ada Jejak aktif di konteks saat ini (lihat rekam_rerun); tanpa itu
+`span()` tidak melakukan apa-apa, sehingga aman ditempatkan di jalur panas.
+
+Diaktifkan dengan variabel lingkungan INSTRUMENTASI=1 (waktu saja) atau INSTRUMENTASI=memori
+(waktu dan delta alokasi lewat tracemalloc), atau per sesi lewat parameter URL ?instrumentasi=1.
+Parameter URL hanya dapat menyalakan mode waktu: tracemalloc memperlambat seluruh proses sehingga
+mode memori hanya lewat variabel lingkungan.
+
+Jika INSTRUMENTASI_JSONL atau INSTRUMENTASI_PROM berisi path, setiap rerun juga ditulis ke
+file JSON lines dan file teks Prometheus (untuk textfile collector). Rerun yang direkam hanya
+karena parameter URL tidak ditulis ke file, agar pengunjung tidak dapat memperbesar file tanpa batas.
+"""
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+MODE_MATI = ""
+MODE_WAKTU = "waktu"
+MODE_MEMORI = "memori"
+
+PATH_JSONL = os.environ.get("INSTRUMENTASI_JSONL")
+PATH_PROM = os.environ.get("INSTRUMENTASI_PROM")
+
+_jejak_aktif = contextvars.ContextVar("jejak_instrumentasi", default=None)
+_penghitung_rerun = itertools.count(1)
+
+# Agregat seluruh proses per nama span: [jumlah, total detik, total alokasi byte, maks detik]
+_agregat = {}
+_kunci_agregat = threading.Lock()
+
+# Penulisan file ekspor diserialkan agar rerun dari thread berbeda tidak saling menimpa
+_kunci_file = threading.Lock()
+
+def mode_dari_teks(teks):
+    """Menerjemahkan nilai variabel lingkungan/parameter URL menjadi mode instrumentasi."""
+    teks = (teks or "").strip().lower()
+    if teks == MODE_MEMORI:
+        return MODE_MEMORI
+    if teks in ("1", "true", "ya", MODE_WAKTU):
+        return MODE_WAKTU
+    return MODE_MATI
+
+MODE_DEFAULT = mode_dari_teks(os.environ.get("INSTRUMENTASI"))
+
+class Jejak:
+    """Span yang direkam selama satu rerun, berurutan menurut waktu selesai."""
+
+    def __init__(self, mode, id_sesi=None):
+        self.nomor = next(_penghitung_rerun)
+        self.id_sesi = id_sesi
+        self.mode = mode
+        self.waktu_mulai = time.time()
+        self.span = []
+        self._tumpukan = []
+        self._mulai_ns = time.perf_counter_ns()
+
+    @property
+    def durasi_ms(self):
+        """Durasi span akar (rerun), atau 0 jika belum selesai."""
+        return next((s["durasi_ms"] for s in self.span if s["kedalaman"] == 0), 0.0)
+
+    def ke_dict(self):
+        return {"rerun": self.nomor, "sesi": self.id_sesi, "waktu": self.waktu_mulai, "mode": self.mode, "span": self.span}
+
+@contextlib.contextmanager
+def span(nama):
+    """Merekam durasi (dan delta alokasi pada mode memori) blok kode sebagai span bernama."""
+    jejak = _jejak_aktif.get()
+    if jejak is None:
+        yield
+        return
+
+    memori = jejak.mode == MODE_MEMORI and tracemalloc.is_tracing()
+    induk = jejak._tumpukan[-1] if jejak._tumpukan else None
+    jejak._tumpukan.append(nama)
+    alokasi_awal = tracemalloc.get_traced_memory()[0] if memori else 0
+    mulai = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        selesai = time.perf_counter_ns()
+        jejak._tumpukan.pop()
+        jejak.span.append({
+            "nama": nama,
+            "induk": induk,
+            "kedalaman": len(jejak._tumpukan),
+            "mulai_ms": (mulai - jejak._mulai_ns) / 1e6,
+            "durasi_ms": (selesai - mulai) / 1e6,
+            "alokasi_byte": tracemalloc.get_traced_memory()[0] - alokasi_awal if memori else None,
+        })
+
+@contextlib.contextmanager
+def rekam_rerun(mode, id_sesi=None):
+    """Mengaktifkan perekaman untuk satu rerun; menghasilkan Jejak, atau None jika mode mati.
+
+    Seluruh blok direkam sebagai span akar "rerun". Setelah selesai, jejak masuk ke agregat
+    proses dan, jika instrumentasi dinyalakan lewat variabel lingkungan, ditulis ke file JSON
+    lines dan Prometheus. Galat penulisan file hanya dilaporkan ke stderr.
+    """
+    if mode == MODE_MATI:
+        yield None
+        return
+    if mode == MODE_MEMORI and MODE_DEFAULT != MODE_MEMORI:
+        mode = MODE_WAKTU
+    if mode == MODE_MEMORI and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    jejak = Jejak(mode, id_sesi)
+    token = _jejak_aktif.set(jejak)
+    try:
+        with span("rerun"):
+            yield jejak
+    finally:
+        _jejak_aktif.reset(token)
+        _catat_agregat(jejak)
+        if MODE_DEFAULT != MODE_MATI:
+            _tulis_file(jejak)
+
+def _tulis_file(jejak):
+    try:
+        with _kunci_file:
+            if PATH_JSONL:
+                with open(PATH_JSONL, "a") as f:
+                    f.write(ke_json_lines([jejak]))
+            if PATH_PROM:
+                path_sementara = f"{PATH_PROM}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(path_sementara, "w") as f:
+                    f.write(ke_prometheus())
+                os.replace(path_sementara, PATH_PROM)
+    except Exception as e:
+        # Instrumentasi tidak boleh menggagalkan rerun
+        print(f"Instrumentasi: gagal menulis file ekspor: {e}", file=sys.stderr)
+
+def _catat_agregat(jejak):
+    with _kunci_agregat:
+        for s in jejak.span:
+            entri = _agregat.setdefault(s["nama"], [0, 0.0, 0, 0.0])
+            detik = s["durasi_ms"] / 1e3
+            entri[0] += 1
+            entri[1] += detik
+            entri[2] += s["alokasi_byte"] or 0
+            entri[3] = max(entri[3], detik)
+
+def ringkasan_span(daftar_jejak):
+    """Statistik per nama span atas beberapa jejak: jumlah, rata-rata, p95, dan maks (ms), serta rata-rata alokasi."""
+    per_nama = {}
+    for jejak in daftar_jejak:
+        for s in jejak.span:
+            per_nama.setdefault(s["nama"], []).append(s)
+    hasil = []
+    for nama, daftar in per_nama.items():
+        durasi = sorted(s["durasi_ms"] for s in daftar)
+        alokasi = [s["alokasi_byte"] for s in daftar if s["alokasi_byte"] is not None]
+        hasil.append({
+            "span": nama,
+            "jumlah": len(durasi),
+            "rata_ms": sum(durasi) / len(durasi),
+            "p95_ms": durasi[min(len(durasi) - 1, int(0.95 * len(durasi)))],
+            "maks_ms": durasi[-1],
+            "rata_alokasi_kib": sum(alokasi) / len(alokasi) / 1024 if alokasi else None,
+        })
+    return sorted(hasil, key=lambda baris: baris["rata_ms"], reverse=True)
+
+def ke_json_lines(daftar_jejak):
+    """Satu baris JSON per jejak (rerun)."""
+    return "".join(json.dumps(jejak.ke_dict(), ensure_ascii=False) + "\n" for jejak in daftar_jejak)
+
+def _label(nilai):
+    return str(nilai).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def ke_prometheus():
+    """Agregat seluruh proses dalam format teks eksposisi Prometheus."""
+    with _kunci_agregat:
+        agregat = {nama: list(entri) for nama, entri in _agregat.items()}
+    metrik = [
+        ("pemantau_span_jumlah_total", "counter", "Jumlah span instrumentasi yang direkam.", 0),
+        ("pemantau_span_detik_total", "counter", "Total durasi span instrumentasi (detik).", 1),
+        ("pemantau_span_alokasi_byte_total", "counter", "Total delta alokasi span (byte, hanya mode memori).", 2),
+        ("pemantau_span_detik_maks", "gauge", "Durasi span terlama sejak proses dimulai (detik).", 3),
+    ]
+    baris = []
+    for nama_metrik, tipe, bantuan, indeks in metrik:
+        baris.append(f"# HELP {nama_metrik} {bantuan}")
+        baris.append(f"# TYPE {nama_metrik} {tipe}")
+        for nama, entri in sorted(agregat.items()):
+            baris.append(f'{nama_metrik}{{span="{_label(nama)}"}} {entri[indeks]}')
+    return "\n".join(baris) + "\n"
@@ -0,0 +1,70 @@
+import collections
+from src.calculations import DAFTAR_STATUS, hitung_usia_bulan
+
+# (label, batas atas usia dalam bulan, eksklusif); kelompok terakhir tanpa batas atas
+KELOMPOK_USIA_KOHORT = [
+    ("0-5 bln", 6),
+    ("6-11 bln", 12),
+    ("12-23 bln", 24),
+    ("24-35 bln", 36),
+    ("36-47 bln", 48),
+    ("48-60 bln", None),
+]
+
+# Satu baris agregat: jumlah pengukuran per (jenis kelamin, kelompok usia, bulan YYYY-MM, status)
+KOLOM_AGREGAT = ["Jenis Kelamin", "Kelompok Usia", "Bulan", "Status", "Jumlah"]
+
+STATUS_STUNTING = DAFTAR_STATUS[:2]
+STATUS_STUNTING_BERAT = DAFTAR_STATUS[0]
+
+def kelompok_usia(usia_hari):
+    """Mengembalikan label kelompok usia kohort untuk usia dalam hari."""
+    usia_bulan = hitung_usia_bulan(usia_hari)
+    for label, batas in KELOMPOK_USIA_KOHORT:
+        if batas is None or usia_bulan < batas:
+            return label
+
+def sql_kelompok_usia(kolom_usia_hari):
+    """Ekspresi SQL CASE yang setara dengan kelompok_usia untuk kolom usia (hari)."""
+    cabang = [
+        f"WHEN {kolom_usia_hari} < {batas * 30.4375} THEN '{label}'"
+        for label, batas in KELOMPOK_USIA_KOHORT if batas is not None
+    ]
+    return f"CASE {' '.join(cabang)} ELSE '{KELOMPOK_USIA_KOHORT[-1][0]}' END"
+
+class AgregatKohort:
+    """Tabel agregat dalam memori yang diperbarui setiap kali satu pengukuran disimpan."""
+
+    def __init__(self):
+        self._jumlah = collections.Counter()
+
+    def tambah(self, jenis_kelamin, usia_hari, tanggal, status):
+        self._jumlah[(jenis_kelamin, kelompok_usia(usia_hari), tanggal[:7], status)] += 1
+
+    def baris(self):
+        return [kunci + (jumlah,) for kunci, jumlah in self._jumlah.items()]
+
+def hitung_prevalensi(baris_agregat, dimensi=()):
+    """Menghitung jumlah dan prevalensi stunting dari baris agregat, dikelompokkan menurut `dimensi`.
+
+    Biaya bergantung pada jumlah baris agregat (kombinasi kelompok), bukan jumlah pengukuran.
+    `dimensi` berisi nama kolom dari KOLOM_AGREGAT, mis. ["Bulan", "Jenis Kelamin"].
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(baris_agregat, columns=KOLOM_AGREGAT)
+    df["Stunting"] = df["Jumlah"].where(df["Status"].isin(STATUS_STUNTING), 0)
+    df["Stunting Berat"] = df["Jumlah"].where(df["Status"] == STATUS_STUNTING_BERAT, 0)
+    df["Kelompok Usia"] = pd.Categorical(df["Kelompok Usia"], categories=[label for label, _ in KELOMPOK_USIA_KOHORT], ordered=True)
+
+    kolom_jumlah = ["Jumlah", "Stunting", "Stunting Berat"]
+    if dimensi:
+        hasil = df.groupby(list(dimensi), observed=True)[kolom_jumlah].sum().reset_index()
+    else:
+        hasil = df[kolom_jumlah].sum().to_frame().T
+    hasil = hasil.rename(columns={"Jumlah": "Jumlah Pengukuran"})
+
+    total = hasil["Jumlah Pengukuran"].where(hasil["Jumlah Pengukuran"] > 0)
+    hasil["Prevalensi Stunting (%)"] = (100 * hasil["Stunting"] / total).round(1)
+    hasil["Prevalensi Stunting Berat (%)"] = (100 * hasil["Stunting Berat"] / total).round(1)
+    return hasil
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from src.calculations import kode_jenis_kelamin
+from src.indikator import INDIKATOR, hitung_semua_indikator
+
+# Batas Z-score tidak wajar menurut aturan pembersihan data WHO (WHO Anthro), per indikator
+BATAS_Z_TIDAK_WAJAR = {
+    "tb_u": (-6, 6),
+    "bb_u": (-6, 5),
+    "bb_pb": (-5, 5),
+    "bb_tb": (-5, 5),
+    "imt_u": (-5, 5),
+}
+
+# Penurunan tinggi yang masih dianggap kesalahan ukur wajar antar pengukuran (cm)
+TOLERANSI_TINGGI_TURUN = 1.0
+
+# Flag kualitas per baris (bitmask); satu bit per indikator Z-score sesuai urutan INDIKATOR
+FLAG_Z_TIDAK_WAJAR = {kode: 1 << i for i, kode in enumerate(INDIKATOR)}
+FLAG_DUPLIKAT = 1 << 5
+FLAG_TINGGI_TURUN = 1 << 6
+FLAG_TIDAK_LENGKAP = 1 << 7
+
+PESAN_FLAG = {
+    **{bit: f"Z-score {INDIKATOR[kode].nama} di luar batas WHO {BATAS_Z_TIDAK_WAJAR[kode]}" for kode, bit in FLAG_Z_TIDAK_WAJAR.items()},
+    FLAG_DUPLIKAT: "Duplikat pengukuran anak yang sama pada tanggal yang sama",
+    FLAG_TINGGI_TURUN: f"Tinggi turun lebih dari {TOLERANSI_TINGGI_TURUN} cm dari pengukuran sebelumnya",
+    FLAG_TIDAK_LENGKAP: "Jenis kelamin, tanggal, tinggi, atau berat kosong/tidak valid",
+}
+
+def flag_z_tidak_wajar(z_per_indikator):
+    """Menandai baris dengan Z-score di luar batas WHO; `z_per_indikator` adalah hasil hitung_semua_indikator."""
+    flag = None
+    for kode, z_score in z_per_indikator.items():
+        if flag is None:
+            flag = np.zeros(len(z_score), dtype=np.uint8)
+        bawah, atas = BATAS_Z_TIDAK_WAJAR[kode]
+        flag[(z_score < bawah) | (z_score > atas)] |= FLAG_Z_TIDAK_WAJAR[kode]
+    return flag
+
+def flag_deret(kode_anak, hari_ukur, tinggi):
+    """Menandai duplikat (anak, tanggal) dan tinggi yang turun dalam deret tiap anak, dengan satu pengurutan.
+
+    `kode_anak` berisi kode bilangan bulat per baris (negatif = tidak dikenal, dilewati) dan `hari_ukur`
+    nomor hari tanggal pengukuran. Kemunculan pertama (menurut urutan masukan) tidak ditandai duplikat.
+    """
+    kode_anak = np.asarray(kode_anak, dtype=np.int64)
+    hari_ukur = np.asarray(hari_ukur, dtype=np.float64)
+    tinggi = np.asarray(tinggi, dtype=np.float64)
+    flag = np.zeros(len(kode_anak), dtype=np.uint8)
+    if len(kode_anak) < 2:
+        return flag
+
+    # lexsort stabil: urut per anak lalu tanggal, baris masukan yang lebih awal tetap di depan
+    urutan = np.lexsort((hari_ukur, kode_anak))
+    anak = kode_anak[urutan]
+    hari = hari_ukur[urutan]
+    t = tinggi[urutan]
+
+    anak_sama = (anak[1:] == anak[:-1]) & (anak[1:] >= 0) & ~np.isnan(hari[1:])
+    duplikat = anak_sama & (hari[1:] == hari[:-1])
+    turun = anak_sama & (hari[1:] > hari[:-1]) & (t[1:] < t[:-1] - TOLERANSI_TINGGI_TURUN)
+
+    flag_urut = np.zeros(len(kode_anak), dtype=np.uint8)
+    flag_urut[1:][duplikat] |= FLAG_DUPLIKAT
+    flag_urut[1:][turun] |= FLAG_TINGGI_TURUN
+    flag[urutan] = flag_urut
+    return flag
+
+def periksa_kualitas(nama, hari_ukur, jenis_kelamin, usia_hari, tinggi, berat, registri=None):
+    """Memeriksa kewajaran seluruh dataset dalam satu lintasan vektor; mengembalikan bitmask flag (uint8) per baris.
+
+    Menggabungkan batas Z-score WHO untuk semua indikator yang tersedia, duplikat (nama, tanggal),
+    tinggi yang turun dalam deret anak, dan data yang tidak lengkap. 0 berarti lolos semua pemeriksaan.
+    """
+    usia_hari = np.asarray(usia_hari, dtype=np.float64)
+    tinggi = np.asarray(tinggi, dtype=np.float64)
+    berat = np.asarray(berat, dtype=np.float64)
+    jenis_kelamin = kode_jenis_kelamin(jenis_kelamin)
+    kode_anak = pd.factorize(np.asarray(nama, dtype=object))[0]
+
+    flag = flag_deret(kode_anak, hari_ukur, tinggi)
+    flag_z = flag_z_tidak_wajar(hitung_semua_indikator(jenis_kelamin, usia_hari, tinggi, berat, registri))
+    if flag_z is not None:
+        flag |= flag_z
+    tidak_lengkap = (np.isnan(usia_hari) | np.isnan(tinggi) | np.isnan(berat)
+                     | np.isnan(np.asarray(hari_ukur, dtype=np.float64)) | (jenis_kelamin < 0) | (kode_anak < 0))
+    flag[tidak_lengkap] |= FLAG_TIDAK_LENGKAP
+    return flag
+
+def jelaskan_flag(flag):
+    """Mengubah bitmask flag satu baris menjadi daftar pesan."""
+    return [pesan for bit, pesan in PESAN_FLAG.items() if int(flag) & bit]
+
+def ringkasan_flag(flag):
+    """Menghitung jumlah baris per jenis flag (dict pesan -> jumlah) untuk triase hasil impor."""
+    flag = np.asarray(flag, dtype=np.uint8)
+    return {pesan: int(np.count_nonzero(flag & bit)) for bit, pesan in PESAN_FLAG.items()}
@@ -0,0 +1,99 @@
+"""Pemanasan saat server mulai: tabel WHO dimuat ke cache proses sebelum pengguna pertama menekan Hitung.
+
+Aplikasi memulai pemanasan di thread latar belakang sekali per proses (lihat mulai_pemanasan), sehingga
+halaman pertama tetap tampil tanpa menunggu. Pengguna yang menekan Hitung sebelum pemanasan selesai
+menunggu di kunci cache referensi yang sama, bukan mengurai ulang Excel.
+
+Nonaktifkan dengan PEMANASAN=0. Untuk image container, jalankan saat build agar cache biner (.npz)
+sudah ada ketika container dimulai:
+    python -m src.pemanasan
+"""
+import os
+import sys
+import threading
+import time
+
+AKTIF = os.environ.get("PEMANASAN", "1") != "0"
+
+_kunci = threading.Lock()
+_thread = None
+_laporan = {"impor_ui_ms": None, "langkah": {}, "total_ms": None, "galat": {}}
+
+def _langkah(nama, fungsi):
+    mulai = time.perf_counter()
+    try:
+        fungsi()
+    except Exception as e:
+        # File referensi yang hilang dilaporkan oleh UI saat dipakai; pemanasan tidak menggagalkan server
+        _laporan["galat"][nama] = str(e)
+    _laporan["langkah"][nama] = (time.perf_counter() - mulai) * 1e3
+
+def _impor_grafik():
+    # src.grafik tidak diimpor saat UI dimuat; diimpor di sini agar grafik pertama tidak menunggu.
+    # plotly sendiri biasanya sudah diimpor oleh streamlit, jadi langkah ini murah
+    import src.grafik
+
+def panaskan(dengan_grafik=True):
+    """Memuat tabel TB/U kedua jenis kelamin dan registri semua indikator ke cache proses.
+
+    Setiap langkah berjalan walaupun langkah sebelumnya gagal. Mengembalikan laporan: durasi per
+    langkah dan total (ms), serta galat per langkah yang gagal.
+    """
+    from src.data_manager import baca_tabel_lms_semua
+    from src.indikator import baca_registri
+
+    mulai = time.perf_counter()
+    _langkah("tabel_lms", baca_tabel_lms_semua)
+    _langkah("registri_indikator", baca_registri)
+    if dengan_grafik:
+        _langkah("impor_grafik", _impor_grafik)
+    _laporan["total_ms"] = (time.perf_counter() - mulai) * 1e3
+    return laporan_mulai()
+
+def _jalankan():
+    laporan = panaskan()
+    rincian = ", ".join(f"{nama} {ms:.0f} ms" for nama, ms in laporan["langkah"].items())
+    pesan = f"Pemanasan selesai dalam {laporan['total_ms']:.0f} ms ({rincian})"
+    if laporan["impor_ui_ms"] is not None:
+        pesan += f"; impor UI {laporan['impor_ui_ms']:.0f} ms"
+    for nama, galat in laporan["galat"].items():
+        pesan += f"; galat {nama}: {galat}"
+    print(pesan, file=sys.stderr)
+
+def mulai_pemanasan():
+    """Memulai pemanasan di thread latar belakang, sekali per proses. Aman dipanggil setiap rerun."""
+    global _thread
+    if not AKTIF:
+        return
+    with _kunci:
+        if _thread is None:
+            _thread = threading.Thread(target=_jalankan, name="pemanasan", daemon=True)
+            _thread.start()
+
+def catat_impor_ui(durasi_ms):
+    """Mencatat durasi impor modul UI pada rerun pertama proses (rerun berikutnya memakai modul dari cache)."""
+    with _kunci:
+        if _laporan["impor_ui_ms"] is None:
+            _laporan["impor_ui_ms"] = durasi_ms
+
+def pemanasan_selesai():
+    return _thread is not None and not _thread.is_alive()
+
+def laporan_mulai():
+    """Salinan laporan waktu mulai: impor UI, durasi pemanasan per langkah, total, dan galat per langkah."""
+    return {**_laporan, "langkah": dict(_laporan["langkah"]), "galat": dict(_laporan["galat"])}
+
+def main():
+    # Tanpa grafik: tujuannya membangun cache biner .npz di data/.cache/, bukan mengimpor modul UI
+    laporan = panaskan(dengan_grafik=False)
+    for nama, ms in laporan["langkah"].items():
+        print(f"{nama:<20} {ms:8.1f} ms")
+    print(f"{'total':<20} {laporan['total_ms']:8.1f} ms")
+    for nama, galat in laporan["galat"].items():
+        print(f"Error ({nama}): {galat}", file=sys.stderr)
+    if laporan["galat"]:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import os
+import collections
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from src.histori import KOLOM_HISTORI, IDX_NAMA, BufferHistori, laporan_memori
+from src.kohort import AgregatKohort, sql_kelompok_usia
+
+# Nama kolom di tabel SQLite, berurutan sesuai KOLOM_HISTORI
+KOLOM_DB = ["nama", "jenis_penginput", "tanggal", "jenis_kelamin", "usia_hari", "usia_bulan", "tinggi", "berat", "z_score", "status"]
+
+class PenyimpananHistori(ABC):
+    """Antarmuka backend histori pengukuran.
+
+    Satu rekaman adalah tuple berurutan sesuai KOLOM_HISTORI dengan Tanggal berformat
+    YYYY-MM-DD. Setiap anak (Nama) hanya boleh memiliki satu pengukuran per tanggal.
+    """
+
+    @abstractmethod
+    def simpan(self, rekaman):
+        """Menyimpan satu rekaman. Mengembalikan False jika (Nama, Tanggal) sudah ada."""
+
+    def simpan_banyak(self, daftar_rekaman):
+        """Menyimpan banyak rekaman sekaligus; duplikat dilewati. Mengembalikan jumlah rekaman yang tersimpan."""
+        return sum(1 for rekaman in daftar_rekaman if self.simpan(rekaman))
+
+    @abstractmethod
+    def ada(self, nama, tanggal):
+        """Memeriksa apakah sudah ada pengukuran untuk anak dan tanggal tertentu."""
+
+    @abstractmethod
+    def baca_buffer(self, nama):
+        """Mengembalikan BufferHistori satu anak (dipakai bersama, jangan ditambah langsung)."""
+
+    @abstractmethod
+    def agregat_kohort(self):
+        """Mengembalikan baris agregat kohort (lihat KOLOM_AGREGAT) yang dipelihara saat penyimpanan."""
+
+    @abstractmethod
+    def iter_rekaman(self, ukuran_batch, nama=None):
+        """Mengalirkan rekaman (semua anak, atau satu anak jika `nama` diberikan) per daftar berisi maksimal `ukuran_batch` tuple.
+
+        Urutan per (Nama, Tanggal); memori yang dipakai sebanding dengan ukuran_batch, bukan jumlah rekaman.
+        """
+
+    @abstractmethod
+    def laporan_memori(self):
+        """Laporan pemakaian memori buffer histori yang dipegang backend ini (lihat histori.laporan_memori)."""
+
+    def baca(self, nama):
+        """Membaca histori satu anak sebagai DataFrame terurut berdasarkan Tanggal (hanya-baca, di-cache per versi)."""
+        return self.baca_buffer(nama).ke_dataframe()
+
+class PenyimpananSQLite(PenyimpananHistori):
+    """Backend SQLite (file lokal, mode WAL) dengan indeks unik pada (nama, tanggal).
+
+    Histori anak yang pernah dibaca disimpan sebagai BufferHistori (LRU) dan diperbarui
+    setiap kali rekaman baru disimpan melalui objek ini, sehingga rerun tanpa data baru
+    tidak menyentuh basis data.
+
+    Penulisan dari proses lain (server Streamlit kedua, batch, atau CLI impor ke file yang sama)
+    tidak terlihat di cache ini sampai buffer anak tersebut tersingkir dari LRU atau proses dimulai
+    ulang. Jalankan satu proses server per file basis data.
+    """
+
+    MAKS_ANAK_DI_CACHE = 1024
+
+    def __init__(self, path):
+        self.path = path
+        self._lokal = threading.local()
+        self._cache_anak = collections.OrderedDict()
+        self._kunci_cache = threading.Lock()
+        self._koneksi()
+
+    def _koneksi(self):
+        """Koneksi per thread, karena objek koneksi sqlite3 tidak boleh dipakai lintas thread."""
+        koneksi = getattr(self._lokal, "koneksi", None)
+        if koneksi is None:
+            folder = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(folder, exist_ok=True)
+            koneksi = sqlite3.connect(self.path, timeout=30)
+            koneksi.execute("PRAGMA journal_mode=WAL")
+            koneksi.execute("PRAGMA synchronous=NORMAL")
+            koneksi.execute("""
+                CREATE TABLE IF NOT EXISTS histori (
+                    id INTEGER PRIMARY KEY,
+                    nama TEXT NOT NULL,
+                    jenis_penginput TEXT,
+                    tanggal TEXT NOT NULL,
+                    jenis_kelamin TEXT,
+                    usia_hari INTEGER,
+                    usia_bulan REAL,
+                    tinggi REAL,
+                    berat REAL,
+                    z_score REAL,
+                    status TEXT
+                )
+            """)
+            koneksi.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_histori_nama_tanggal ON histori (nama, tanggal)")
+            self._siapkan_agregat(koneksi)
+            koneksi.commit()
+            self._lokal.koneksi = koneksi
+        return koneksi
+
+    def _siapkan_agregat(self, koneksi):
+        """Membuat tabel agregat kohort beserta trigger yang memperbaruinya pada setiap INSERT yang berhasil.
+
+        Karena trigger tidak terpicu untuk baris yang dilewati INSERT OR IGNORE, agregat tetap
+        tepat untuk simpan maupun simpan_banyak. Basis data lama diisi sekali dari tabel histori.
+        Pemeriksaan, pembuatan trigger, dan pengisian berjalan dalam satu transaksi BEGIN IMMEDIATE,
+        sehingga proses lain tidak dapat menyisipkan baris di antaranya (terhitung dua kali atau terlewat).
+        """
+        koneksi.execute("BEGIN IMMEDIATE")
+        with koneksi:
+            sudah_ada = koneksi.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'agregat_kohort'"
+            ).fetchone() is not None
+            koneksi.execute("""
+                CREATE TABLE IF NOT EXISTS agregat_kohort (
+                    jenis_kelamin TEXT,
+                    kelompok_usia TEXT,
+                    bulan TEXT,
+                    status TEXT,
+                    jumlah INTEGER NOT NULL,
+                    PRIMARY KEY (jenis_kelamin, kelompok_usia, bulan, status)
+                )
+            """)
+            koneksi.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_histori_agregat_kohort AFTER INSERT ON histori
+                BEGIN
+                    INSERT INTO agregat_kohort (jenis_kelamin, kelompok_usia, bulan, status, jumlah)
+                    VALUES (NEW.jenis_kelamin, {sql_kelompok_usia("NEW.usia_hari")}, substr(NEW.tanggal, 1, 7), NEW.status, 1)
+                    ON CONFLICT (jenis_kelamin, kelompok_usia, bulan, status) DO UPDATE SET jumlah = jumlah + 1;
+                END
+            """)
+            if not sudah_ada:
+                koneksi.execute(f"""
+                    INSERT INTO agregat_kohort (jenis_kelamin, kelompok_usia, bulan, status, jumlah)
+                    SELECT jenis_kelamin, {sql_kelompok_usia("usia_hari")}, substr(tanggal, 1, 7), status, COUNT(*)
+                    FROM histori GROUP BY 1, 2, 3, 4
+                """)
+
+    def _sql_insert(self):
+        return f"INSERT OR IGNORE INTO histori ({', '.join(KOLOM_DB)}) VALUES ({', '.join('?' * len(KOLOM_DB))})"
+
+    def simpan(self, rekaman):
+        koneksi = self._koneksi()
+        with self._kunci_cache:
+            with koneksi:
+                cursor = koneksi.execute(self._sql_insert(), tuple(rekaman))
+            tersimpan = cursor.rowcount == 1
+            buffer = self._cache_anak.get(rekaman[IDX_NAMA])
+            if tersimpan and buffer is not None:
+                buffer.tambah(tuple(rekaman))
+        return tersimpan
+
+    def simpan_banyak(self, daftar_rekaman):
+        daftar_rekaman = [tuple(rekaman) for rekaman in daftar_rekaman]
+        koneksi = self._koneksi()
+        with self._kunci_cache:
+            with koneksi:
+                cursor = koneksi.executemany(self._sql_insert(), daftar_rekaman)
+            # Buffer anak yang terdampak dibuang dan dimuat ulang saat dibaca berikutnya
+            for nama in {rekaman[IDX_NAMA] for rekaman in daftar_rekaman}:
+                self._cache_anak.pop(nama, None)
+        return max(cursor.rowcount, 0)
+
+    def ada(self, nama, tanggal):
+        cursor = self._koneksi().execute("SELECT 1 FROM histori WHERE nama = ? AND tanggal = ? LIMIT 1", (nama, tanggal))
+        return cursor.fetchone() is not None
+
+    def baca_buffer(self, nama):
+        with self._kunci_cache:
+            buffer = self._cache_anak.get(nama)
+            if buffer is None:
+                # Filter dan urutan dilayani langsung oleh indeks (nama, tanggal)
+                cursor = self._koneksi().execute(
+                    f"SELECT {', '.join(KOLOM_DB)} FROM histori WHERE nama = ? ORDER BY tanggal", (nama,)
+                )
+                buffer = BufferHistori()
+                for rekaman in cursor:
+                    buffer.tambah(rekaman)
+                self._cache_anak[nama] = buffer
+                if len(self._cache_anak) > self.MAKS_ANAK_DI_CACHE:
+                    self._cache_anak.popitem(last=False)
+            else:
+                self._cache_anak.move_to_end(nama)
+            return buffer
+
+    def agregat_kohort(self):
+        cursor = self._koneksi().execute("SELECT jenis_kelamin, kelompok_usia, bulan, status, jumlah FROM agregat_kohort")
+        return cursor.fetchall()
+
+    def laporan_memori(self):
+        # Cache LRU dipakai bersama oleh semua sesi dalam proses ini
+        with self._kunci_cache:
+            return laporan_memori(list(self._cache_anak.values()))
+
+    def iter_rekaman(self, ukuran_batch, nama=None):
+        sql = f"SELECT {', '.join(KOLOM_DB)} FROM histori"
+        if nama is None:
+            cursor = self._koneksi().execute(sql + " ORDER BY nama, tanggal")
+        else:
+            cursor = self._koneksi().execute(sql + " WHERE nama = ? ORDER BY tanggal", (nama,))
+        while True:
+            batch = cursor.fetchmany(ukuran_batch)
+            if not batch:
+                return
+            yield batch
+
+class PenyimpananMemori(PenyimpananHistori):
+    """Backend dalam memori; data hilang saat objek dibuang (perilaku histori per sesi yang lama)."""
+
+    def __init__(self):
+        self._per_anak = {}
+        self._agregat = AgregatKohort()
+        self._kunci = threading.Lock()
+
+    def simpan(self, rekaman):
+        with self._kunci:
+            buffer = self._per_anak.get(rekaman[IDX_NAMA])
+            if buffer is None:
+                buffer = self._per_anak[rekaman[IDX_NAMA]] = BufferHistori()
+            if not buffer.tambah(rekaman):
+                return False
+            data = dict(zip(KOLOM_HISTORI, rekaman))
+            self._agregat.tambah(data["Jenis Kelamin"], data["Usia (Hari)"], data["Tanggal"], data["Status"])
+            return True
+
+    def ada(self, nama, tanggal):
+        buffer = self._per_anak.get(nama)
+        return buffer is not None and buffer.ada(tanggal)
+
+    def baca_buffer(self, nama):
+        buffer = self._per_anak.get(nama)
+        return buffer if buffer is not None else BufferHistori()
+
+    def agregat_kohort(self):
+        with self._kunci:
+            return self._agregat.baris()
+
+    def laporan_memori(self):
+        with self._kunci:
+            return laporan_memori(list(self._per_anak.values()))
+
+    def iter_rekaman(self, ukuran_batch, nama=None):
+        with self._kunci:
+            daftar_nama = sorted(self._per_anak) if nama is None else [nama]
+        batch = []
+        for nama_anak in daftar_nama:
+            df = self.baca_buffer(nama_anak).ke_dataframe()
+            for rekaman in df.itertuples(index=False, name=None):
+                batch.append(rekaman)
+                if len(batch) == ukuran_batch:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,96 @@
+import numpy as np
+from src.calculations import hitung_usia_bulan
+
+# Perubahan Z-score dihitung terhadap pengukuran paling awal dalam jendela ini (hari)
+JENDELA_HARI_TREN = 90
+
+# Penurunan Z-score dalam jendela yang dianggap memotong garis persentil utama
+AMBANG_PENURUNAN_Z = -0.67
+
+# Tinggi badan baru dinilai tidak naik jika selang antar pengukuran minimal sekian hari
+SELANG_MIN_LAJU_TINGGI = 30
+
+# Flag tren per pengukuran (bitmask), dibandingkan dengan pengukuran sebelumnya atau jendela
+TREN_Z_TURUN = 1
+TREN_TINGGI_TIDAK_NAIK = 2
+TREN_BERAT_TURUN = 4
+TREN_MASUK_STUNTING = 8
+
+PESAN_TREN = {
+    TREN_Z_TURUN: f"Z-score turun lebih dari {-AMBANG_PENURUNAN_Z} dalam {JENDELA_HARI_TREN} hari terakhir.",
+    TREN_TINGGI_TIDAK_NAIK: "Tinggi badan tidak bertambah sejak pengukuran sebelumnya.",
+    TREN_BERAT_TURUN: "Berat badan menurun dari pengukuran sebelumnya.",
+    TREN_MASUK_STUNTING: "Z-score baru saja turun di bawah batas stunting (-2).",
+}
+
+KOLOM_TREN = ["selang_hari", "laju_tinggi", "laju_berat", "perubahan_z", "perubahan_z_jendela", "flag"]
+
+def hitung_tren(usia_hari, tinggi, berat, z_score, kelompok=None, mulai=0):
+    """Menghitung laju pertumbuhan dan flag gagal tumbuh untuk deret pengukuran terurut menurut usia.
+
+    Laju tinggi (cm/bulan) dan berat (kg/bulan) dinormalisasi dengan selang hari sebenarnya.
+    `kelompok` (opsional) berisi kode anak per baris; baris harus terurut per (kelompok, usia)
+    dan selisih tidak dihitung melewati batas kelompok. Hanya baris `mulai` ke atas yang dihitung,
+    sehingga pemanggil dapat memperbarui hasil secara inkremental. Mengembalikan dict array
+    (KOLOM_TREN); nilai baris pertama tiap anak adalah NaN dan flag 0.
+    """
+    usia_hari = np.asarray(usia_hari, dtype=np.float64)
+    tinggi = np.asarray(tinggi, dtype=np.float64)
+    berat = np.asarray(berat, dtype=np.float64)
+    z_score = np.asarray(z_score, dtype=np.float64)
+    n = len(usia_hari)
+    baris = np.arange(mulai, n)
+    sebelum = np.maximum(baris - 1, 0)
+
+    # Kunci urut gabungan (kelompok, usia) agar pencarian jendela tidak melewati anak lain
+    if kelompok is None:
+        kunci = usia_hari
+        ada_sebelumnya = baris > 0
+    else:
+        kelompok = np.asarray(kelompok, dtype=np.int64)
+        rentang = float(np.nanmax(usia_hari, initial=0)) + JENDELA_HARI_TREN + 1
+        kunci = kelompok * rentang + usia_hari
+        ada_sebelumnya = (baris > 0) & (kelompok[sebelum] == kelompok[baris])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        selang_hari = np.where(ada_sebelumnya, usia_hari[baris] - usia_hari[sebelum], np.nan)
+        selang_bulan = hitung_usia_bulan(selang_hari)
+        selang_bulan[selang_bulan <= 0] = np.nan
+        laju_tinggi = (tinggi[baris] - tinggi[sebelum]) / selang_bulan
+        laju_berat = (berat[baris] - berat[sebelum]) / selang_bulan
+        perubahan_z = np.where(ada_sebelumnya, z_score[baris] - z_score[sebelum], np.nan)
+
+    # searchsorted hanya benar untuk kunci terurut; baris sebelum `mulai` sudah diperiksa pada panggilan sebelumnya
+    if np.any(np.diff(kunci[max(mulai - 1, 0):]) < 0):
+        raise ValueError("hitung_tren memerlukan baris terurut menurut usia (per kelompok).")
+    awal_jendela = np.searchsorted(kunci, kunci[baris] - JENDELA_HARI_TREN, side='left')
+    perubahan_z_jendela = np.where(awal_jendela < baris, z_score[baris] - z_score[awal_jendela], np.nan)
+
+    flag = np.zeros(len(baris), dtype=np.uint8)
+    flag[perubahan_z_jendela <= AMBANG_PENURUNAN_Z] |= TREN_Z_TURUN
+    flag[(laju_tinggi <= 0) & (selang_hari >= SELANG_MIN_LAJU_TINGGI)] |= TREN_TINGGI_TIDAK_NAIK
+    flag[laju_berat < 0] |= TREN_BERAT_TURUN
+    flag[ada_sebelumnya & (z_score[baris] < -2) & (z_score[sebelum] >= -2)] |= TREN_MASUK_STUNTING
+
+    return {
+        "selang_hari": selang_hari,
+        "laju_tinggi": laju_tinggi,
+        "laju_berat": laju_berat,
+        "perubahan_z": perubahan_z,
+        "perubahan_z_jendela": perubahan_z_jendela,
+        "flag": flag,
+    }
+
+def pesan_tren(flag):
+    """Mengubah bitmask flag tren satu pengukuran menjadi daftar pesan."""
+    return [pesan for bit, pesan in PESAN_TREN.items() if int(flag) & bit]
+
+def hitung_tren_kohort(df_histori):
+    """Menghitung tren untuk histori banyak anak sekaligus (DataFrame dengan kolom KOLOM_HISTORI).
+
+    Mengembalikan DataFrame terurut per (Nama, Usia) dengan kolom KOLOM_TREN ditambahkan.
+    """
+    df = df_histori.sort_values(["Nama", "Usia (Hari)"], kind="stable").reset_index(drop=True)
+    kelompok = df["Nama"].factorize(sort=True)[0]
+    tren = hitung_tren(df["Usia (Hari)"], df["Tinggi (cm)"], df["Berat (kg)"], df["Z-score"], kelompok)
+    return df.assign(**tren)
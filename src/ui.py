@@ -1,64 +1,170 @@
+import math
+import uuid
 import streamlit as st
-import plotly.express as px
-import pandas as pd
+from collections import deque
 from datetime import datetime, date
-from src.calculations import interpolasi, hitung_z_score, tentukan_status, validasi_tinggi, validasi_berat, hitung_usia_hari, hitung_usia_bulan
-from src.data_manager import baca_data, simpan_histori, baca_histori
+from src.calculations import interpolasi_dengan_flag, hitung_z_score, tentukan_status, batas_tinggi_batch, validasi_tinggi, validasi_berat, hitung_usia_hari, hitung_usia_bulan
+from src.data_manager import atur_penyedia_penyimpanan_sesi, baca_tabel_lms, path_referensi, simpan_histori, potret_histori, baca_kurva_referensi, baca_agregat_kohort, dapatkan_penyimpanan, laporan_memori_histori, BACKEND_HISTORI
+from src.indikator import INDIKATOR, hitung_semua_indikator
+from src.kohort import hitung_prevalensi
+from src.pertumbuhan import JENDELA_HARI_TREN, pesan_tren
+from src.penyimpanan import PenyimpananMemori
+from src.ekspor import ekspor_histori_bytes
+from src.unggah import mulai_unggah, dapatkan_tugas, STATUS_SELESAI, STATUS_GAGAL, STATUS_DIBATALKAN
+from src.pemanasan import laporan_mulai
+from src.instrumentasi import span, mode_dari_teks, ke_json_lines, ke_prometheus, ringkasan_span, MODE_DEFAULT, MODE_MEMORI
 
-def buat_grafik(df_histori):
-    """Membuat grafik Z-score, berat badan, dan tinggi badan menggunakan Plotly Express."""
+# Gaya kartu metrik dan status untuk mode terang dan gelap
+CSS_APLIKASI = """
+<style>
+/* Light mode styles */
+.metric-container {
+    background-color: var(--background-color, #f8f9fa);
+    padding: 1.2rem;
+    border-radius: 8px;
+    margin: 0.5rem 0;
+    text-align: center;
+    border-left: 4px solid #007bff;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    color: var(--text-color, #333);
+    transition: all 0.3s ease;
+}
+
+.metric-value {
+    font-size: 2.2rem;
+    font-weight: bold;
+    color: #007bff;
+    margin: 0.5rem 0;
+}
+
+.metric-label {
+    font-size: 1rem;
+    color: var(--secondary-text-color, #6c757d);
+    margin-bottom: 0.5rem;
+    font-weight: 500;
+}
+
+.status-normal { border-left-color: #28a745; }
+.status-normal .metric-value { color: #28a745; }
+.status-stunting { border-left-color: #ffc107; }
+.status-stunting .metric-value { color: #e67e22; }
+.status-severe { border-left-color: #dc3545; }
+.status-severe .metric-value { color: #dc3545; }
+
+.info-box {
+    background-color: var(--background-color, #f8f9fa);
+    padding: 1rem;
+    border-radius: 8px;
+    border-left: 4px solid #17a2b8;
+    margin: 1rem 0;
+    color: var(--text-color, #333);
+    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+}
+
+.info-box h4 {
+    color: var(--text-color, #333);
+    margin-top: 0;
+}
+
+.info-box p {
+    color: var(--text-color, #333);
+    margin: 0.5rem 0;
+}
+
+@media (prefers-color-scheme: dark) {
+    :root {
+        --background-color: #262730;
+        --text-color: #fafafa;
+        --secondary-text-color: #a0a0a0;
+    }
+
+    .metric-container {
+        background-color: #262730;
+        border-color: rgba(255,255,255,0.1);
+        box-shadow: 0 2px 4px rgba(0,0,0,0.3);
+    }
+
+    .info-box {
+        background-color: #262730;
+        border-color: rgba(255,255,255,0.1);
+        box-shadow: 0 1px 3px rgba(0,0,0,0.3);
+    }
+
+    .status-stunting .metric-value { 
+        color: #f39c12;
+    }
+}
+
+[data-testid="stAppViewContainer"][data-theme="dark"] .metric-container,
+.stApp[data-theme="dark"] .metric-container {
+    background-color: #262730 !important;
+    color: #fafafa !important;
+    border-color: rgba(255,255,255,0.1) !important;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.3) !important;
+}
+
+[data-testid="stAppViewContainer"][data-theme="dark"] .info-box,
+.stApp[data-theme="dark"] .info-box {
+    background-color: #262730 !important;
+    color: #fafafa !important;
+    border-color: rgba(255,255,255,0.1) !important;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.3) !important;
+}
+
+[data-testid="stAppViewContainer"][data-theme="dark"] .info-box h4,
+[data-testid="stAppViewContainer"][data-theme="dark"] .info-box p,
+.stApp[data-theme="dark"] .info-box h4,
+.stApp[data-theme="dark"] .info-box p {
+    color: #fafafa !important;
+}
+
+[data-testid="stAppViewContainer"][data-theme="dark"] .metric-label,
+.stApp[data-theme="dark"] .metric-label {
+    color: #a0a0a0 !important;
+}
+
+[data-testid="stAppViewContainer"][data-theme="dark"] .status-stunting .metric-value,
+.stApp[data-theme="dark"] .status-stunting .metric-value {
+    color: #f39c12 !important;
+}
+
+@media (max-width: 768px) {
+    .metric-value { font-size: 1.8rem; }
+    .metric-container { padding: 1rem; }
+}
+</style>
+"""
+
+# Catatan lokasi penyimpanan histori di "Informasi Penting", sesuai backend yang dikonfigurasi
+CATATAN_PENYIMPANAN = {
+    "memori": "Data histori hanya disimpan di memori selama sesi browser ini dan hilang saat halaman dimuat ulang",
+    "sqlite": "Data histori disimpan per nama anak di basis data lokal server aplikasi",
+}
+
+def _penyimpanan_sesi():
+    """Backend histori "memori" yang disimpan di session state, sehingga hilang saat sesi berakhir."""
+    if 'penyimpanan_histori' not in st.session_state:
+        st.session_state.penyimpanan_histori = PenyimpananMemori()
+    return st.session_state.penyimpanan_histori
+
+atur_penyedia_penyimpanan_sesi(_penyimpanan_sesi)
+
+def buat_grafik(df_histori, kunci_versi=None):
+    """Menampilkan grafik Z-score, berat badan, dan tinggi badan dalam satu figur multi-panel."""
+    # Modul grafik diimpor saat grafik pertama dibutuhkan (biasanya sudah oleh pemanasan), bukan saat UI dimuat
+    from src.grafik import buat_figur_pertumbuhan, buat_figur_tinggi_usia
+    
     if not df_histori.empty:
-        df_plot = df_histori.copy()
-        df_plot['Tanggal'] = pd.to_datetime(df_plot['Tanggal'])
-        
-        # Grafik Z-score
-        fig_zscore = px.line(df_plot, x="Tanggal", y="Z-score", markers=True, 
-                            title="Perkembangan Z-score Anak",
-                            hover_data={"Usia (Hari)": True, "Usia (Bulan)": True, "Tinggi (cm)": True, "Berat (kg)": True, "Status": True})
-        
-        fig_zscore.add_hline(y=2, line_dash="dot", line_color="green", 
-                            annotation_text="Normal (+2)", annotation_position="top left")
-        fig_zscore.add_hline(y=-2, line_dash="dash", line_color="orange", 
-                            annotation_text="Batas Stunting (-2)", annotation_position="top left")
-        fig_zscore.add_hline(y=-3, line_dash="dash", line_color="red", 
-                            annotation_text="Stunting Berat (-3)", annotation_position="top left")
+        with span("grafik/pertumbuhan"):
+            fig = buat_figur_pertumbuhan(df_histori, kunci_versi)
+        with span("grafik/kirim"):
+            st.plotly_chart(fig, use_container_width=True)
         
-        fig_zscore.add_hrect(y0=-3, y1=-2, fillcolor="red", opacity=0.1, line_width=0)
-        fig_zscore.add_hrect(y0=-2, y1=2, fillcolor="green", opacity=0.1, line_width=0)
-        
-        fig_zscore.update_layout(
-            xaxis_title="Tanggal Pengukuran", 
-            yaxis_title="Z-score", 
-            showlegend=False,
-            yaxis=dict(range=[-5, 5])  # Diperluas dari [-4, 4] ke [-5, 5]
-        )
-        st.plotly_chart(fig_zscore, use_container_width=True)
-        
-        # Grafik Berat Badan
-        fig_berat = px.line(df_plot, x="Tanggal", y="Berat (kg)", markers=True, 
-                           title="Perkembangan Berat Badan Anak",
-                           hover_data={"Usia (Hari)": True, "Usia (Bulan)": True, "Tinggi (cm)": True, "Z-score": True, "Status": True})
-        
-        fig_berat.update_layout(
-            xaxis_title="Tanggal Pengukuran",
-            yaxis_title="Berat Badan (kg)",
-            showlegend=False,
-            yaxis=dict(range=[0, max(df_plot['Berat (kg)']) * 1.2])
-        )
-        st.plotly_chart(fig_berat, use_container_width=True)
-        
-        # Grafik Tinggi Badan
-        fig_tinggi = px.line(df_plot, x="Tanggal", y="Tinggi (cm)", markers=True, 
-                            title="Perkembangan Tinggi Badan Anak",
-                            hover_data={"Usia (Hari)": True, "Usia (Bulan)": True, "Berat (kg)": True, "Z-score": True, "Status": True})
-        
-        fig_tinggi.update_layout(
-            xaxis_title="Tanggal Pengukuran",
-            yaxis_title="Tinggi Badan (cm)",
-            showlegend=False,
-            yaxis=dict(range=[min(df_plot['Tinggi (cm)']) * 0.8, max(df_plot['Tinggi (cm)']) * 1.2])
-        )
-        st.plotly_chart(fig_tinggi, use_container_width=True)
+        with span("grafik/tinggi_usia"):
+            kurva = baca_kurva_referensi(df_histori['Jenis Kelamin'].iloc[-1])
+            fig_tinggi_usia = buat_figur_tinggi_usia(df_histori, kurva, kunci_versi)
+        with span("grafik/kirim"):
+            st.plotly_chart(fig_tinggi_usia, use_container_width=True)
         
         st.markdown("""
         **Interpretasi Z-score berdasarkan WHO:**
@@ -68,6 +174,19 @@ def buat_grafik(df_histori):
         - **Z < -3**: Sangat Pendek/Severely Stunted (perlu intervensi medis segera)
         """)
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def _ekspor_histori_parquet(nama, kunci_versi):
+    """Isi file Parquet histori satu anak, di-cache per versi histori."""
+    return ekspor_histori_bytes(dapatkan_penyimpanan(), nama)
+
+def _tombol_unduh_histori(nama, kunci_versi):
+    try:
+        data = _ekspor_histori_parquet(nama, kunci_versi)
+    except ImportError as e:
+        st.caption(str(e))
+        return
+    st.download_button("Unduh Histori (Parquet)", data, file_name=f"histori-{nama}.parquet", mime="application/vnd.apache.parquet")
+
 def render_ui():
     """Merender antarmuka pengguna Streamlit."""
     st.title("Kalkulator Stunting Anak")
@@ -76,125 +195,8 @@ def render_ui():
     
     st.info("Data WHO: Length/Height-for-Age Z-scores (0-1856 hari)")
     
-    st.markdown("""
-    <style>
-    /* Light mode styles */
-    .metric-container {
-        background-color: var(--background-color, #f8f9fa);
-        padding: 1.2rem;
-        border-radius: 8px;
-        margin: 0.5rem 0;
-        text-align: center;
-        border-left: 4px solid #007bff;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        color: var(--text-color, #333);
-        transition: all 0.3s ease;
-    }
-    
-    .metric-value {
-        font-size: 2.2rem;
-        font-weight: bold;
-        color: #007bff;
-        margin: 0.5rem 0;
-    }
-    
-    .metric-label {
-        font-size: 1rem;
-        color: var(--secondary-text-color, #6c757d);
-        margin-bottom: 0.5rem;
-        font-weight: 500;
-    }
-    
-    .status-normal { border-left-color: #28a745; }
-    .status-normal .metric-value { color: #28a745; }
-    .status-stunting { border-left-color: #ffc107; }
-    .status-stunting .metric-value { color: #e67e22; }
-    .status-severe { border-left-color: #dc3545; }
-    .status-severe .metric-value { color: #dc3545; }
-    
-    .info-box {
-        background-color: var(--background-color, #f8f9fa);
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #17a2b8;
-        margin: 1rem 0;
-        color: var(--text-color, #333);
-        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-    }
-    
-    .info-box h4 {
-        color: var(--text-color, #333);
-        margin-top: 0;
-    }
-    
-    .info-box p {
-        color: var(--text-color, #333);
-        margin: 0.5rem 0;
-    }
-    
-    @media (prefers-color-scheme: dark) {
-        :root {
-            --background-color: #262730;
-            --text-color: #fafafa;
-            --secondary-text-color: #a0a0a0;
-        }
-        
-        .metric-container {
-            background-color: #262730;
-            border-color: rgba(255,255,255,0.1);
-            box-shadow: 0 2px 4px rgba(0,0,0,0.3);
-        }
-        
-        .info-box {
-            background-color: #262730;
-            border-color: rgba(255,255,255,0.1);
-            box-shadow: 0 1px 3px rgba(0,0,0,0.3);
-        }
-        
-        .status-stunting .metric-value { 
-            color: #f39c12;
-        }
-    }
-    
-    [data-testid="stAppViewContainer"][data-theme="dark"] .metric-container,
-    .stApp[data-theme="dark"] .metric-container {
-        background-color: #262730 !important;
-        color: #fafafa !important;
-        border-color: rgba(255,255,255,0.1) !important;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.3) !important;
-    }
-    
-    [data-testid="stAppViewContainer"][data-theme="dark"] .info-box,
-    .stApp[data-theme="dark"] .info-box {
-        background-color: #262730 !important;
-        color: #fafafa !important;
-        border-color: rgba(255,255,255,0.1) !important;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.3) !important;
-    }
-    
-    [data-testid="stAppViewContainer"][data-theme="dark"] .info-box h4,
-    [data-testid="stAppViewContainer"][data-theme="dark"] .info-box p,
-    .stApp[data-theme="dark"] .info-box h4,
-    .stApp[data-theme="dark"] .info-box p {
-        color: #fafafa !important;
-    }
-    
-    [data-testid="stAppViewContainer"][data-theme="dark"] .metric-label,
-    .stApp[data-theme="dark"] .metric-label {
-        color: #a0a0a0 !important;
-    }
-    
-    [data-testid="stAppViewContainer"][data-theme="dark"] .status-stunting .metric-value,
-    .stApp[data-theme="dark"] .status-stunting .metric-value {
-        color: #f39c12 !important;
-    }
-    
-    @media (max-width: 768px) {
-        .metric-value { font-size: 1.8rem; }
-        .metric-container { padding: 1rem; }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    with span("css"):
+        st.markdown(CSS_APLIKASI, unsafe_allow_html=True)
     
     with st.form("profil_form"):
         st.subheader("Input Profil Anak")
@@ -273,14 +275,17 @@ def render_ui():
                 st.error(f"Error: {pesan_validasi_berat}")
                 return
 
-            file_path = f"data/lhfa-{'girls' if jenis_kelamin == 'Perempuan' else 'boys'}-zscore-expanded-tables.xlsx"
-            
-            df = baca_data(file_path)
-            L, M, S = interpolasi(usia_hari, df)
-            z_score = hitung_z_score(tinggi, L, M, S)
-            status, pesan = tentukan_status(z_score)
+            with span("referensi"):
+                tabel = baca_tabel_lms(path_referensi(jenis_kelamin))
+            with span("z_score"):
+                L, M, S, penjepitan = interpolasi_dengan_flag(usia_hari, tabel)
+                z_score = hitung_z_score(tinggi, L, M, S)
+                status, pesan = tentukan_status(z_score)
+            if penjepitan is not None:
+                st.warning(penjepitan["pesan"])
             
-            success, message = simpan_histori(tanggal_ukur, jenis_kelamin, usia_hari, usia_bulan, tinggi, berat, z_score, status, nama, "WARGA")
+            with span("simpan_histori"):
+                success, message = simpan_histori(tanggal_ukur, jenis_kelamin, usia_hari, usia_bulan, tinggi, berat, z_score, status, nama, "WARGA")
             if not success:
                 st.error(f"Error: {message}")
                 return
@@ -331,6 +336,12 @@ def render_ui():
                     st.write(f"**Tanggal Pengukuran:** {tanggal_ukur.strftime('%Y-%m-%d')}")
                     st.write(f"**Jenis Kelamin:** {jenis_kelamin}")
                     st.write(f"**Parameter WHO:** L={L:.4f}, M={M:.2f}, S={S:.4f}")
+                    
+                    # Indikator lain hanya ditampilkan jika tabel WHO-nya tersedia di folder data/
+                    z_indikator = hitung_semua_indikator(jenis_kelamin, usia_hari, tinggi, berat)
+                    for kode, nilai in z_indikator.items():
+                        if kode != "tb_u" and not math.isnan(nilai[0]):
+                            st.write(f"**Z-score {INDIKATOR[kode].nama}:** {nilai[0]:.2f}")
                 
                 if z_score < -2:
                     st.error(f"Perhatian: {pesan}")
@@ -338,6 +349,14 @@ def render_ui():
                     st.warning(f"Catatan: {pesan}")
                 else:
                     st.success(f"Status: {pesan}")
+                
+                # Tinggi batas status dibaca dari kurva referensi yang sudah dihitung per hari
+                tinggi_z_min3, tinggi_z_min2, tinggi_z_plus2, _ = batas_tinggi_batch(usia_hari, baca_kurva_referensi(jenis_kelamin))[0]
+                st.info(f"Rentang tinggi normal untuk usia {usia_hari} hari: {tinggi_z_min2:.1f} - {tinggi_z_plus2:.1f} cm.")
+                if tinggi < tinggi_z_min3:
+                    st.write(f"Tinggi yang perlu dicapai untuk keluar dari kategori sangat pendek: **{tinggi_z_min3:.1f} cm** (kurang {tinggi_z_min3 - tinggi:.1f} cm).")
+                if tinggi < tinggi_z_min2:
+                    st.write(f"Tinggi yang perlu dicapai untuk masuk rentang normal: **{tinggi_z_min2:.1f} cm** (kurang {tinggi_z_min2 - tinggi:.1f} cm).")
         
         except FileNotFoundError as e:
             st.error(f"File tidak ditemukan: {str(e)}")
@@ -348,64 +367,259 @@ def render_ui():
     st.markdown("---")
     st.subheader("Histori dan Grafik Pertumbuhan")
     
-    df_histori = baca_histori()
-    if not df_histori.empty:
+    # Metrik, tabel, grafik, dan tren dibaca dari satu potret agar konsisten walau sesi lain menyimpan di tengah rerun
+    with span("baca_histori"):
+        potret = potret_histori(nama)
+    ringkasan = potret["ringkasan"]
+    if ringkasan["total"] > 0:
+        kunci_versi = potret["kunci_versi"]
+        df_histori = potret["dataframe"]
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Pengukuran", len(df_histori))
+            st.metric("Total Pengukuran", ringkasan["total"])
         
         with col2:
-            z_scores = df_histori['Z-score'].astype(float)
-            st.metric("Z-score Terakhir", f"{z_scores.iloc[-1]:.2f}")
+            st.metric("Z-score Terakhir", f"{ringkasan['z_terakhir']:.2f}")
         
         with col3:
-            stunting_count = len(df_histori[df_histori['Z-score'].astype(float) < -2])
-            st.metric("Riwayat Stunting", f"{stunting_count} kali")
+            st.metric("Riwayat Stunting", f"{ringkasan['jumlah_stunting']} kali")
         
         with col4:
-            berat_terakhir = df_histori['Berat (kg)'].astype(float).iloc[-1]
-            st.metric("Berat Terakhir", f"{berat_terakhir:.1f} kg")
+            st.metric("Berat Terakhir", f"{ringkasan['berat_terakhir']:.1f} kg")
         
         st.subheader("Data Histori Pengukuran")
         st.dataframe(df_histori, use_container_width=True)
+        _tombol_unduh_histori(nama, kunci_versi)
         
         st.subheader("Grafik Perkembangan Z-score, Berat Badan, dan Tinggi Badan")
-        buat_grafik(df_histori)
+        buat_grafik(df_histori, kunci_versi)
         
         if len(df_histori) >= 2:
-            z_scores = df_histori['Z-score'].astype(float)
-            trend_z = "naik" if z_scores.iloc[-1] > z_scores.iloc[-2] else "turun"
-            berat_values = df_histori['Berat (kg)'].astype(float)
-            trend_berat = "naik" if berat_values.iloc[-1] > berat_values.iloc[-2] else "turun"
-            tinggi_values = df_histori['Tinggi (cm)'].astype(float)
-            trend_tinggi = "naik" if tinggi_values.iloc[-1] > tinggi_values.iloc[-2] else "turun"
+            # Tren dihitung inkremental oleh buffer histori atas seluruh deret, bukan hanya dua baris terakhir
+            tren = potret["tren"]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Laju Tinggi", f"{tren['laju_tinggi'][-1]:.2f} cm/bln")
+            with col2:
+                st.metric("Laju Berat", f"{tren['laju_berat'][-1]:.2f} kg/bln")
+            with col3:
+                perubahan_z = tren['perubahan_z_jendela'][-1]
+                st.metric(f"Perubahan Z-score ({JENDELA_HARI_TREN} hari)", "-" if math.isnan(perubahan_z) else f"{perubahan_z:+.2f}")
             
-            if trend_z == "naik":
-                st.info("Tren Positif: Z-score meningkat dari pengukuran sebelumnya.")
+            pesan_flag = pesan_tren(tren['flag'][-1])
+            if pesan_flag:
+                for pesan in pesan_flag:
+                    st.warning(f"Perhatian: {pesan} Pantau nutrisi anak.")
             else:
-                st.warning("Perhatian: Z-score menurun dari pengukuran sebelumnya. Pantau nutrisi anak.")
+                st.info("Tren Positif: Tidak ada tanda gagal tumbuh sejak pengukuran sebelumnya.")
             
-            if trend_berat == "naik":
-                st.info("Tren Positif: Berat badan meningkat dari pengukuran sebelumnya.")
-            else:
-                st.warning("Perhatian: Berat badan menurun dari pengukuran sebelumnya. Pantau nutrisi anak.")
-            
-            if trend_tinggi == "naik":
-                st.info("Tren Positif: Tinggi badan meningkat dari pengukuran sebelumnya.")
-            else:
-                st.warning("Perhatian: Tinggi badan menurun dari pengukuran sebelumnya. Pantau nutrisi anak.")
+            with st.expander("Laju Pertumbuhan per Pengukuran"):
+                st.dataframe({
+                    "Tanggal": df_histori["Tanggal"],
+                    "Selang (Hari)": tren["selang_hari"],
+                    "Laju Tinggi (cm/bln)": tren["laju_tinggi"].round(2),
+                    "Laju Berat (kg/bln)": tren["laju_berat"].round(2),
+                    "Perubahan Z-score": tren["perubahan_z"].round(2),
+                    "Tanda Gagal Tumbuh": ["; ".join(pesan_tren(flag)) for flag in tren["flag"]],
+                }, use_container_width=True)
     else:
         st.info("Belum ada data histori pengukuran. Silakan lakukan pengukuran pertama.")
         
     st.markdown("---")
     with st.expander("Informasi Penting"):
-        st.markdown("""
+        st.markdown(f"""
         **Catatan Penting:**
         - Aplikasi ini menggunakan standar WHO Growth Charts (Length/Height-for-Age Z-scores, 0-1856 hari)
         - Data referensi diambil dari tabel WHO resmi untuk anak laki-laki dan perempuan
         - Konsultasikan hasil dengan tenaga kesehatan untuk diagnosis akurat
         - Pemantauan rutin penting untuk deteksi dini stunting
-        - Data histori disimpan di sesi aplikasi dan akan hilang saat aplikasi ditutup
+        - {CATATAN_PENYIMPANAN[BACKEND_HISTORI]}
         - Sumber data: WHO Child Growth Standards (https://www.who.int/childgrowth/standards)
-        """)
\ No newline at end of file
+        """)
+
+def render_dasbor_kohort():
+    """Merender dasbor prevalensi stunting seluruh anak dari tabel agregat kohort."""
+    from src.grafik import buat_figur_prevalensi
+    
+    st.title("Dasbor Prevalensi Stunting")
+    st.write("Prevalensi stunting dan stunting berat menurut jenis kelamin, kelompok usia, dan bulan pengukuran")
+    
+    # Agregat dipelihara saat setiap pengukuran disimpan; di sini hanya dibaca dan dijumlahkan
+    baris_agregat = baca_agregat_kohort()
+    if not baris_agregat:
+        st.info("Belum ada data pengukuran untuk ditampilkan.")
+        return
+    
+    semua_bulan = sorted({baris[2] for baris in baris_agregat})
+    if len(semua_bulan) > 1:
+        bulan_awal, bulan_akhir = st.select_slider("Rentang Bulan", options=semua_bulan, value=(semua_bulan[0], semua_bulan[-1]))
+        baris_agregat = [baris for baris in baris_agregat if bulan_awal <= baris[2] <= bulan_akhir]
+    
+    total = hitung_prevalensi(baris_agregat).iloc[0]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Pengukuran", int(total["Jumlah Pengukuran"]))
+    with col2:
+        st.metric("Prevalensi Stunting", f"{total['Prevalensi Stunting (%)']:.1f}%")
+    with col3:
+        st.metric("Prevalensi Stunting Berat", f"{total['Prevalensi Stunting Berat (%)']:.1f}%")
+    
+    per_bulan = hitung_prevalensi(baris_agregat, ["Bulan", "Jenis Kelamin"])
+    st.plotly_chart(buat_figur_prevalensi(per_bulan), use_container_width=True)
+    
+    tab_bulan, tab_usia, tab_jk = st.tabs(["Per Bulan", "Per Kelompok Usia", "Per Jenis Kelamin"])
+    with tab_bulan:
+        st.dataframe(per_bulan, use_container_width=True, hide_index=True)
+    with tab_usia:
+        st.dataframe(hitung_prevalensi(baris_agregat, ["Kelompok Usia", "Jenis Kelamin"]), use_container_width=True, hide_index=True)
+    with tab_jk:
+        st.dataframe(hitung_prevalensi(baris_agregat, ["Jenis Kelamin"]), use_container_width=True, hide_index=True)
+
+def render_laporan_memori():
+    """Menampilkan laporan memori histori di sidebar (dihitung hanya jika diaktifkan) untuk perencanaan kapasitas server."""
+    if not st.sidebar.toggle("Laporan Memori"):
+        return
+    laporan = laporan_memori_histori()
+    cakupan = "sesi ini" if BACKEND_HISTORI == "memori" else "cache bersama proses"
+    st.sidebar.caption(f"Histori di memori ({cakupan}): {laporan['jumlah_anak']} anak, {laporan['jumlah_rekaman']} pengukuran")
+    st.sidebar.metric("Total", f"{laporan['total'] / 1024:.1f} KiB")
+    st.sidebar.metric("Per Pengukuran", f"{laporan['byte_per_rekaman']:.0f} byte")
+    st.sidebar.dataframe({
+        "Bagian": ["Kolom", "Indeks Tanggal", "Kosakata", "Tren", "Cache DataFrame"],
+        "Byte": [laporan[bagian] for bagian in ("kolom", "indeks_tanggal", "kosakata", "tren", "cache_dataframe")],
+    }, hide_index=True)
+
+# Jumlah jejak rerun terakhir per sesi yang diringkas di panel instrumentasi
+MAKS_JEJAK_SESI = 50
+
+def mode_instrumentasi():
+    """Mode instrumentasi rerun ini: parameter URL ?instrumentasi=... mengalahkan variabel lingkungan INSTRUMENTASI.
+
+    Mode memori dari URL diturunkan menjadi mode waktu oleh rekam_rerun.
+    """
+    if "instrumentasi" in st.query_params:
+        return mode_dari_teks(st.query_params["instrumentasi"])
+    return MODE_DEFAULT
+
+def id_sesi():
+    """Id acak per sesi browser untuk menandai jejak instrumentasi."""
+    if "id_sesi" not in st.session_state:
+        st.session_state.id_sesi = uuid.uuid4().hex[:12]
+    return st.session_state.id_sesi
+
+def render_panel_instrumentasi(jejak):
+    """Panel debug berisi span rerun ini, ringkasan rerun-rerun terakhir sesi, dan unduhan jejak."""
+    if "jejak_instrumentasi" not in st.session_state:
+        st.session_state.jejak_instrumentasi = deque(maxlen=MAKS_JEJAK_SESI)
+    riwayat = st.session_state.jejak_instrumentasi
+    riwayat.append(jejak)
+
+    with st.expander(f"Instrumentasi: rerun #{jejak.nomor} {jejak.durasi_ms:.1f} ms"):
+        # Span disimpan menurut waktu selesai; ditampilkan menurut waktu mulai agar induk di atas anaknya
+        daftar = sorted(jejak.span, key=lambda s: s["mulai_ms"])
+        tabel = {
+            "Span": ["  " * s["kedalaman"] + s["nama"] for s in daftar],
+            "Mulai (ms)": [round(s["mulai_ms"], 2) for s in daftar],
+            "Durasi (ms)": [round(s["durasi_ms"], 2) for s in daftar],
+        }
+        if jejak.mode == MODE_MEMORI:
+            tabel["Alokasi (KiB)"] = [round((s["alokasi_byte"] or 0) / 1024, 1) for s in daftar]
+        st.dataframe(tabel, use_container_width=True, hide_index=True)
+
+        mulai = laporan_mulai()
+        if mulai["total_ms"] is not None:
+            rincian = ", ".join(f"{nama} {ms:.0f} ms" for nama, ms in mulai["langkah"].items())
+            st.caption(f"Waktu mulai proses: impor UI {mulai['impor_ui_ms'] or 0:.0f} ms, pemanasan {mulai['total_ms']:.0f} ms ({rincian})")
+            for nama, galat in mulai["galat"].items():
+                st.caption(f"Pemanasan {nama} gagal: {galat}")
+
+        st.caption(f"Ringkasan {len(riwayat)} rerun terakhir sesi ini")
+        st.dataframe(ringkasan_span(riwayat), use_container_width=True, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Unduh Jejak (JSON Lines)", ke_json_lines(riwayat), file_name=f"jejak-{jejak.id_sesi}.jsonl", mime="application/x-ndjson")
+        with col2:
+            st.download_button("Unduh Metrik (Prometheus)", ke_prometheus(), file_name="pemantau.prom", mime="text/plain")
+
+# Roster bulanan umumnya diunggah oleh kader posyandu
+JENIS_PENGINPUT_UNGGAH = "KADER"
+
+def render_unggah():
+    """Merender halaman unggah roster; file diproses di latar belakang dan progresnya dipantau tanpa memblokir halaman."""
+    st.title("Unggah Roster Pengukuran")
+    st.write("Unggah spreadsheet pengukuran bulanan dengan kolom: Nama, Jenis Kelamin, Tanggal Lahir, Tanggal, Tinggi (cm), Berat (kg)")
+    st.caption("File histori hasil ekspor (Parquet/Arrow) juga diterima; Z-score dan status dihitung ulang dan setiap baris divalidasi seperti roster.")
+    
+    if 'tugas_unggah' not in st.session_state:
+        st.session_state.tugas_unggah = []
+    
+    with st.form("form_unggah", clear_on_submit=True):
+        file = st.file_uploader("File Roster atau Histori Ekspor", type=["csv", "xlsx", "parquet", "arrow"])
+        lewati_flag = st.checkbox("Lewati baris dengan flag kualitas data (Z-score ekstrem, duplikat, tinggi turun)", value=True)
+        submit = st.form_submit_button("Proses Roster")
+    
+    if submit:
+        if file is None:
+            st.error("Pilih file roster terlebih dahulu.")
+        else:
+            try:
+                # Backend histori diambil di sini karena thread latar belakang tidak memiliki session state
+                tugas = mulai_unggah(file.getvalue(), file.name, dapatkan_penyimpanan(), JENIS_PENGINPUT_UNGGAH, lewati_flag, id_sesi())
+                st.session_state.tugas_unggah.append(tugas.id)
+            except ValueError as e:
+                st.error(f"Error: {str(e)}")
+    
+    _tampilkan_progres_unggah()
+
+def _tugas_unggah_sesi():
+    daftar_tugas = [dapatkan_tugas(id_tugas) for id_tugas in reversed(st.session_state.get('tugas_unggah', []))]
+    return [tugas for tugas in daftar_tugas if tugas is not None]
+
+def _tampilkan_progres_unggah():
+    """Menampilkan tugas unggah sesi ini; hanya di-polling setiap detik selama ada tugas yang berjalan."""
+    if any(tugas.aktif for tugas in _tugas_unggah_sesi()):
+        _pantau_progres_unggah()
+    else:
+        _render_progres_unggah(_tugas_unggah_sesi())
+
+@st.fragment(run_every=1)
+def _pantau_progres_unggah():
+    """Fragmen yang dirender ulang setiap detik; setelah semua tugas selesai, rerun penuh menghentikan polling."""
+    daftar_tugas = _tugas_unggah_sesi()
+    _render_progres_unggah(daftar_tugas)
+    if not any(tugas.aktif for tugas in daftar_tugas):
+        st.rerun()
+
+def _render_progres_unggah(daftar_tugas):
+    if not daftar_tugas:
+        st.info("Belum ada roster yang diunggah.")
+        return
+    
+    for tugas in daftar_tugas:
+        status = tugas.status()
+        st.markdown(f"**{status['nama_file']}** - {status['status']} ({status['durasi']:.1f} detik)")
+        teks = f"{status['baris_diproses']} baris diproses"
+        if status['total_baris'] is not None:
+            teks += f" dari {status['total_baris']}"
+        st.progress(status['progres'] or 0.0, text=teks)
+        
+        if status['status'] == STATUS_SELESAI:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Tersimpan ke Histori", status['jumlah_tersimpan'])
+            with col2:
+                st.metric("Tidak Valid", status['jumlah_tidak_valid'])
+            with col3:
+                st.metric("Dengan Flag Kualitas", status['jumlah_flag_kualitas'])
+            flag = {pesan: jumlah for pesan, jumlah in status['ringkasan_flag'].items() if jumlah}
+            if flag:
+                with st.expander("Rincian Flag Kualitas"):
+                    st.dataframe({"Flag": list(flag), "Jumlah Baris": list(flag.values())}, use_container_width=True, hide_index=True)
+        elif status['status'] == STATUS_GAGAL:
+            st.error(f"Gagal memproses roster: {status['galat']}")
+        elif status['status'] == STATUS_DIBATALKAN:
+            st.warning("Pemrosesan dibatalkan; tidak ada data yang disimpan.")
+        elif st.button("Batalkan", key=f"batal_{tugas.id}"):
+            tugas.batalkan()
@@ -0,0 +1,235 @@
+"""Pemrosesan roster unggahan di latar belakang, terpisah dari rerun antarmuka.
+
+Setiap unggahan menjadi satu TugasUnggah yang dijalankan oleh pool thread bersama.
+UI hanya membaca status tugas (polling), sehingga halaman tetap responsif dan unggahan
+dari sesi yang berbeda diproses bersamaan.
+
+Tugas menunggu di antrean per sesi dan baru diserahkan ke pool saat ada pekerja kosong.
+Sesi dengan tugas berjalan paling sedikit didahulukan, dan satu sesi memakai paling banyak
+MAKS_PEKERJA_PER_SESI pekerja sekaligus, sehingga banyak unggahan dari satu sesi tidak membuat
+unggahan sesi lain menunggu di belakangnya.
+"""
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.histori import KOLOM_HISTORI
+from src.ekspor import EKSTENSI_ARROW, EKSTENSI_PARQUET
+
+MAKS_PEKERJA_UNGGAH = int(os.environ.get("UNGGAH_MAKS_PEKERJA", "4"))
+MAKS_PEKERJA_PER_SESI = int(os.environ.get("UNGGAH_MAKS_PEKERJA_PER_SESI", "2"))
+UKURAN_CHUNK_UNGGAH = 5_000
+
+# Tugas yang sudah selesai disimpan sejumlah ini agar status masih bisa dibaca setelah rerun
+MAKS_TUGAS_DISIMPAN = 256
+
+STATUS_MENUNGGU = "menunggu"
+STATUS_BERJALAN = "berjalan"
+STATUS_SELESAI = "selesai"
+STATUS_GAGAL = "gagal"
+STATUS_DIBATALKAN = "dibatalkan"
+
+_pool = None
+_tugas = {}
+_kunci_tugas = threading.Lock()
+
+# Antrean tugas per id sesi (urutan dict = giliran berikutnya) dan jumlah tugas yang sedang di pool per sesi
+_antrean_sesi = {}
+_berjalan_sesi = {}
+
+def hitung_baris(path):
+    """Memperkirakan jumlah baris data dalam file roster tanpa mengurai isinya; None jika tidak diketahui."""
+    ekstensi = os.path.splitext(path)[1].lower()
+    if ekstensi == ".csv":
+        with open(path, "rb") as f:
+            jumlah = sum(blok.count(b"\n") for blok in iter(lambda: f.read(1 << 20), b""))
+        return max(jumlah - 1, 0)
+    if ekstensi == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if ekstensi in EKSTENSI_ARROW:
+        return None
+    if ekstensi == ".xlsx":
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+        return None if max_row is None else max(max_row - 1, 0)
+    return None
+
+class TugasUnggah:
+    """Status satu unggahan roster. Atribut hanya ditulis oleh thread pekerja; UI membaca lewat status()."""
+
+    def __init__(self, path, nama_file, penyimpanan, jenis_penginput, lewati_flag_kualitas):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.nama_file = nama_file
+        self.penyimpanan = penyimpanan
+        self.jenis_penginput = jenis_penginput
+        self.lewati_flag_kualitas = lewati_flag_kualitas
+        self._batal = threading.Event()
+        self._kunci = threading.Lock()
+        self._status = {
+            "status": STATUS_MENUNGGU,
+            "nama_file": nama_file,
+            "total_baris": None,
+            "baris_diproses": 0,
+            "jumlah_tidak_valid": 0,
+            "jumlah_flag_kualitas": 0,
+            "jumlah_tersimpan": 0,
+            "ringkasan_flag": {},
+            "galat": None,
+            "durasi": 0.0,
+        }
+        self._mulai = None
+
+    def status(self):
+        """Mengembalikan salinan status saat ini beserta `progres` (0-1, atau None jika total belum diketahui)."""
+        with self._kunci:
+            status = dict(self._status)
+        if self._mulai is not None and status["status"] == STATUS_BERJALAN:
+            status["durasi"] = time.perf_counter() - self._mulai
+        total = status["total_baris"]
+        if status["status"] == STATUS_SELESAI:
+            status["progres"] = 1.0
+        elif total:
+            status["progres"] = min(status["baris_diproses"] / total, 1.0)
+        else:
+            status["progres"] = None
+        return status
+
+    @property
+    def aktif(self):
+        return self.status()["status"] in (STATUS_MENUNGGU, STATUS_BERJALAN)
+
+    def batalkan(self):
+        """Meminta pembatalan; diperiksa di antara chunk. Data belum disimpan sampai seluruh file selesai."""
+        self._batal.set()
+
+    def _perbarui(self, **nilai):
+        with self._kunci:
+            self._status.update(nilai)
+
+    def _jalankan(self):
+        # Modul batch (pandas) diimpor di thread pekerja, bukan saat UI dimuat
+        import pandas as pd
+        from src.batch import baca_chunk, proses_chunk, rekaman_histori, roster_dari_histori
+        from src.ekspor import baca_batch, baca_nama_kolom, rekaman_dari_batch
+        from src.kualitas import ringkasan_flag
+
+        self._mulai = time.perf_counter()
+        self._perbarui(status=STATUS_BERJALAN)
+        try:
+            self._perbarui(total_baris=hitung_baris(self.path))
+            ekstensi = os.path.splitext(self.path)[1].lower()
+            if ekstensi in EKSTENSI_PARQUET + EKSTENSI_ARROW and set(KOLOM_HISTORI) <= set(baca_nama_kolom(self.path)):
+                # File histori hasil ekspor: Z-score dan status di file tidak dipercaya, dihitung ulang
+                # dari tinggi, usia, dan jenis kelamin seperti roster; JenisPenginput dari file dipertahankan
+                sumber = (roster_dari_histori(pd.DataFrame(rekaman_dari_batch(batch), columns=KOLOM_HISTORI))
+                          for batch in baca_batch(self.path, KOLOM_HISTORI, UKURAN_CHUNK_UNGGAH))
+                jenis_penginput = None
+            else:
+                sumber = baca_chunk(self.path, UKURAN_CHUNK_UNGGAH)
+                jenis_penginput = self.jenis_penginput
+            hasil = []
+            ringkasan = {}
+            baris_diproses = jumlah_tidak_valid = jumlah_flag = 0
+            for chunk in sumber:
+                if self._batal.is_set():
+                    self._perbarui(status=STATUS_DIBATALKAN, durasi=time.perf_counter() - self._mulai)
+                    return
+                df = proses_chunk(chunk)
+                hasil.append(rekaman_histori(df, jenis_penginput, self.lewati_flag_kualitas))
+                baris_diproses += len(df)
+                jumlah_tidak_valid += int((df["Keterangan"] != "").sum())
+                jumlah_flag += int((df["Flag Kualitas"] != 0).sum())
+                for pesan, jumlah in ringkasan_flag(df["Flag Kualitas"].to_numpy()).items():
+                    ringkasan[pesan] = ringkasan.get(pesan, 0) + jumlah
+                self._perbarui(baris_diproses=baris_diproses, jumlah_tidak_valid=jumlah_tidak_valid,
+                               jumlah_flag_kualitas=jumlah_flag, ringkasan_flag=dict(ringkasan))
+
+            # Digabung ke histori dalam satu transaksi setelah seluruh file selesai; duplikat dilewati
+            jumlah_tersimpan = 0
+            if hasil:
+                rekaman = pd.concat(hasil, ignore_index=True)
+                jumlah_tersimpan = self.penyimpanan.simpan_banyak(rekaman.itertuples(index=False, name=None))
+            self._perbarui(status=STATUS_SELESAI, jumlah_tersimpan=jumlah_tersimpan,
+                           durasi=time.perf_counter() - self._mulai)
+        except Exception as e:
+            self._perbarui(status=STATUS_GAGAL, galat=str(e), durasi=time.perf_counter() - self._mulai)
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+def _dapatkan_pool():
+    # Hanya dipanggil dari _jadwalkan, yang sudah memegang _kunci_tugas
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=MAKS_PEKERJA_UNGGAH, thread_name_prefix="unggah")
+    return _pool
+
+def _jadwalkan():
+    """Menyerahkan tugas dari antrean sesi ke pool selama ada pekerja kosong; dipanggil dengan _kunci_tugas terkunci."""
+    while sum(_berjalan_sesi.values()) < MAKS_PEKERJA_UNGGAH:
+        # Sesi dengan tugas berjalan paling sedikit didahulukan; seri diputus menurut giliran antrean
+        calon = [id_sesi for id_sesi in _antrean_sesi if _berjalan_sesi.get(id_sesi, 0) < MAKS_PEKERJA_PER_SESI]
+        if not calon:
+            return
+        id_sesi = min(calon, key=lambda id_sesi: _berjalan_sesi.get(id_sesi, 0))
+        antrean = _antrean_sesi.pop(id_sesi)
+        tugas = antrean.popleft()
+        if antrean:
+            # Sesi yang masih punya antrean pindah ke giliran terakhir
+            _antrean_sesi[id_sesi] = antrean
+        _berjalan_sesi[id_sesi] = _berjalan_sesi.get(id_sesi, 0) + 1
+        _dapatkan_pool().submit(_jalankan_tugas, tugas, id_sesi)
+
+def _selesai(id_sesi):
+    """Membebaskan satu slot pekerja milik `id_sesi` lalu menyerahkan tugas berikutnya ke pool."""
+    with _kunci_tugas:
+        _berjalan_sesi[id_sesi] -= 1
+        if not _berjalan_sesi[id_sesi]:
+            del _berjalan_sesi[id_sesi]
+        _jadwalkan()
+
+def _jalankan_tugas(tugas, id_sesi):
+    try:
+        tugas._jalankan()
+    finally:
+        _selesai(id_sesi)
+
+def mulai_unggah(isi_file, nama_file, penyimpanan, jenis_penginput, lewati_flag_kualitas=True, id_sesi=None):
+    """Menyimpan isi file unggahan ke file sementara dan menjadwalkan pemrosesannya; mengembalikan TugasUnggah.
+
+    `penyimpanan` adalah backend histori milik sesi pengunggah (lihat dapatkan_penyimpanan), diambil
+    di thread UI karena thread pekerja tidak memiliki konteks sesi. `id_sesi` menentukan antrean
+    giliran tugas ini; tugas tanpa id sesi berbagi satu antrean.
+    """
+    ekstensi = os.path.splitext(nama_file)[1].lower()
+    if ekstensi not in (".csv", ".xlsx") + EKSTENSI_PARQUET + EKSTENSI_ARROW:
+        raise ValueError(f"Format file {ekstensi} tidak didukung. Gunakan .csv, .parquet, .arrow, atau .xlsx.")
+
+    fd, path = tempfile.mkstemp(prefix="unggah-", suffix=ekstensi)
+    with os.fdopen(fd, "wb") as f:
+        f.write(isi_file)
+
+    tugas = TugasUnggah(path, nama_file, penyimpanan, jenis_penginput, lewati_flag_kualitas)
+    with _kunci_tugas:
+        _tugas[tugas.id] = tugas
+        # Buang tugas lama yang sudah selesai (dict mempertahankan urutan penambahan)
+        for id_lama in list(_tugas)[:max(len(_tugas) - MAKS_TUGAS_DISIMPAN, 0)]:
+            if not _tugas[id_lama].aktif:
+                del _tugas[id_lama]
+        _antrean_sesi.setdefault(id_sesi, deque()).append(tugas)
+        _jadwalkan()
+    return tugas
+
+def dapatkan_tugas(id_tugas):
+    """Mengembalikan TugasUnggah berdasarkan id, atau None jika tidak dikenal/sudah dibuang."""
+    with _kunci_tugas:
+        return _tugas.get(id_tugas)
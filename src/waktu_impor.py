@@ -0,0 +1,58 @@
+"""Mengukur waktu impor modul inti di proses Python baru.
+
+Modul UI diukur setelah streamlit diimpor lebih dulu, sehingga yang dilaporkan hanya waktu dan
+modul berat yang ditambahkan oleh kode aplikasi sendiri (streamlit sudah mengimpor pandas,
+pyarrow, dan plotly; hal itu di luar kendali aplikasi).
+
+Contoh:
+    python -m src.waktu_impor
+"""
+import subprocess
+import sys
+
+MODUL_INTI = ["src.calculations", "src.histori", "src.penyimpanan", "src.data_manager", "src.indikator"]
+
+# Modul inti tidak boleh menarik dependensi berat ini saat diimpor
+MODUL_BERAT = ["streamlit", "pandas", "plotly"]
+
+# Modul UI tidak boleh menarik modul grafik aplikasi (dan apa pun yang belum diimpor streamlit) saat dimuat
+MODUL_UI = {"src.ui": ["src.grafik", "plotly", "pyarrow"]}
+PRASYARAT_UI = ["streamlit"]
+
+_SKRIP = """
+import sys, time
+for prasyarat in {prasyarat!r}:
+    __import__(prasyarat)
+sebelum = set(sys.modules)
+mulai = time.perf_counter()
+import {modul}
+durasi = time.perf_counter() - mulai
+berat = [m for m in {modul_berat!r} if m in sys.modules and m not in sebelum]
+print(f"{{durasi * 1000:.1f}}|{{','.join(berat)}}")
+"""
+
+def ukur_waktu_impor(modul, modul_berat=MODUL_BERAT, prasyarat=()):
+    """Mengembalikan (durasi impor dalam ms, daftar modul berat yang ikut terimpor) untuk satu modul.
+
+    Modul `prasyarat` diimpor lebih dulu dan tidak ikut dihitung, baik waktunya maupun modul beratnya.
+    """
+    keluaran = subprocess.run(
+        [sys.executable, "-c", _SKRIP.format(modul=modul, modul_berat=modul_berat, prasyarat=list(prasyarat))],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    durasi, berat = keluaran.split("|")
+    return float(durasi), [m for m in berat.split(",") if m]
+
+def main():
+    gagal = False
+    daftar = [(modul, MODUL_BERAT, ()) for modul in MODUL_INTI]
+    daftar += [(modul, modul_berat, PRASYARAT_UI) for modul, modul_berat in MODUL_UI.items()]
+    for modul, modul_berat, prasyarat in daftar:
+        durasi, berat = ukur_waktu_impor(modul, modul_berat, prasyarat)
+        catatan = f"  (ikut mengimpor: {', '.join(berat)})" if berat else ""
+        print(f"{modul:<20} {durasi:8.1f} ms{catatan}")
+        gagal = gagal or bool(berat)
+    return 1 if gagal else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from src.api import TIPE_CSV, TIPE_JSON, LayananZScore
+from src.calculations import kode_jenis_kelamin
+
+@pytest.fixture(scope="module")
+def layanan():
+    return LayananZScore()
+
+def _kirim(layanan, path, body, tipe=TIPE_JSON):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    status, tipe_keluar, isi = asyncio.run(layanan.tangani("POST", path, {"content-type": tipe, "accept": TIPE_JSON}, body))
+    return status, json.loads(isi)
+
+def test_kode_jenis_kelamin_di_luar_rentang():
+    np.testing.assert_array_equal(kode_jenis_kelamin(np.array([0, 1, 2, 300, -1])), [0, 1, -1, -1, -1])
+    np.testing.assert_array_equal(kode_jenis_kelamin(np.array(["0", "1", "Perempuan", "x", ""])), [0, 1, 1, -1, -1])
+    np.testing.assert_array_equal(kode_jenis_kelamin(np.array([0, "Laki-laki", None, 5], dtype=object)), [0, 0, -1, -1])
+    np.testing.assert_array_equal(kode_jenis_kelamin(np.array([0.0, 1.0, 0.5, np.nan])), [0, 1, -1, -1])
+
+def test_tunggal_menolak_body_bukan_objek(layanan):
+    status, data = _kirim(layanan, "/z-score", [1, 2])
+    assert status == 400
+
+@pytest.mark.parametrize("perubahan", [{"tinggi": "nan"}, {"berat": "inf"}, {"usia_hari": 365.7}])
+def test_tunggal_menolak_angka_tidak_valid(layanan, perubahan):
+    data = {"jenis_kelamin": "Laki-laki", "usia_hari": 365, "tinggi": 75.0, "berat": 9.5, **perubahan}
+    status, hasil = _kirim(layanan, "/z-score", json.dumps(data).encode())
+    assert status == 422, hasil
+
+def test_tunggal_menerima_kode_jenis_kelamin(layanan):
+    status, hasil = _kirim(layanan, "/z-score", {"jenis_kelamin": 1, "usia_hari": 365, "tinggi": 74.0})
+    assert status == 200
+    assert hasil["status"] == "Normal"
+
+def test_batch_json_menolak_per_baris(layanan):
+    status, hasil = _kirim(layanan, "/z-score/batch", {
+        "jenis_kelamin": [0, 1, 2, 0, 0, 0, 0],
+        "usia_hari": [365, 365, 365, 0, 2000, 365.7, 365],
+        "tinggi": [75.0, 74.0, 75.0, 50.0, 110.0, 75.0, None],
+    })
+    assert status == 200
+    assert hasil["keterangan"][:2] == ["", ""]
+    assert all(hasil["keterangan"][2:])
+    assert hasil["z_score"][2:] == [None] * 5
+    assert hasil["status"][2:] == [""] * 5
+
+def test_batch_csv_sel_kosong_dan_tanggal_rusak(layanan):
+    body = (
+        "jenis_kelamin,tanggal_lahir,tanggal_ukur,tinggi,berat\n"
+        "0,2023-01-01,2024-01-01,75.0,\n"
+        "1,2023-01-01,2024-01-01,74.0,9.0\n"
+        "Laki-laki,2023-13-01,2024-01-01,75.0,9.5\n"
+        "0,2023-01-01,2024-01-01,75.0,berat\n"
+    ).encode()
+    status, hasil = _kirim(layanan, "/z-score/batch", body, TIPE_CSV)
+    assert status == 200
+    assert hasil["keterangan"][:2] == ["", ""]
+    assert hasil["keterangan"][2] == "Tanggal atau usia_hari tidak valid."
+    assert hasil["keterangan"][3] == "berat harus berupa angka."
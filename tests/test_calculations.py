@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from src.calculations import (
+    DAFTAR_STATUS, JENIS_KELAMIN, KODE_STATUS_TIDAK_VALID, Z_BATAS_STATUS, batas_tinggi_batch, hitung_batch,
+    hitung_tinggi_dari_z, hitung_z_score, hitung_z_score_batch, interpolasi, interpolasi_batch, kode_status_batch,
+    kode_status_dari_tinggi, tentukan_status,
+)
+from src.data_manager import baca_kurva_referensi_semua, baca_tabel_lms_semua
+
+@pytest.fixture(scope="module")
+def tabel_per_jk():
+    return baca_tabel_lms_semua()
+
+def _usia_uji(tabel):
+    """Seluruh hari dalam tabel, usia pecahan, dan usia di luar rentang (dijepit)."""
+    hari = np.arange(tabel.hari_awal, tabel.hari_akhir + 1, dtype=np.float64)
+    batas = [tabel.hari_awal - 1, tabel.hari_awal + 0.5, tabel.hari_akhir - 0.5, tabel.hari_akhir + 1, tabel.hari_akhir + 400]
+    return np.concatenate([hari, np.asarray(batas, dtype=np.float64)])
+
+@pytest.mark.parametrize("kode_jk", range(len(JENIS_KELAMIN)))
+@pytest.mark.parametrize("z_target", [-4.0, -3.0, -2.5, -2.0, 0.0, 2.0, 2.5, 3.0, 4.0])
+def test_hitung_batch_sama_dengan_skalar(tabel_per_jk, kode_jk, z_target):
+    tabel = tabel_per_jk[kode_jk]
+    usia_hari = _usia_uji(tabel)
+    L, M, S = np.array([interpolasi(usia, tabel) for usia in usia_hari]).T
+    tinggi = hitung_tinggi_dari_z(z_target, L, M, S)
+
+    hasil = hitung_batch(np.full(len(usia_hari), JENIS_KELAMIN[kode_jk], dtype=object), usia_hari, tinggi, tabel_per_jk)
+
+    z_skalar = np.array([hitung_z_score(t, l, m, s) for t, l, m, s in zip(tinggi, L, M, S)])
+    np.testing.assert_allclose(np.column_stack([hasil["L"], hasil["M"], hasil["S"]]), np.column_stack([L, M, S]), rtol=1e-12)
+    np.testing.assert_allclose(hasil["z_score"], z_skalar, rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(hasil["di_luar_rentang"], (usia_hari < tabel.hari_awal) | (usia_hari > tabel.hari_akhir))
+
+    # Tinggi tepat di batas status dapat bergeser satu ulp; status dibandingkan dari Z-score skalar yang sama
+    status_skalar = [tentukan_status(z)[0] for z in z_skalar]
+    status_batch = [DAFTAR_STATUS[k] for k in kode_status_batch(z_skalar)]
+    assert status_batch == status_skalar
+    jauh_dari_batas = np.abs(z_target - np.asarray([-3.0, -2.0, 2.0, 3.0])).min() > 1e-6
+    if jauh_dari_batas:
+        assert [DAFTAR_STATUS[k] for k in hasil["kode_status"]] == status_skalar
+
+@pytest.mark.parametrize("z", [-3.0, -2.0, 2.0, 3.0])
+def test_kode_status_batch_batas(z):
+    for nilai in (np.nextafter(z, -np.inf), z, np.nextafter(z, np.inf)):
+        assert DAFTAR_STATUS[kode_status_batch([nilai])[0]] == tentukan_status(nilai)[0]
+
+def test_hitung_batch_jenis_kelamin_campuran(tabel_per_jk):
+    usia_hari = np.array([0.0, 0.0, 365.0, 365.5, 1856.0, 1856.0])
+    jenis_kelamin = np.array([0, 1, 0, 1, 0, 1])
+    tinggi = np.array([49.9, 49.1, 75.7, 74.0, 110.0, 109.4])
+
+    hasil = hitung_batch(jenis_kelamin, usia_hari, tinggi, tabel_per_jk)
+
+    for i, (kode_jk, usia, t) in enumerate(zip(jenis_kelamin, usia_hari, tinggi)):
+        z = hitung_z_score(t, *interpolasi(usia, tabel_per_jk[kode_jk]))
+        assert hasil["z_score"][i] == pytest.approx(z, abs=1e-9)
+        assert DAFTAR_STATUS[hasil["kode_status"][i]] == tentukan_status(z)[0]
+
+@pytest.fixture(scope="module")
+def kurva_per_jk():
+    return baca_kurva_referensi_semua()
+
+@pytest.mark.parametrize("kode_jk", range(len(JENIS_KELAMIN)))
+def test_kode_status_dari_tinggi_sama_dengan_z_score(tabel_per_jk, kurva_per_jk, kode_jk):
+    tabel = tabel_per_jk[kode_jk]
+    rng = np.random.default_rng(kode_jk)
+    usia_hari = np.repeat(_usia_uji(tabel), 20)
+    usia_hari[::7] += rng.random(len(usia_hari[::7]))
+    L, M, S, _ = interpolasi_batch(usia_hari, tabel)
+    tinggi = hitung_tinggi_dari_z(rng.uniform(-5, 5, len(usia_hari)), L, M, S)
+
+    z_score = hitung_z_score_batch(tinggi, L, M, S)
+    np.testing.assert_array_equal(kode_status_dari_tinggi(usia_hari, tinggi, kurva_per_jk[kode_jk]), kode_status_batch(z_score))
+
+@pytest.mark.parametrize("kode_jk", range(len(JENIS_KELAMIN)))
+def test_batas_tinggi_dari_kurva(tabel_per_jk, kurva_per_jk, kode_jk):
+    tabel = tabel_per_jk[kode_jk]
+    usia_hari = _usia_uji(tabel)
+    L, M, S, _ = interpolasi_batch(usia_hari, tabel)
+    harapan = hitung_tinggi_dari_z(np.asarray(Z_BATAS_STATUS, dtype=np.float64), L[:, np.newaxis], M[:, np.newaxis], S[:, np.newaxis])
+    np.testing.assert_allclose(batas_tinggi_batch(usia_hari, kurva_per_jk[kode_jk]), harapan, rtol=1e-12)
+
+def test_kode_status_dari_tinggi_nilai_tidak_valid(kurva_per_jk):
+    kode = kode_status_dari_tinggi([365, 365, 365, np.nan], [np.nan, -1.0, np.inf, 75.0], kurva_per_jk[0])
+    np.testing.assert_array_equal(kode, [KODE_STATUS_TIDAK_VALID] * 4)
+
+def test_hitung_batch_dengan_kurva(tabel_per_jk, kurva_per_jk):
+    rng = np.random.default_rng(1)
+    usia_hari = rng.integers(0, 1857, 5000).astype(np.float64)
+    jenis_kelamin = rng.integers(-1, 2, 5000)
+    tinggi = 50 + usia_hari * 0.025 + rng.normal(0, 6, 5000)
+
+    dengan_z = hitung_batch(jenis_kelamin, usia_hari, tinggi, tabel_per_jk)
+    dengan_kurva = hitung_batch(jenis_kelamin, usia_hari, tinggi, tabel_per_jk, kurva_per_jk=kurva_per_jk)
+    np.testing.assert_array_equal(dengan_kurva["kode_status"], dengan_z["kode_status"])
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.calculations import hitung_usia_bulan
+from src.ekspor import baca_batch, baca_nama_kolom, ekspor_histori, ekspor_histori_bytes, impor_histori, rekaman_dari_batch
+from src.histori import KOLOM_HISTORI
+from src.penyimpanan import PenyimpananMemori
+
+LAHIR = date(2022, 1, 1)
+
+def _rekaman(nama, usia_hari, tinggi, berat, z_score=-0.35, status="Normal", jenis_kelamin="Laki-laki", penginput="WARGA"):
+    return (nama, penginput, (LAHIR + timedelta(days=usia_hari)).isoformat(), jenis_kelamin, usia_hari,
+            round(hitung_usia_bulan(usia_hari), 1), tinggi, berat, z_score, status)
+
+DAFTAR_REKAMAN = [
+    _rekaman("Agus", 365, 75.0, 9.5),
+    _rekaman("Agus", 395, 76.3, 9.7, z_score=-0.41),
+    _rekaman("Agus", 425, 77.2, 9.9, penginput="KADER"),
+    _rekaman("Sari", 400, 74.1, 8.87, jenis_kelamin="Perempuan"),
+    _rekaman("Budi", 700, 84.5, 11.6, z_score=-1.23),
+]
+
+@pytest.fixture
+def penyimpanan():
+    penyimpanan = PenyimpananMemori()
+    penyimpanan.simpan_banyak(DAFTAR_REKAMAN)
+    return penyimpanan
+
+def _baca_semua(path):
+    return [rekaman for batch in baca_batch(path, KOLOM_HISTORI) for rekaman in rekaman_dari_batch(batch)]
+
+@pytest.mark.parametrize("ekstensi", [".parquet", ".arrow"])
+def test_ekspor_lalu_baca_kembali_sama(tmp_path, penyimpanan, ekstensi):
+    path = str(tmp_path / f"histori{ekstensi}")
+    # Batch kecil agar ada beberapa row group/batch, masing-masing dengan dictionary sendiri
+    assert ekspor_histori(path, penyimpanan, ukuran_batch=2) == len(DAFTAR_REKAMAN)
+    assert baca_nama_kolom(path) == KOLOM_HISTORI
+    assert _baca_semua(path) == sorted(DAFTAR_REKAMAN, key=lambda r: (r[0], r[2]))
+
+def test_ekspor_satu_anak(tmp_path, penyimpanan):
+    path = str(tmp_path / "agus.parquet")
+    assert ekspor_histori(path, penyimpanan, nama="Agus") == 3
+    assert [r[2] for r in _baca_semua(path)] == ["2023-01-01", "2023-01-31", "2023-03-02"]
+
+def test_ekspor_kosong_tetap_berskema(tmp_path):
+    path = str(tmp_path / "kosong.parquet")
+    assert ekspor_histori(path, PenyimpananMemori()) == 0
+    assert baca_nama_kolom(path) == KOLOM_HISTORI
+    assert _baca_semua(path) == []
+
+def test_ekspor_bytes_parquet(penyimpanan):
+    isi = ekspor_histori_bytes(penyimpanan, "Agus")
+    assert isi[:4] == b"PAR1" and isi[-4:] == b"PAR1"
+
+def test_baca_batch_hanya_kolom_diminta(tmp_path, penyimpanan):
+    path = str(tmp_path / "histori.parquet")
+    ekspor_histori(path, penyimpanan)
+    batch = next(baca_batch(path, ["Nama", "Tinggi (cm)"]))
+    assert batch.schema.names == ["Nama", "Tinggi (cm)"]
+
+def test_format_tidak_didukung(tmp_path, penyimpanan):
+    with pytest.raises(ValueError):
+        ekspor_histori(str(tmp_path / "histori.csv"), penyimpanan)
+
+@pytest.mark.parametrize("ekstensi", [".parquet", ".arrow"])
+def test_impor_menghitung_ulang_dan_melewati_duplikat(tmp_path, penyimpanan, ekstensi):
+    path = str(tmp_path / f"histori{ekstensi}")
+    ekspor_histori(path, penyimpanan)
+
+    tujuan = PenyimpananMemori()
+    assert impor_histori(path, tujuan) == (len(DAFTAR_REKAMAN), len(DAFTAR_REKAMAN))
+    assert impor_histori(path, tujuan) == (len(DAFTAR_REKAMAN), 0)
+
+    df = tujuan.baca("Agus")
+    assert df["Tinggi (cm)"].tolist() == [75.0, 76.3, 77.2]
+    assert df["JenisPenginput"].tolist() == ["WARGA", "WARGA", "KADER"]
+    # Z-score dihitung ulang dari tabel WHO, bukan disalin dari file
+    assert df["Z-score"].tolist() != [r[8] for r in DAFTAR_REKAMAN[:3]]
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+from src.calculations import hitung_usia_bulan
+from src.histori import KOLOM_HISTORI, BufferHistori, laporan_memori
+
+def _rekaman(tanggal, usia_hari, tinggi=80.0, berat=10.0, z_score=-1.0, status="Normal", penginput="WARGA"):
+    return ("Agus", penginput, tanggal, "Laki-laki", usia_hari, round(hitung_usia_bulan(usia_hari), 1), tinggi, berat, z_score, status)
+
+def _deret(jumlah, mulai=date(2024, 1, 1)):
+    return [_rekaman((mulai + timedelta(days=i)).isoformat(), 300 + i, tinggi=round(75 + 0.1 * i, 1)) for i in range(jumlah)]
+
+def test_tambah_melewati_kapasitas_awal():
+    buffer = BufferHistori()
+    daftar = _deret(3 * BufferHistori.KAPASITAS_AWAL + 1)
+    for rekaman in daftar:
+        assert buffer.tambah(rekaman)
+    df = buffer.ke_dataframe()
+    assert list(df.columns) == KOLOM_HISTORI
+    assert len(buffer) == len(df) == len(daftar)
+    assert list(df.itertuples(index=False, name=None)) == daftar
+
+def test_tanggal_duplikat_ditolak_tanpa_menaikkan_versi():
+    buffer = BufferHistori()
+    assert buffer.tambah(_rekaman("2024-01-01", 300))
+    assert buffer.kunci_versi == (buffer.id, 1)
+    assert not buffer.tambah(_rekaman("2024-01-01", 300, tinggi=90.0))
+    assert buffer.kunci_versi == (buffer.id, 1)
+    assert buffer.ada("2024-01-01")
+    assert not buffer.ada("2024-01-02")
+    assert buffer.tambah(_rekaman("2024-01-02", 301))
+    assert buffer.kunci_versi == (buffer.id, 2)
+
+def test_id_buffer_unik():
+    assert BufferHistori().id != BufferHistori().id
+
+def test_dataframe_di_cache_per_versi():
+    buffer = BufferHistori()
+    buffer.tambah(_rekaman("2024-01-01", 300))
+    df = buffer.ke_dataframe()
+    assert buffer.ke_dataframe() is df
+    buffer.tambah(_rekaman("2024-01-02", 301))
+    df_baru = buffer.ke_dataframe()
+    assert df_baru is not df
+    # DataFrame lama tidak ikut berubah oleh penambahan
+    assert len(df) == 1 and len(df_baru) == 2
+
+def test_penambahan_tidak_berurutan():
+    buffer = BufferHistori()
+    buffer.tambah(_rekaman("2024-03-01", 360, z_score=-2.5, berat=9.0))
+    buffer.tambah(_rekaman("2024-01-01", 300, z_score=-1.0, berat=8.0))
+    buffer.tambah(_rekaman("2024-02-01", 331, z_score=-2.1, berat=8.5))
+    assert buffer.ke_dataframe()["Tanggal"].tolist() == ["2024-01-01", "2024-02-01", "2024-03-01"]
+    # "Terakhir" mengikuti tanggal terbaru, bukan urutan input
+    assert buffer.ringkasan() == {"total": 3, "z_terakhir": -2.5, "jumlah_stunting": 2, "berat_terakhir": 9.0}
+
+def test_nilai_float32_dikembalikan_sesuai_presisi():
+    buffer = BufferHistori()
+    buffer.tambah(_rekaman("2024-01-01", 300, tinggi=72.3, berat=9.87, z_score=-1.23))
+    baris = buffer.ke_dataframe().iloc[0]
+    assert baris["Tinggi (cm)"] == 72.3
+    assert baris["Berat (kg)"] == 9.87
+    assert baris["Z-score"] == -1.23
+    assert baris["Usia (Bulan)"] == round(hitung_usia_bulan(300), 1)
+
+def test_kosakata_kategori_bertambah():
+    buffer = BufferHistori()
+    buffer.tambah(_rekaman("2024-01-01", 300))
+    buffer.tambah(_rekaman("2024-01-02", 301, penginput="KADER", status="Pendek (Stunted)"))
+    df = buffer.ke_dataframe()
+    assert df["JenisPenginput"].tolist() == ["WARGA", "KADER"]
+    assert df["Status"].tolist() == ["Normal", "Pendek (Stunted)"]
+    assert df["Jenis Kelamin"].dtype == "category"
+
+def test_potret_konsisten():
+    buffer = BufferHistori()
+    kosong = buffer.potret()
+    assert kosong["dataframe"] is None and kosong["tren"] is None
+    assert kosong["ringkasan"]["total"] == 0
+
+    for rekaman in _deret(5):
+        buffer.tambah(rekaman)
+    potret = buffer.potret()
+    assert potret["kunci_versi"] == buffer.kunci_versi
+    assert potret["ringkasan"]["total"] == len(potret["dataframe"]) == 5
+    assert all(len(arr) == 5 for arr in potret["tren"].values())
+
+def test_laporan_memori():
+    buffer_a, buffer_b = BufferHistori(), BufferHistori()
+    for rekaman in _deret(10):
+        buffer_a.tambah(rekaman)
+    buffer_b.tambah(_rekaman("2024-01-01", 300))
+    laporan = laporan_memori([buffer_a, buffer_b])
+    assert laporan["jumlah_anak"] == 2
+    assert laporan["jumlah_rekaman"] == 11
+    assert laporan["total"] > 0
+    assert laporan["byte_per_rekaman"] == laporan["total"] / 11
+    assert laporan_memori([])["byte_per_rekaman"] == 0.0
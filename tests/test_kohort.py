@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from src.calculations import hitung_usia_bulan
+from src.kohort import KELOMPOK_USIA_KOHORT, AgregatKohort, hitung_prevalensi, kelompok_usia, sql_kelompok_usia
+from src.penyimpanan import PenyimpananMemori, PenyimpananSQLite
+
+def _rekaman(nama, tanggal, usia_hari, status, jenis_kelamin="Laki-laki"):
+    return (nama, "WARGA", tanggal, jenis_kelamin, usia_hari, round(hitung_usia_bulan(usia_hari), 1), 80.0, 10.0, -1.0, status)
+
+DAFTAR_REKAMAN = [
+    _rekaman("Agus", "2024-01-05", 100, "Normal"),
+    _rekaman("Agus", "2024-02-05", 131, "Pendek (Stunted)"),
+    _rekaman("Sari", "2024-01-20", 400, "Sangat Pendek (Severely Stunted)", "Perempuan"),
+    _rekaman("Budi", "2024-01-25", 1500, "Normal"),
+    _rekaman("Budi", "2024-02-25", 1531, "Normal"),
+]
+
+def test_kelompok_usia_sql_sama_dengan_python():
+    koneksi = sqlite3.connect(":memory:")
+    # Titik di sekitar setiap batas kelompok (bulan x 30.4375 hari)
+    daftar_usia = [0, 1856] + [hari for _, batas in KELOMPOK_USIA_KOHORT if batas for hari in (int(batas * 30.4375), int(batas * 30.4375) + 1)]
+    for usia_hari in daftar_usia:
+        sql = koneksi.execute(f"SELECT {sql_kelompok_usia('usia')} FROM (SELECT ? AS usia)", (usia_hari,)).fetchone()[0]
+        assert sql == kelompok_usia(usia_hari), usia_hari
+
+def test_agregat_memori():
+    agregat = AgregatKohort()
+    agregat.tambah("Laki-laki", 100, "2024-01-05", "Normal")
+    agregat.tambah("Laki-laki", 120, "2024-01-28", "Normal")
+    agregat.tambah("Laki-laki", 120, "2024-02-01", "Normal")
+    assert sorted(agregat.baris()) == [
+        ("Laki-laki", "0-5 bln", "2024-01", "Normal", 2),
+        ("Laki-laki", "0-5 bln", "2024-02", "Normal", 1),
+    ]
+
+@pytest.mark.parametrize("simpan_banyak", [False, True])
+def test_trigger_sqlite_sama_dengan_agregat_memori(tmp_path, simpan_banyak):
+    sqlite = PenyimpananSQLite(str(tmp_path / "histori.sqlite3"))
+    memori = PenyimpananMemori()
+    # Duplikat (nama, tanggal) tidak boleh terhitung dua kali
+    daftar = DAFTAR_REKAMAN + DAFTAR_REKAMAN[:2]
+    for penyimpanan in (sqlite, memori):
+        if simpan_banyak:
+            penyimpanan.simpan_banyak(daftar)
+        else:
+            for rekaman in daftar:
+                penyimpanan.simpan(rekaman)
+    assert sorted(sqlite.agregat_kohort()) == sorted(memori.agregat_kohort())
+    assert sum(baris[-1] for baris in sqlite.agregat_kohort()) == len(DAFTAR_REKAMAN)
+
+def test_agregat_diisi_dari_histori_lama(tmp_path):
+    path = str(tmp_path / "histori.sqlite3")
+    PenyimpananSQLite(path).simpan_banyak(DAFTAR_REKAMAN)
+    # Basis data dari versi sebelum tabel agregat ada
+    koneksi = sqlite3.connect(path)
+    koneksi.executescript("DROP TRIGGER trg_histori_agregat_kohort; DROP TABLE agregat_kohort;")
+    koneksi.close()
+
+    penyimpanan = PenyimpananSQLite(path)
+    memori = PenyimpananMemori()
+    memori.simpan_banyak(DAFTAR_REKAMAN)
+    assert sorted(penyimpanan.agregat_kohort()) == sorted(memori.agregat_kohort())
+    # Trigger dibuat ulang dan pengisian tidak diulang oleh objek berikutnya
+    penyimpanan.simpan(_rekaman("Agus", "2024-03-05", 160, "Normal"))
+    assert sum(baris[-1] for baris in PenyimpananSQLite(path).agregat_kohort()) == len(DAFTAR_REKAMAN) + 1
+
+def test_hitung_prevalensi():
+    memori = PenyimpananMemori()
+    memori.simpan_banyak(DAFTAR_REKAMAN)
+    total = hitung_prevalensi(memori.agregat_kohort()).iloc[0]
+    assert total["Jumlah Pengukuran"] == 5
+    assert total["Prevalensi Stunting (%)"] == 40.0
+    assert total["Prevalensi Stunting Berat (%)"] == 20.0
+
+    per_jk = hitung_prevalensi(memori.agregat_kohort(), ["Jenis Kelamin"]).set_index("Jenis Kelamin")
+    assert per_jk.loc["Laki-laki", "Prevalensi Stunting (%)"] == 25.0
+    assert per_jk.loc["Perempuan", "Prevalensi Stunting Berat (%)"] == 100.0
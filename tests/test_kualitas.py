@@ -0,0 +1,57 @@
+import numpy as np
+
+from src.kualitas import (
+    FLAG_DUPLIKAT, FLAG_TIDAK_LENGKAP, FLAG_TINGGI_TURUN, FLAG_Z_TIDAK_WAJAR, PESAN_FLAG,
+    flag_deret, flag_z_tidak_wajar, jelaskan_flag, periksa_kualitas, ringkasan_flag,
+)
+
+def test_bit_flag_unik_dan_muat_uint8():
+    bit = list(PESAN_FLAG)
+    assert len(set(bit)) == len(bit)
+    assert all(b > 0 and b & (b - 1) == 0 and b < 256 for b in bit)
+
+def test_flag_z_tidak_wajar_per_indikator():
+    flag = flag_z_tidak_wajar({
+        "tb_u": np.array([-6.5, 0.0, 6.5, np.nan]),
+        "bb_u": np.array([0.0, 5.5, -5.9, np.nan]),
+    })
+    # Batas bb_u (-6, 5) berbeda dengan tb_u (-6, 6); NaN (indikator tidak berlaku) tidak ditandai
+    assert flag.tolist() == [FLAG_Z_TIDAK_WAJAR["tb_u"], FLAG_Z_TIDAK_WAJAR["bb_u"], FLAG_Z_TIDAK_WAJAR["tb_u"], 0]
+    assert flag_z_tidak_wajar({}) is None
+
+def test_duplikat_menandai_kemunculan_berikutnya():
+    flag = flag_deret([0, 1, 0, 0], [10, 10, 10, 11], [70.0, 70.0, 70.5, 71.0])
+    assert flag.tolist() == [0, 0, FLAG_DUPLIKAT, 0]
+
+def test_tinggi_turun_menurut_tanggal_bukan_urutan_masukan():
+    # Baris diberikan terbalik; menurut tanggal tinggi turun 2 cm pada hari 40, dan 0.5 cm pada hari 70 masih wajar
+    flag = flag_deret([0, 0, 0], [70, 40, 10], [69.5, 70.0, 72.0])
+    assert flag.tolist() == [0, FLAG_TINGGI_TURUN, 0]
+
+def test_deret_melewati_anak_tidak_dikenal():
+    flag = flag_deret([-1, -1, 2, 3], [10, 10, 10, 10], [70.0, 60.0, 70.0, 60.0])
+    assert flag.tolist() == [0, 0, 0, 0]
+    assert flag_deret([0], [10], [70.0]).tolist() == [0]
+
+def test_periksa_kualitas_menggabungkan_flag():
+    nama = ["Agus", "Agus", "Sari", "Budi", None]
+    hari_ukur = [19000, 19000, 19000, 19000, 19000]
+    jenis_kelamin = ["Laki-laki", "Laki-laki", "Perempuan", "Laki-laki", "Laki-laki"]
+    usia_hari = [365, 365, 365, 1500, 365]
+    tinggi = [75.7, 75.7, np.nan, 40.0, 75.7]
+    berat = [9.6, 9.6, 8.9, 12.0, 9.6]
+    flag = periksa_kualitas(nama, hari_ukur, jenis_kelamin, usia_hari, tinggi, berat)
+    assert flag.dtype == np.uint8
+    assert flag[0] == 0
+    assert flag[1] == FLAG_DUPLIKAT
+    assert flag[2] & FLAG_TIDAK_LENGKAP
+    assert flag[3] & FLAG_Z_TIDAK_WAJAR["tb_u"]
+    assert flag[4] & FLAG_TIDAK_LENGKAP
+
+def test_jelaskan_dan_ringkas_flag():
+    assert jelaskan_flag(0) == []
+    assert jelaskan_flag(FLAG_DUPLIKAT | FLAG_TINGGI_TURUN) == [PESAN_FLAG[FLAG_DUPLIKAT], PESAN_FLAG[FLAG_TINGGI_TURUN]]
+    ringkasan = ringkasan_flag([FLAG_DUPLIKAT | FLAG_TINGGI_TURUN, FLAG_DUPLIKAT, 0])
+    assert ringkasan[PESAN_FLAG[FLAG_DUPLIKAT]] == 2
+    assert ringkasan[PESAN_FLAG[FLAG_TINGGI_TURUN]] == 1
+    assert ringkasan[PESAN_FLAG[FLAG_TIDAK_LENGKAP]] == 0
@@ -0,0 +1,95 @@
+import pytest
+
+from src.calculations import hitung_usia_bulan
+from src.penyimpanan import PenyimpananMemori, PenyimpananSQLite
+
+def _rekaman(nama, tanggal, usia_hari, tinggi=80.0, berat=10.0, z_score=-1.0, status="Normal", jenis_kelamin="Laki-laki"):
+    return (nama, "WARGA", tanggal, jenis_kelamin, usia_hari, round(hitung_usia_bulan(usia_hari), 1), tinggi, berat, z_score, status)
+
+@pytest.fixture(params=["memori", "sqlite"])
+def penyimpanan(request, tmp_path):
+    if request.param == "memori":
+        return PenyimpananMemori()
+    return PenyimpananSQLite(str(tmp_path / "histori.sqlite3"))
+
+def test_satu_pengukuran_per_tanggal(penyimpanan):
+    assert penyimpanan.simpan(_rekaman("Agus", "2024-01-10", 400))
+    assert not penyimpanan.simpan(_rekaman("Agus", "2024-01-10", 400, tinggi=81.0))
+    # Tanggal yang sama untuk anak lain bukan duplikat
+    assert penyimpanan.simpan(_rekaman("Sari", "2024-01-10", 300, jenis_kelamin="Perempuan"))
+    assert penyimpanan.ada("Agus", "2024-01-10")
+    assert not penyimpanan.ada("Agus", "2024-01-11")
+
+    df = penyimpanan.baca("Agus")
+    assert len(df) == 1
+    assert df["Tinggi (cm)"].tolist() == [80.0]
+
+def test_simpan_banyak_melewati_duplikat(penyimpanan):
+    penyimpanan.simpan(_rekaman("Agus", "2024-01-10", 400))
+    daftar = [
+        _rekaman("Agus", "2024-01-10", 400),
+        _rekaman("Agus", "2024-02-10", 431),
+        _rekaman("Agus", "2024-02-10", 431),
+        _rekaman("Sari", "2024-02-10", 300, jenis_kelamin="Perempuan"),
+    ]
+    assert penyimpanan.simpan_banyak(daftar) == 2
+    assert penyimpanan.baca("Agus")["Tanggal"].tolist() == ["2024-01-10", "2024-02-10"]
+    assert len(penyimpanan.baca("Sari")) == 1
+
+def test_baca_terurut_menurut_tanggal(penyimpanan):
+    for tanggal, usia, tinggi in [("2024-03-01", 450, 82.0), ("2024-01-01", 390, 79.0), ("2024-02-01", 421, 80.5)]:
+        penyimpanan.simpan(_rekaman("Agus", tanggal, usia, tinggi=tinggi))
+    df = penyimpanan.baca("Agus")
+    assert df["Tanggal"].tolist() == ["2024-01-01", "2024-02-01", "2024-03-01"]
+    assert df["Tinggi (cm)"].tolist() == [79.0, 80.5, 82.0]
+
+def test_anak_tanpa_histori(penyimpanan):
+    assert len(penyimpanan.baca("Tidak Ada")) == 0
+    assert penyimpanan.baca_buffer("Tidak Ada").ringkasan()["total"] == 0
+
+def test_iter_rekaman_per_nama_dan_tanggal(penyimpanan):
+    daftar = [
+        _rekaman("Sari", "2024-02-01", 320, jenis_kelamin="Perempuan"),
+        _rekaman("Agus", "2024-03-01", 450),
+        _rekaman("Agus", "2024-01-01", 390),
+        _rekaman("Sari", "2024-01-01", 289, jenis_kelamin="Perempuan"),
+        _rekaman("Budi", "2024-01-15", 700),
+    ]
+    penyimpanan.simpan_banyak(daftar)
+    batch = list(penyimpanan.iter_rekaman(2))
+    assert [len(b) for b in batch] == [2, 2, 1]
+    assert [tuple(r) for b in batch for r in b] == sorted(daftar, key=lambda r: (r[0], r[2]))
+    assert [r[2] for b in penyimpanan.iter_rekaman(10, "Agus") for r in b] == ["2024-01-01", "2024-03-01"]
+
+def test_sqlite_cache_buffer_mengikuti_penyimpanan(tmp_path):
+    penyimpanan = PenyimpananSQLite(str(tmp_path / "histori.sqlite3"))
+    penyimpanan.simpan(_rekaman("Agus", "2024-01-01", 390))
+    buffer = penyimpanan.baca_buffer("Agus")
+
+    # simpan menambah ke buffer yang sudah di-cache; simpan_banyak membuangnya agar dimuat ulang
+    penyimpanan.simpan(_rekaman("Agus", "2024-02-01", 421))
+    assert penyimpanan.baca_buffer("Agus") is buffer
+    assert len(buffer) == 2
+    penyimpanan.simpan_banyak([_rekaman("Agus", "2024-03-01", 450)])
+    assert penyimpanan.baca_buffer("Agus") is not buffer
+    assert penyimpanan.baca("Agus")["Tanggal"].tolist() == ["2024-01-01", "2024-02-01", "2024-03-01"]
+
+def test_sqlite_persisten_antar_objek(tmp_path):
+    path = str(tmp_path / "histori.sqlite3")
+    PenyimpananSQLite(path).simpan_banyak([_rekaman("Agus", "2024-01-01", 390), _rekaman("Agus", "2024-02-01", 421)])
+    penyimpanan = PenyimpananSQLite(path)
+    assert len(penyimpanan.baca("Agus")) == 2
+    assert not penyimpanan.simpan(_rekaman("Agus", "2024-01-01", 390))
+
+def test_sqlite_lru_membuang_buffer_terlama(tmp_path, monkeypatch):
+    monkeypatch.setattr(PenyimpananSQLite, "MAKS_ANAK_DI_CACHE", 2)
+    penyimpanan = PenyimpananSQLite(str(tmp_path / "histori.sqlite3"))
+    for nama in ("A", "B", "C"):
+        penyimpanan.simpan(_rekaman(nama, "2024-01-01", 390))
+    buffer_a = penyimpanan.baca_buffer("A")
+    penyimpanan.baca_buffer("B")
+    penyimpanan.baca_buffer("A")
+    penyimpanan.baca_buffer("C")
+    # B yang paling lama tidak dibaca tersingkir, A tetap di cache
+    assert penyimpanan.laporan_memori()["jumlah_anak"] == 2
+    assert penyimpanan.baca_buffer("A") is buffer_a
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from src.calculations import hitung_usia_bulan
+from src.histori import BufferHistori
+from src.pertumbuhan import (
+    KOLOM_TREN, TREN_BERAT_TURUN, TREN_MASUK_STUNTING, TREN_TINGGI_TIDAK_NAIK, TREN_Z_TURUN, hitung_tren, pesan_tren,
+)
+
+def _tren(usia_hari, tinggi=None, berat=None, z_score=None, **kwargs):
+    n = len(usia_hari)
+    # Default: tinggi dan berat naik, Z-score tetap, sehingga tidak ada flag
+    tinggi = tinggi if tinggi is not None else [60.0 + i for i in range(n)]
+    berat = berat if berat is not None else [6.0 + 0.2 * i for i in range(n)]
+    z_score = z_score if z_score is not None else [0.0] * n
+    return hitung_tren(usia_hari, tinggi, berat, z_score, **kwargs)
+
+def test_laju_dinormalisasi_selang_hari():
+    tren = _tren([100, 161], tinggi=[60.0, 64.0], berat=[6.0, 7.0])
+    assert np.isnan(tren["laju_tinggi"][0]) and tren["flag"][0] == 0
+    assert tren["selang_hari"][1] == 61
+    assert tren["laju_tinggi"][1] == pytest.approx(4.0 / hitung_usia_bulan(61))
+    assert tren["laju_berat"][1] == pytest.approx(1.0 / hitung_usia_bulan(61))
+
+def test_tinggi_tidak_naik_hanya_setelah_selang_minimal():
+    tren = _tren([100, 110, 140], tinggi=[60.0, 60.0, 60.0])
+    # Selang 10 hari terlalu pendek untuk dinilai, selang 30 hari dinilai
+    assert tren["flag"].tolist() == [0, 0, TREN_TINGGI_TIDAK_NAIK]
+
+def test_berat_turun():
+    tren = _tren([100, 130, 160], berat=[6.0, 5.8, 6.1])
+    assert tren["flag"].tolist() == [0, TREN_BERAT_TURUN, 0]
+
+def test_masuk_stunting_hanya_saat_melewati_batas():
+    tren = _tren([100, 300, 500], z_score=[-1.9, -2.1, -2.5])
+    assert tren["flag"].tolist() == [0, TREN_MASUK_STUNTING, 0]
+
+def test_penurunan_z_dalam_jendela():
+    # Dari hari 100 ke 180 turun 0.7 (dalam jendela 90 hari); dari 180 ke 300 pengukuran awal jendela adalah baris itu sendiri
+    tren = _tren([100, 160, 180, 300], z_score=[0.0, -0.3, -0.7, -1.5])
+    assert tren["perubahan_z_jendela"][2] == pytest.approx(-0.7)
+    assert np.isnan(tren["perubahan_z_jendela"][3])
+    assert tren["flag"].tolist() == [0, 0, TREN_Z_TURUN, 0]
+
+def test_mulai_inkremental_sama_dengan_penuh():
+    rng = np.random.default_rng(0)
+    usia = np.cumsum(rng.integers(5, 60, 40))
+    tinggi = 50 + usia * 0.03 + rng.normal(0, 0.8, 40)
+    berat = 3 + usia * 0.008 + rng.normal(0, 0.3, 40)
+    z_score = rng.normal(-1, 0.8, 40)
+    penuh = hitung_tren(usia, tinggi, berat, z_score)
+    sebagian = hitung_tren(usia, tinggi, berat, z_score, mulai=25)
+    for kol in KOLOM_TREN:
+        np.testing.assert_array_equal(sebagian[kol], penuh[kol][25:])
+
+def test_kelompok_tidak_melewati_batas_anak():
+    tren = _tren([100, 130, 50, 80], tinggi=[60.0, 62.0, 55.0, 54.0], kelompok=[0, 0, 1, 1])
+    assert np.isnan(tren["selang_hari"][2])
+    assert tren["selang_hari"][3] == 30
+    assert tren["flag"].tolist() == [0, 0, 0, TREN_TINGGI_TIDAK_NAIK]
+
+def test_usia_tidak_terurut_ditolak():
+    with pytest.raises(ValueError):
+        _tren([100, 90, 120])
+
+def test_pesan_tren():
+    assert pesan_tren(0) == []
+    assert len(pesan_tren(TREN_Z_TURUN | TREN_BERAT_TURUN)) == 2
+
+def _rekaman(tanggal, usia_hari, tinggi, berat, z_score):
+    return ("Agus", "WARGA", tanggal.isoformat(), "Laki-laki", int(usia_hari), round(hitung_usia_bulan(usia_hari), 1),
+            round(float(tinggi), 1), round(float(berat), 1), round(float(z_score), 2), "Normal")
+
+def _deret(jumlah, seed=0):
+    rng = np.random.default_rng(seed)
+    lahir = date(2022, 1, 1)
+    usia = np.cumsum(rng.integers(10, 40, jumlah)) + 30
+    tinggi = 50 + usia * 0.03 + rng.normal(0, 0.8, jumlah)
+    berat = 3 + usia * 0.008 + rng.normal(0, 0.3, jumlah)
+    z_score = rng.normal(-1, 0.8, jumlah)
+    return [_rekaman(lahir + timedelta(days=int(u)), u, t, b, z) for u, t, b, z in zip(usia, tinggi, berat, z_score)]
+
+def _tren_acuan(daftar):
+    daftar = sorted(daftar, key=lambda r: r[2])
+    return hitung_tren(*([r[i] for r in daftar] for i in (4, 6, 7, 8)))
+
+def test_tren_buffer_inkremental_sama_dengan_hitung_ulang():
+    buffer = BufferHistori()
+    daftar = _deret(30)
+    for i, rekaman in enumerate(daftar):
+        buffer.tambah(rekaman)
+        # Tren dibaca di tengah penambahan agar jalur inkremental benar-benar dipakai
+        if i % 7 == 0:
+            buffer.tren()
+    tren, acuan = buffer.tren(), _tren_acuan(daftar)
+    for kol in KOLOM_TREN:
+        np.testing.assert_allclose(tren[kol], acuan[kol], equal_nan=True)
+
+def test_tren_buffer_tidak_berurutan():
+    buffer = BufferHistori()
+    daftar = _deret(12, seed=1)
+    for rekaman in daftar[6:] + daftar[:6]:
+        buffer.tambah(rekaman)
+    tren, acuan = buffer.tren(), _tren_acuan(daftar)
+    for kol in KOLOM_TREN:
+        np.testing.assert_allclose(tren[kol], acuan[kol], equal_nan=True)
+    # View yang sudah dikembalikan tidak berubah oleh penambahan berikutnya
+    flag = tren["flag"].copy()
+    buffer.tambah(_deret(13, seed=1)[-1])
+    np.testing.assert_array_equal(tren["flag"], flag)
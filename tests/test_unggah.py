@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from src import unggah
+
+class PoolCatat:
+    """Pengganti pool yang hanya mencatat tugas yang diserahkan, tanpa menjalankannya."""
+
+    def __init__(self):
+        self.dikirim = []
+
+    def submit(self, fn, tugas, id_sesi):
+        self.dikirim.append((tugas, id_sesi))
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = PoolCatat()
+    monkeypatch.setattr(unggah, "_pool", pool)
+    monkeypatch.setattr(unggah, "_tugas", {})
+    monkeypatch.setattr(unggah, "_antrean_sesi", {})
+    monkeypatch.setattr(unggah, "_berjalan_sesi", {})
+    monkeypatch.setattr(unggah, "MAKS_PEKERJA_UNGGAH", 2)
+    monkeypatch.setattr(unggah, "MAKS_PEKERJA_PER_SESI", 2)
+    yield pool
+    for tugas in unggah._tugas.values():
+        if os.path.exists(tugas.path):
+            os.remove(tugas.path)
+
+def _unggah(id_sesi):
+    return unggah.mulai_unggah(b"", "roster.csv", None, "KADER", id_sesi=id_sesi)
+
+def test_sesi_lain_tidak_menunggu_antrean_satu_sesi(pool):
+    a1, a2, a3 = _unggah("a"), _unggah("a"), _unggah("a")
+    b1 = _unggah("b")
+    assert [tugas for tugas, _ in pool.dikirim] == [a1, a2]
+
+    # Slot pertama yang bebas diberikan ke sesi b yang belum mendapat giliran, bukan a3
+    unggah._selesai("a")
+    assert pool.dikirim[-1] == (b1, "b")
+    unggah._selesai("a")
+    assert pool.dikirim[-1] == (a3, "a")
+    assert unggah._antrean_sesi == {}
+
+def test_batas_pekerja_per_sesi(pool, monkeypatch):
+    monkeypatch.setattr(unggah, "MAKS_PEKERJA_PER_SESI", 1)
+    a1, a2 = _unggah("a"), _unggah("a")
+    # Masih ada pekerja kosong, tetapi sesi a sudah memakai jatahnya
+    assert [tugas for tugas, _ in pool.dikirim] == [a1]
+    b1 = _unggah("b")
+    assert pool.dikirim[-1] == (b1, "b")
+    unggah._selesai("a")
+    assert pool.dikirim[-1] == (a2, "a")
+    assert unggah._berjalan_sesi == {"a": 1, "b": 1}